@@ -1,8 +1,16 @@
 """MapMarker class for representing map markers with coordinates and metadata."""
 
+import importlib
 import math
+from collections.abc import Iterable
 from typing import Any
 
+try:
+    # Imported by name so type checking works with and without NumPy installed
+    np: Any = importlib.import_module("numpy")
+except ImportError:  # NumPy is optional; batch distances fall back to pure Python
+    np = None
+
 
 class MapMarker:
     """A map marker with coordinate data and marker-specific properties.
@@ -135,6 +143,63 @@ class MapMarker:
 
         return earth_radius * c
 
+    def distances_to_many(self, coordinates: Iterable[Any]) -> Any:
+        """Calculate distances to many points in one vectorized pass.
+
+        Args:
+            coordinates: NumPy array of shape (n, 2), sequence of
+                (latitude, longitude) pairs or flat interleaved buffer
+                such as array("d")
+
+        Returns:
+            Distances in meters, as a NumPy array if NumPy is installed
+            and as a list otherwise
+        """
+        earth_radius = 6371000  # meters
+
+        if np is not None:
+            points = np.radians(
+                np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+            )
+            lat2_rad, lon2_rad = points[:, 0], points[:, 1]
+            lat1_rad = math.radians(self._latitude)
+            lon1_rad = math.radians(self._longitude)
+
+            a = (
+                np.sin((lat2_rad - lat1_rad) / 2) ** 2
+                + math.cos(lat1_rad)
+                * np.cos(lat2_rad)
+                * np.sin((lon2_rad - lon1_rad) / 2) ** 2
+            )
+            return earth_radius * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+        values = list(coordinates)
+        if values and isinstance(values[0], (int, float)):
+            if len(values) % 2 != 0:
+                raise ValueError(
+                    "Flat coordinate buffers need an even number of values"
+                )
+            values = list(zip(values[0::2], values[1::2], strict=True))
+
+        # Trigonometry of the marker's own position is shared by every pair
+        lat1_rad = math.radians(self._latitude)
+        lon1_rad = math.radians(self._longitude)
+        cos_lat1 = math.cos(lat1_rad)
+
+        distances = []
+        for latitude, longitude in values:
+            lat2_rad = math.radians(latitude)
+            a = (
+                math.sin((lat2_rad - lat1_rad) / 2) ** 2
+                + cos_lat1
+                * math.cos(lat2_rad)
+                * math.sin((math.radians(longitude) - lon1_rad) / 2) ** 2
+            )
+            distances.append(
+                earth_radius * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+            )
+        return distances
+
     def get_formatted_coordinates(self) -> str:
         """Get formatted coordinate string.
 
@@ -1,11 +1,14 @@
 """Tests for MapMarker class."""
 
 import sys
+from array import array
 from pathlib import Path
 
 # Add the src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import map_marker
+import pytest
 from map_marker import MapMarker
 
 
@@ -115,6 +118,53 @@ class TestMapMarker:
         distance = self.marker.distance_to(48.8566, 2.3522)
         assert abs(distance - 878000.0) < 10000.0
 
+    def test_distances_to_many_matches_distance_to(self):
+        """Test batch distances against the scalar distance calculation."""
+        coordinates = [(52.5186, 13.3761), (48.8566, 2.3522), (52.5200, 13.4050)]
+
+        distances = list(self.marker.distances_to_many(coordinates))
+
+        expected = [self.marker.distance_to(lat, lon) for lat, lon in coordinates]
+        assert distances == pytest.approx(expected)
+
+    def test_distances_to_many_accepts_flat_buffer(self):
+        """Test batch distances from an interleaved array("d") buffer."""
+        coordinates = array("d", [52.5186, 13.3761, 48.8566, 2.3522])
+
+        distances = list(self.marker.distances_to_many(coordinates))
+
+        assert distances == pytest.approx(
+            [
+                self.marker.distance_to(52.5186, 13.3761),
+                self.marker.distance_to(48.8566, 2.3522),
+            ]
+        )
+
+    def test_distances_to_many_without_numpy(self, monkeypatch):
+        """Test the pure Python fallback used when NumPy is missing."""
+        monkeypatch.setattr(map_marker, "np", None)
+
+        distances = self.marker.distances_to_many([(48.8566, 2.3522)])
+
+        assert distances == pytest.approx([self.marker.distance_to(48.8566, 2.3522)])
+
+    def test_distances_to_many_with_numpy(self):
+        """Test the vectorized NumPy path against distance_to."""
+        np = pytest.importorskip("numpy")
+        coordinates = np.array([[52.5186, 13.3761], [48.8566, 2.3522]])
+
+        distances = self.marker.distances_to_many(coordinates)
+
+        assert isinstance(distances, np.ndarray)
+        assert distances.shape == (2,)
+        assert distances.tolist() == pytest.approx(
+            [self.marker.distance_to(lat, lon) for lat, lon in coordinates.tolist()]
+        )
+
+    def test_distances_to_many_with_no_coordinates(self):
+        """Test batch distances for an empty input."""
+        assert list(self.marker.distances_to_many([])) == []
+
     def test_get_formatted_coordinates(self):
         """Test formatted coordinates output."""
         formatted = self.marker.get_formatted_coordinates()
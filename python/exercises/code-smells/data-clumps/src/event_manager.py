@@ -11,16 +11,35 @@ that repeatedly use the same groups of parameters together:
 These parameter groups should be refactored into Parameter Objects.
 """
 
+import bisect
+import calendar
+import heapq
+import importlib
+import json
 import math
+import mmap
+import os
 import re
+import sys
 import uuid
-from dataclasses import dataclass
-from datetime import datetime
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, MutableMapping
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
 
 import pytz
 
+try:
+    # Imported by name so type checking works with and without NumPy installed
+    np: Any = importlib.import_module("numpy")
+except ImportError:  # NumPy is optional; batch distances fall back to pure Python
+    np = None
 
-@dataclass
+
+@dataclass(slots=True)
 class Event:
     """Represents an event with all its details"""
 
@@ -46,7 +65,7 @@ class Event:
     status: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Venue:
     """Represents a venue with location and contact details"""
 
@@ -66,7 +85,7 @@ class Venue:
     status: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Notification:
     """Represents a notification sent to an organizer"""
 
@@ -80,6 +99,22 @@ class Notification:
     status: str
 
 
+@dataclass
+class RecurringSeries:
+    """Represents a recurrence rule whose occurrences are expanded on demand"""
+
+    id: str
+    base_event_id: str
+    pattern: str
+    occurrences: int
+    start_date: str
+    template: Event
+
+    def occurrence_id(self, index: int) -> str:
+        """Returns the stable id of the occurrence at the given index"""
+        return f"{self.id}_{index}"
+
+
 @dataclass
 class TimeConversion:
     """Represents a time converted to a different timezone"""
@@ -89,13 +124,637 @@ class TimeConversion:
     timezone: str
 
 
+@dataclass
+class TimeConversionBatch:
+    """Represents many times converted to one timezone as parallel arrays"""
+
+    timezone: str
+    dates: list[str]
+    times: list[str]
+    timestamps: "array[int]"  # UTC seconds since the epoch, typecode "q"
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+EARTH_RADIUS_KM = 6371
+RECURRENCE_PATTERNS = ("daily", "weekly", "monthly")
+# Series whose expanded occurrences are kept for repeated proximity queries
+SERIES_CACHE_SIZE = 32
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+TIME_PATTERN = re.compile(r"^\d{2}:\d{2}:\d{2}$")
+EMAIL_PATTERN = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+
+EVENT_ROW_FIELDS = (
+    "title",
+    "description",
+    "date",
+    "start_time",
+    "end_time",
+    "timezone_str",
+    "street",
+    "city",
+    "country",
+    "postal_code",
+    "latitude",
+    "longitude",
+    "organizer_name",
+    "organizer_email",
+    "organizer_phone",
+)
+
+
+@lru_cache(maxsize=1024)
+def _get_timezone(timezone_str: str) -> Any:
+    """Looks up a timezone once per name, returning None for unknown names"""
+    try:
+        return pytz.timezone(timezone_str)
+    except pytz.exceptions.UnknownTimeZoneError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _fixed_utc_offset_seconds(timezone_str: str) -> int | None:
+    """Returns the UTC offset of zones that never change it, None otherwise"""
+    tz = _get_timezone(timezone_str)
+    if tz is not pytz.utc and not isinstance(tz, pytz.tzinfo.StaticTzInfo):
+        return None
+    return int(tz.utcoffset(EPOCH).total_seconds())
+
+
+@lru_cache(maxsize=4096)
+def _epoch_day(date: str) -> int:
+    """Returns the number of days between the epoch and a YYYY-MM-DD date"""
+    return (datetime.strptime(date, "%Y-%m-%d") - EPOCH).days
+
+
+@lru_cache(maxsize=4096)
+def _date_for_epoch_day(day: int) -> str:
+    """Formats a day number relative to the epoch as YYYY-MM-DD"""
+    return (EPOCH + timedelta(days=day)).strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_date_string(date: str) -> bool:
+    """Validates a YYYY-MM-DD date once per distinct string"""
+    if not DATE_PATTERN.match(date):
+        return False
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
+
+@lru_cache(maxsize=4096)
+def _is_valid_time_string(time: str) -> bool:
+    """Validates an HH:MM:SS time on the 24-hour clock"""
+    if not TIME_PATTERN.match(time):
+        return False
+    return int(time[:2]) <= 23 and int(time[3:5]) <= 59 and int(time[6:]) <= 59
+
+
+def _shift_date(start: datetime, pattern: str, occurrence: int) -> datetime:
+    """Moves a date forward by the given number of pattern steps"""
+    if pattern == "daily":
+        return start + timedelta(days=occurrence)
+    if pattern == "weekly":
+        return start + timedelta(weeks=occurrence)
+    if pattern == "monthly":
+        month = start.month + occurrence
+        year = start.year + (month - 1) // 12
+        month = ((month - 1) % 12) + 1
+        # Rules starting on the 29th-31st fall on the last day of short months
+        day = min(start.day, calendar.monthrange(year, month)[1])
+        return start.replace(year=year, month=month, day=day)
+    return start
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Calculates great-circle distance in kilometers without validation"""
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+
+    a = math.sin(d_lat / 2) * math.sin(d_lat / 2) + math.cos(
+        math.radians(lat1)
+    ) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) * math.sin(d_lon / 2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return EARTH_RADIUS_KM * c
+
+
+def _coordinate_pairs(coordinates: Iterable[Any]) -> list[tuple[float, float]]:
+    """Normalizes (lat, lon) pairs or a flat interleaved buffer into pairs"""
+    values = list(coordinates)
+    if values and isinstance(values[0], (int, float)):
+        if len(values) % 2 != 0:
+            raise ValueError("Flat coordinate buffers need an even number of values")
+        return list(
+            zip(map(float, values[0::2]), map(float, values[1::2]), strict=True)
+        )
+    return [(float(latitude), float(longitude)) for latitude, longitude in values]
+
+
+def _haversine_batch_km(origins: Any, targets: Any, pairwise: bool) -> Any:
+    """Calculates haversine distances for many points in one pass
+
+    Returns a NumPy array when NumPy is installed and nested lists otherwise.
+    With pairwise=True origins[i] is matched with targets[i] and a vector is
+    returned; otherwise the result is a len(origins) x len(targets) matrix.
+    """
+    if np is not None:
+        origin_rad = np.radians(np.asarray(origins, dtype=np.float64).reshape(-1, 2))
+        target_rad = np.radians(np.asarray(targets, dtype=np.float64).reshape(-1, 2))
+        if np.any(np.abs(origin_rad[:, 0]) > np.pi / 2) or np.any(
+            np.abs(target_rad[:, 0]) > np.pi / 2
+        ):
+            raise ValueError("Invalid coordinates")
+        if np.any(np.abs(origin_rad[:, 1]) > np.pi) or np.any(
+            np.abs(target_rad[:, 1]) > np.pi
+        ):
+            raise ValueError("Invalid coordinates")
+
+        if pairwise:
+            if len(origin_rad) != len(target_rad):
+                raise ValueError("Pairwise distances need equally long inputs")
+            lat1, lon1 = origin_rad[:, 0], origin_rad[:, 1]
+            lat2, lon2 = target_rad[:, 0], target_rad[:, 1]
+        else:
+            lat1, lon1 = origin_rad[:, :1], origin_rad[:, 1:]
+            lat2, lon2 = target_rad[:, 0], target_rad[:, 1]
+
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    origin_pairs = _coordinate_pairs(origins)
+    target_pairs = _coordinate_pairs(targets)
+    for latitude, longitude in origin_pairs + target_pairs:
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("Invalid coordinates")
+
+    # Convert every point once instead of once per pair
+    origin_rad = [
+        (math.radians(lat), math.radians(lon), math.cos(math.radians(lat)))
+        for lat, lon in origin_pairs
+    ]
+    target_rad = [
+        (math.radians(lat), math.radians(lon), math.cos(math.radians(lat)))
+        for lat, lon in target_pairs
+    ]
+
+    def distance(
+        origin: tuple[float, float, float], target: tuple[float, float, float]
+    ) -> float:
+        lat1, lon1, cos1 = origin
+        lat2, lon2, cos2 = target
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + cos1 * cos2 * math.sin((lon2 - lon1) / 2) ** 2
+        )
+        return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    if pairwise:
+        if len(origin_rad) != len(target_rad):
+            raise ValueError("Pairwise distances need equally long inputs")
+        return [distance(o, t) for o, t in zip(origin_rad, target_rad, strict=True)]
+    return [[distance(o, t) for t in target_rad] for o in origin_rad]
+
+
+class GeoGridIndex:
+    """Grid index that buckets ids by latitude/longitude cell
+
+    Radius queries only visit the cells overlapping the bounding box of the
+    search circle instead of every indexed point.
+    """
+
+    KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+    MAX_DISTANCE_KM = math.pi * EARTH_RADIUS_KM
+
+    def __init__(self, cell_size_deg: float = 0.1) -> None:
+        if cell_size_deg <= 0:
+            raise ValueError("Cell size must be positive")
+        self.cell_size_deg = cell_size_deg
+        self._lon_cells = math.ceil(360 / cell_size_deg)
+        self._cells: dict[tuple[int, int], set[str]] = {}
+        self._points: dict[str, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._points
+
+    def insert(self, item_id: str, latitude: float, longitude: float) -> None:
+        """Adds or moves an id to the cell containing the given point"""
+        self.remove(item_id)
+        cell = self._cell_for(latitude, longitude)
+        self._cells.setdefault(cell, set()).add(item_id)
+        self._points[item_id] = (latitude, longitude)
+
+    def remove(self, item_id: str) -> None:
+        """Removes an id from the index if present"""
+        point = self._points.pop(item_id, None)
+        if point is None:
+            return
+        cell = self._cell_for(*point)
+        bucket = self._cells[cell]
+        bucket.discard(item_id)
+        if not bucket:
+            del self._cells[cell]
+
+    def query_radius(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> list[tuple[float, str]]:
+        """Returns (distance_km, id) pairs within the radius, nearest first"""
+        matches = []
+        for cell in self._cells_within(latitude, longitude, radius_km):
+            for item_id in self._cells[cell]:
+                item_lat, item_lon = self._points[item_id]
+                distance = _haversine_km(latitude, longitude, item_lat, item_lon)
+                if distance <= radius_km:
+                    matches.append((distance, item_id))
+        matches.sort()
+        return matches
+
+    def nearest(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[tuple[float, str]]:
+        """Returns the k nearest (distance_km, id) pairs, nearest first"""
+        if k <= 0 or not self._points:
+            return []
+
+        radius_km = self.cell_size_deg * self.KM_PER_DEGREE
+        while True:
+            matches = self.query_radius(latitude, longitude, radius_km)
+            if len(matches) >= k or radius_km >= self.MAX_DISTANCE_KM:
+                return matches[:k]
+            radius_km *= 2
+
+    def _cell_for(self, latitude: float, longitude: float) -> tuple[int, int]:
+        """Maps a point to its grid cell"""
+        lat_cell = math.floor((latitude + 90) / self.cell_size_deg)
+        return lat_cell, self._lon_column(longitude + 180)
+
+    def _lon_column(self, offset: float) -> int:
+        """Maps degrees east of longitude -180, wrapped into [0, 360), to a column
+
+        The last column is narrower when the cell size does not divide 360.
+        """
+        column = math.floor(offset % 360 / self.cell_size_deg)
+        return min(column, self._lon_cells - 1)
+
+    def _cells_within(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> list[tuple[int, int]]:
+        """Returns the occupied cells overlapping the search circle's bounding box"""
+        lat_delta = radius_km / self.KM_PER_DEGREE
+        min_lat = max(-90.0, latitude - lat_delta)
+        max_lat = min(90.0, latitude + lat_delta)
+        rows = range(
+            math.floor((min_lat + 90) / self.cell_size_deg),
+            math.floor((max_lat + 90) / self.cell_size_deg) + 1,
+        )
+
+        # Longitude degrees shrink towards the poles; fall back to all columns
+        # when the circle reaches a pole or wraps around the whole globe.
+        widest_lat = max(abs(min_lat), abs(max_lat))
+        cos_lat = math.cos(math.radians(widest_lat))
+        columns: range | set[int] = range(self._lon_cells)
+        if widest_lat < 90 and cos_lat * 180 > lat_delta:
+            lon_delta = lat_delta / cos_lat
+            west = longitude - lon_delta + 180
+            east = longitude + lon_delta + 180
+            first, last = self._lon_column(west), self._lon_column(east)
+            if west // 360 == east // 360:
+                columns = range(first, last + 1)
+            else:
+                # The span crosses the antimeridian
+                columns = set(range(first, self._lon_cells)) | set(range(last + 1))
+
+        # Large circles cover more cells than are occupied; scan those instead.
+        if len(rows) * len(columns) > len(self._cells):
+            return [
+                cell for cell in self._cells if cell[0] in rows and cell[1] in columns
+            ]
+        return [
+            (row, column)
+            for row in rows
+            for column in columns
+            if (row, column) in self._cells
+        ]
+
+
+class TimelineIndex:
+    """Keeps ids sorted by UTC timestamp for O(log n + k) range queries"""
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[float, str]] = []
+        self._timestamps: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, item_id: str) -> float:
+        """Returns the timestamp stored for an id"""
+        return self._timestamps[item_id]
+
+    def insert(self, item_id: str, timestamp: float) -> None:
+        """Adds or moves an id to the given UTC timestamp"""
+        self.remove(item_id)
+        bisect.insort(self._entries, (timestamp, item_id))
+        self._timestamps[item_id] = timestamp
+
+    def insert_many(self, items: Iterable[tuple[str, float]]) -> None:
+        """Adds many (id, timestamp) pairs with a single sort"""
+        for item_id, timestamp in items:
+            self.remove(item_id)
+            self._entries.append((timestamp, item_id))
+            self._timestamps[item_id] = timestamp
+        self._entries.sort()
+
+    def remove(self, item_id: str) -> None:
+        """Removes an id from the index if present"""
+        timestamp = self._timestamps.pop(item_id, None)
+        if timestamp is None:
+            return
+        position = bisect.bisect_left(self._entries, (timestamp, item_id))
+        del self._entries[position]
+
+    def range(self, start: float, end: float) -> list[str]:
+        """Returns ids with start <= timestamp <= end in chronological order"""
+        return [item_id for _, item_id in self.entries(start, end)]
+
+    def entries(self, start: float, end: float) -> list[tuple[float, str]]:
+        """Returns (timestamp, id) pairs with start <= timestamp <= end"""
+        first = bisect.bisect_left(self._entries, start, key=self._timestamp_of)
+        last = bisect.bisect_right(self._entries, end, key=self._timestamp_of)
+        return self._entries[first:last]
+
+    @staticmethod
+    def _timestamp_of(entry: tuple[float, str]) -> float:
+        return entry[0]
+
+
+class StringPool:
+    """Stores each distinct string once and hands out integer codes for it
+
+    A pool loaded from a snapshot decodes strings straight from the mapped
+    buffer and only builds its lookup tables once a new string is added.
+    """
+
+    def __init__(self) -> None:
+        self._strings: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._offsets: memoryview | None = None
+        self._blob: memoryview | None = None
+
+    @classmethod
+    def from_buffers(cls, offsets: memoryview, blob: memoryview) -> "StringPool":
+        """Creates a read-through pool over snapshot offsets and UTF-8 data"""
+        pool = cls()
+        pool._offsets = offsets
+        pool._blob = blob
+        return pool
+
+    def __len__(self) -> int:
+        if self._offsets is not None:
+            return len(self._offsets) - 1
+        return len(self._strings)
+
+    @property
+    def snapshot_backed(self) -> bool:
+        """Whether strings are still read from the buffers of a loaded snapshot"""
+        return self._offsets is not None
+
+    def code(self, value: str) -> int:
+        """Returns the code of a string, adding it to the pool if needed"""
+        self._thaw()
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._strings)
+            self._strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def get(self, code: int) -> str:
+        """Returns the string stored under a code"""
+        if self._offsets is not None and self._blob is not None:
+            start, end = self._offsets[code], self._offsets[code + 1]
+            return str(self._blob[start:end], "utf-8")
+        return self._strings[code]
+
+    def to_buffers(self) -> tuple[Any, Any]:
+        """Returns (offsets, utf8_data) buffers describing every string"""
+        if self._offsets is not None and self._blob is not None:
+            return self._offsets, self._blob
+
+        offsets = array("q", [0])
+        encoded = [value.encode("utf-8") for value in self._strings]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        return offsets, b"".join(encoded)
+
+    def _thaw(self) -> None:
+        """Decodes snapshot-backed strings so new strings can be added"""
+        if self._offsets is None:
+            return
+        self._strings = [self.get(code) for code in range(len(self))]
+        self._codes = {value: code for code, value in enumerate(self._strings)}
+        self._offsets = None
+        self._blob = None
+
+
+EVENT_FLOAT_FIELDS = ("latitude", "longitude", "ticket_price")
+EVENT_INT_FIELDS = ("max_attendees", "attendees")
+EVENT_STRING_FIELDS = tuple(
+    field.name
+    for field in fields(Event)
+    if field.name not in EVENT_FLOAT_FIELDS + EVENT_INT_FIELDS
+)
+
+
+class CompactEventStore(MutableMapping[str, Event]):
+    """Column-oriented event storage behind a dict-like interface
+
+    Numbers live in typed arrays and strings are stored once in a shared pool,
+    so a row costs a few dozen bytes instead of a full object. Reading an id
+    builds a fresh Event from its row; assign the event back to persist
+    changes made to it. Strings that no stored event uses any more stay in
+    the pool until compact() rebuilds it.
+    """
+
+    FLOAT_FIELDS = EVENT_FLOAT_FIELDS
+    INT_FIELDS = EVENT_INT_FIELDS
+    STRING_FIELDS = EVENT_STRING_FIELDS
+    TYPECODES = {
+        **dict.fromkeys(EVENT_FLOAT_FIELDS, "d"),
+        **dict.fromkeys(EVENT_INT_FIELDS, "q"),
+        **dict.fromkeys(EVENT_STRING_FIELDS, "i"),
+    }
+
+    def __init__(self) -> None:
+        self.strings = StringPool()
+        self._columns: dict[str, Any] = {
+            name: array(typecode) for name, typecode in self.TYPECODES.items()
+        }
+        self._rows: dict[str, int] = {}
+        self._free_rows: list[int] = []
+
+    @classmethod
+    def from_columns(
+        cls, columns: dict[str, Any], strings: StringPool
+    ) -> "CompactEventStore":
+        """Wraps existing columns, e.g. memoryviews over a snapshot, without copying"""
+        store = cls()
+        store.strings = strings
+        store._columns = columns
+        store._rows = {strings.get(code): row for row, code in enumerate(columns["id"])}
+        return store
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __contains__(self, event_id: object) -> bool:
+        return event_id in self._rows
+
+    def __getitem__(self, event_id: str) -> Event:
+        row = self._rows[event_id]
+        values: dict[str, Any] = {
+            name: self._columns[name][row]
+            for name in self.FLOAT_FIELDS + self.INT_FIELDS
+        }
+        for name in self.STRING_FIELDS:
+            values[name] = self.strings.get(self._columns[name][row])
+        return Event(**values)
+
+    def __setitem__(self, event_id: str, event: Event) -> None:
+        row = self._rows.get(event_id)
+        if row is None:
+            row = self._allocate_row()
+            self._rows[event_id] = row
+
+        for name in self.FLOAT_FIELDS + self.INT_FIELDS:
+            self._columns[name][row] = getattr(event, name)
+        for name in self.STRING_FIELDS:
+            self._columns[name][row] = self.strings.code(getattr(event, name))
+
+    def __delitem__(self, event_id: str) -> None:
+        self._free_rows.append(self._rows.pop(event_id))
+
+    def columns_in_order(self) -> dict[str, Any]:
+        """Returns new column mapping with one row per event in iteration order"""
+        rows = list(self._rows.values())
+        if rows == list(range(len(self._columns["id"]))):
+            # Callers may add columns to the mapping, never to the store's own
+            return dict(self._columns)
+        return {
+            name: array(self.TYPECODES[name], (column[row] for row in rows))
+            for name, column in self._columns.items()
+        }
+
+    def compact(self) -> None:
+        """Drops deleted rows and the strings no stored event uses any more"""
+        if self.strings.snapshot_backed and not self._free_rows:
+            return  # Nothing was added or deleted since the snapshot was loaded
+
+        columns = self.columns_in_order()
+        strings = StringPool()
+        for name in self.STRING_FIELDS:
+            columns[name] = array(
+                "i", (strings.code(self.strings.get(code)) for code in columns[name])
+            )
+        self.strings = strings
+        self._columns = columns
+        self._rows = {event_id: row for row, event_id in enumerate(self._rows)}
+        self._free_rows = []
+
+    def _allocate_row(self) -> int:
+        """Reuses a deleted row or grows every column by one"""
+        if self._free_rows:
+            return self._free_rows.pop()
+        for name, column in self._columns.items():
+            if isinstance(column, memoryview):
+                # Snapshot-backed columns are fixed-size; copy them on growth
+                column = self._columns[name] = array(self.TYPECODES[name], column)
+            column.append(0)
+        return len(self._columns["id"]) - 1
+
+
+SNAPSHOT_MAGIC = b"EVMSNAP1"
+SNAPSHOT_VERSION = 1
+
+
+def _record_typecodes(record_type: type) -> dict[str, str]:
+    """Maps each dataclass field to the array typecode used to store it"""
+    typecodes = {float: "d", int: "q", str: "i"}
+    return {field.name: typecodes[field.type] for field in fields(record_type)}  # type: ignore[index]
+
+
+def _encode_records(
+    records: Iterable[Any], record_type: type, strings: StringPool
+) -> dict[str, Any]:
+    """Turns dataclass records into columns, storing strings as pool codes"""
+    typecodes = _record_typecodes(record_type)
+    columns = {name: array(typecode) for name, typecode in typecodes.items()}
+    for record in records:
+        for name, typecode in typecodes.items():
+            value = getattr(record, name)
+            columns[name].append(strings.code(value) if typecode == "i" else value)
+    return columns
+
+
+def _decode_records(
+    columns: dict[str, Any], record_type: type, strings: StringPool
+) -> list[Any]:
+    """Builds dataclass records back from snapshot columns"""
+    typecodes = _record_typecodes(record_type)
+    row_count = len(columns["id"])
+    return [
+        record_type(
+            **{
+                name: (
+                    strings.get(columns[name][row])
+                    if typecode == "i"
+                    else columns[name][row]
+                )
+                for name, typecode in typecodes.items()
+            }
+        )
+        for row in range(row_count)
+    ]
+
+
 class EventManager:
     """Manages events, venues, and notifications with data clumps"""
 
-    def __init__(self) -> None:
-        self.events: dict[str, Event] = {}
+    def __init__(self, compact: bool = False) -> None:
+        """Creates an empty manager
+
+        With compact=True events are stored in columns and the events it
+        returns are copies of their rows. Changes to a returned event are
+        only stored once it is assigned back to self.events, which the
+        update methods do.
+        """
+        self.compact = compact
+        self.events: MutableMapping[str, Event] = CompactEventStore() if compact else {}
         self.venues: dict[str, Venue] = {}
         self.notifications: dict[str, Notification] = {}
+        self.series: dict[str, RecurringSeries] = {}
+        self._series_cache: OrderedDict[str, list[Event]] = OrderedDict()
+        self._event_locations = GeoGridIndex()
+        self._series_locations = GeoGridIndex()
+        self._venue_locations = GeoGridIndex()
+        self._timeline = TimelineIndex()
+        self._snapshot: mmap.mmap | None = None
 
     def create_event(
         self,
@@ -144,6 +803,8 @@ class EventManager:
         if not self._is_valid_contact(organizer_name, organizer_email, organizer_phone):
             raise ValueError("Invalid organizer contact information")
 
+        start_timestamp = self._to_utc_timestamp(date, start_time, timezone_str)
+
         event_id = self._generate_id()
         event = Event(
             id=event_id,
@@ -169,8 +830,73 @@ class EventManager:
         )
 
         self.events[event_id] = event
+        self._event_locations.insert(event_id, latitude, longitude)
+        self._timeline.insert(event_id, start_timestamp)
         return event
 
+    def create_events_bulk(self, rows: Iterable[dict[str, Any]]) -> list[Event]:
+        """Creates many events, validating the whole batch before storing any
+
+        Each row holds the keyword arguments of create_event. If any row is
+        invalid, a ValueError listing every failing row is raised and no
+        event is stored.
+        """
+
+        batch = [{"max_attendees": 100, "ticket_price": 0.0, **row} for row in rows]
+
+        errors = []
+        start_timestamps = []
+        for index, row in enumerate(batch):
+            error = self._find_event_row_error(row)
+            if error is None:
+                # Everything that can fail runs here, before any event is stored
+                try:
+                    start_timestamps.append(
+                        self._to_utc_timestamp(
+                            row["date"], row["start_time"], row["timezone_str"]
+                        )
+                    )
+                except ValueError:
+                    error = "Invalid time format"
+            if error is not None:
+                errors.append(f"Row {index}: {error}")
+        if errors:
+            raise ValueError("; ".join(errors))
+
+        events = [
+            Event(
+                id=self._generate_id(),
+                title=row["title"],
+                description=row["description"],
+                date=row["date"],
+                start_time=row["start_time"],
+                end_time=row["end_time"],
+                timezone=row["timezone_str"],
+                street=row["street"],
+                city=row["city"],
+                country=row["country"],
+                postal_code=row["postal_code"],
+                latitude=row["latitude"],
+                longitude=row["longitude"],
+                organizer_name=row["organizer_name"],
+                organizer_email=row["organizer_email"],
+                organizer_phone=row["organizer_phone"],
+                max_attendees=row["max_attendees"],
+                ticket_price=row["ticket_price"],
+                attendees=0,
+                status="active",
+            )
+            for row in batch
+        ]
+
+        for event in events:
+            self.events[event.id] = event
+            self._event_locations.insert(event.id, event.latitude, event.longitude)
+        self._timeline.insert_many(
+            zip((event.id for event in events), start_timestamps, strict=True)
+        )
+        return events
+
     def update_event_timing(
         self,
         event_id: str,
@@ -197,11 +923,15 @@ class EventManager:
         if not self._is_time_range_valid(start_time, end_time):
             raise ValueError("End time must be after start time")
 
+        start_timestamp = self._to_utc_timestamp(date, start_time, timezone_str)
+
         event = self.events[event_id]
         event.date = date
         event.start_time = start_time
         event.end_time = end_time
         event.timezone = timezone_str
+        self.events[event_id] = event
+        self._timeline.insert(event_id, start_timestamp)
 
         return True
 
@@ -235,6 +965,8 @@ class EventManager:
         event.postal_code = postal_code
         event.latitude = latitude
         event.longitude = longitude
+        self.events[event_id] = event
+        self._event_locations.insert(event_id, latitude, longitude)
 
         return True
 
@@ -285,7 +1017,11 @@ class EventManager:
             status="active",
         )
 
+        if self.compact:
+            self._intern_strings(venue)
+
         self.venues[venue_id] = venue
+        self._venue_locations.insert(venue_id, latitude, longitude)
         return venue
 
     def send_event_notification(
@@ -379,10 +1115,100 @@ class EventManager:
             )
 
             self.events[event_id] = event
+            self._event_locations.insert(
+                event_id, base_event.latitude, base_event.longitude
+            )
+            self._timeline.insert(
+                event_id, self._to_utc_timestamp(event_date, start_time, timezone_str)
+            )
             recurring_events.append(event)
 
         return recurring_events
 
+    def schedule_recurring_series(
+        self,
+        base_event_id: str,
+        pattern: str,
+        occurrences: int,
+        start_date: str,
+        start_time: str,
+        end_time: str,
+        timezone_str: str,
+    ) -> RecurringSeries:
+        """Schedules recurring event as one series record expanded on demand"""
+
+        if base_event_id not in self.events:
+            raise ValueError("Base event not found")
+
+        if pattern not in RECURRENCE_PATTERNS:
+            raise ValueError("Invalid recurrence pattern")
+
+        # Validate date and time
+        if not self._is_valid_date(start_date):
+            raise ValueError("Invalid date format")
+
+        if not self._is_valid_time(start_time) or not self._is_valid_time(end_time):
+            raise ValueError("Invalid time format")
+
+        if not self._is_valid_timezone(timezone_str):
+            raise ValueError("Invalid timezone")
+
+        if not self._is_time_range_valid(start_time, end_time):
+            raise ValueError("End time must be after start time")
+
+        base_event = self.events[base_event_id]
+        series_id = self._generate_id()
+        template = replace(
+            base_event,
+            id=series_id,
+            title=base_event.title + " (Recurring)",
+            date=start_date,
+            start_time=start_time,
+            end_time=end_time,
+            timezone=timezone_str,
+            attendees=0,
+            status="active",
+        )
+        series = RecurringSeries(
+            id=series_id,
+            base_event_id=base_event_id,
+            pattern=pattern,
+            occurrences=occurrences,
+            start_date=start_date,
+            template=template,
+        )
+
+        self.series[series_id] = series
+        self._series_locations.insert(series_id, template.latitude, template.longitude)
+        return series
+
+    def iter_series_occurrences(self, series_id: str) -> Iterator[Event]:
+        """Yields the occurrences of a series one at a time"""
+
+        if series_id not in self.series:
+            raise ValueError("Series not found")
+
+        series = self.series[series_id]
+        return self._expand_series(series, range(series.occurrences))
+
+    def materialize_series(self, series_id: str) -> list[Event]:
+        """Turns a series into stored events, keeping the occurrence ids"""
+
+        events = list(self.iter_series_occurrences(series_id))
+        del self.series[series_id]
+        self._series_cache.pop(series_id, None)
+        self._series_locations.remove(series_id)
+
+        for event in events:
+            self.events[event.id] = event
+            self._event_locations.insert(event.id, event.latitude, event.longitude)
+            self._timeline.insert(
+                event.id,
+                self._to_utc_timestamp(event.date, event.start_time, event.timezone),
+            )
+
+        return events
+
     def calculate_distance(
         self, lat1: float, lon1: float, lat2: float, lon2: float
     ) -> float:
@@ -393,17 +1219,63 @@ class EventManager:
         ):
             raise ValueError("Invalid coordinates")
 
-        earth_radius = 6371  # Earth's radius in kilometers
+        return _haversine_km(lat1, lon1, lat2, lon2)
+
+    def calculate_distances(
+        self, origins: Any, targets: Any, pairwise: bool = False
+    ) -> Any:
+        """Calculates distances in kilometers between many coordinate points
 
-        d_lat = math.radians(lat2 - lat1)
-        d_lon = math.radians(lon2 - lon1)
+        origins and targets may be NumPy arrays of shape (n, 2), sequences of
+        (latitude, longitude) pairs or flat interleaved buffers such as
+        array("d"). Returns an n x m matrix, or a vector of length n when
+        pairwise is set. The result is a NumPy array if NumPy is installed.
+        """
 
-        a = math.sin(d_lat / 2) * math.sin(d_lat / 2) + math.cos(
-            math.radians(lat1)
-        ) * math.cos(math.radians(lat2)) * math.sin(d_lon / 2) * math.sin(d_lon / 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        return _haversine_batch_km(origins, targets, pairwise)
 
-        return earth_radius * c
+    def find_events_near(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> list[Event]:
+        """Finds events within radius_km of a point, nearest first
+
+        Occurrences of recurring series are expanded once and reused by later
+        queries, so treat them as read-only; materialize_series turns them
+        into stored events that can be changed.
+        """
+
+        if not self._is_valid_coordinates(latitude, longitude):
+            raise ValueError("Invalid coordinates")
+
+        if radius_km < 0:
+            raise ValueError("Radius must not be negative")
+
+        matches = self._event_locations.query_radius(latitude, longitude, radius_km)
+        nearby_events = [
+            (distance, self.events[event_id]) for distance, event_id in matches
+        ]
+
+        # Occurrences of a series share its location, so every one matches
+        for distance, series_id in self._series_locations.query_radius(
+            latitude, longitude, radius_km
+        ):
+            nearby_events.extend(
+                (distance, event) for event in self._cached_occurrences(series_id)
+            )
+
+        nearby_events.sort(key=lambda match: match[0])
+        return [event for _, event in nearby_events]
+
+    def find_nearest_venues(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[Venue]:
+        """Finds the k venues closest to a point, nearest first"""
+
+        if not self._is_valid_coordinates(latitude, longitude):
+            raise ValueError("Invalid coordinates")
+
+        matches = self._venue_locations.nearest(latitude, longitude, k)
+        return [self.venues[venue_id] for _, venue_id in matches]
 
     def find_events_in_date_range(
         self,
@@ -413,7 +1285,7 @@ class EventManager:
         end_time: str,
         timezone_str: str,
     ) -> list[Event]:
-        """Finds events within date range"""
+        """Finds events starting within date range, interpreted in timezone_str"""
 
         # Validate date and time
         if not self._is_valid_date(start_date) or not self._is_valid_date(end_date):
@@ -425,15 +1297,30 @@ class EventManager:
         if not self._is_valid_timezone(timezone_str):
             raise ValueError("Invalid timezone")
 
-        matching_events = []
+        range_start = self._to_utc_timestamp(start_date, start_time, timezone_str)
+        range_end = self._to_utc_timestamp(end_date, end_time, timezone_str)
 
-        for event in self.events.values():
-            if self._is_event_in_date_range(
-                event, start_date, start_time, end_date, end_time, timezone_str
-            ):
-                matching_events.append(event)
+        stored_events = (
+            (timestamp, self.events[event_id])
+            for timestamp, event_id in self._timeline.entries(range_start, range_end)
+        )
+        series_events = sorted(
+            (
+                match
+                for series in self.series.values()
+                for match in self._series_occurrences_between(
+                    series, range_start, range_end
+                )
+            ),
+            key=lambda match: match[0],
+        )
 
-        return matching_events
+        return [
+            event
+            for _, event in heapq.merge(
+                stored_events, series_events, key=lambda match: match[0]
+            )
+        ]
 
     def convert_time_to_timezone(
         self, date: str, time: str, from_timezone: str, to_timezone: str
@@ -452,8 +1339,8 @@ class EventManager:
             raise ValueError("Invalid timezone")
 
         # Create datetime in source timezone
-        from_tz = pytz.timezone(from_timezone)
-        to_tz = pytz.timezone(to_timezone)
+        from_tz = _get_timezone(from_timezone)
+        to_tz = _get_timezone(to_timezone)
 
         date_time_str = f"{date} {time}"
         naive_dt = datetime.strptime(date_time_str, "%Y-%m-%d %H:%M:%S")
@@ -466,28 +1353,238 @@ class EventManager:
             timezone=to_timezone,
         )
 
+    def convert_times_bulk(
+        self, rows: Iterable[tuple[str, str, str]], to_timezone: str
+    ) -> TimeConversionBatch:
+        """Converts many (date, time, from_timezone) rows to one timezone
+
+        Rows are grouped by source zone so every zone is resolved once, and
+        zones with a fixed UTC offset skip pytz localization entirely. The
+        result keeps the input order.
+        """
+
+        if not self._is_valid_timezone(to_timezone):
+            raise ValueError("Invalid timezone")
+
+        batch = list(rows)
+        rows_by_zone: dict[str, list[int]] = {}
+        for index, (_, _, from_timezone) in enumerate(batch):
+            rows_by_zone.setdefault(from_timezone, []).append(index)
+
+        timestamps = array("q", bytes(8 * len(batch)))
+        for from_timezone, indices in rows_by_zone.items():
+            if not self._is_valid_timezone(from_timezone):
+                raise ValueError(f"Row {indices[0]}: Invalid timezone")
+
+            from_tz = _get_timezone(from_timezone)
+            from_offset = _fixed_utc_offset_seconds(from_timezone)
+            localized: dict[int, int] = {}
+            for index in indices:
+                date, time, _ = batch[index]
+                local_seconds = self._local_epoch_seconds(index, date, time)
+                if from_offset is not None:
+                    timestamps[index] = local_seconds - from_offset
+                    continue
+                if local_seconds not in localized:
+                    naive_dt = EPOCH + timedelta(seconds=local_seconds)
+                    localized[local_seconds] = int(
+                        from_tz.localize(naive_dt).timestamp()
+                    )
+                timestamps[index] = localized[local_seconds]
+
+        to_tz = _get_timezone(to_timezone)
+        to_offset = _fixed_utc_offset_seconds(to_timezone)
+        dates = []
+        times = []
+        for timestamp in timestamps:
+            if to_offset is None:
+                local_dt = datetime.fromtimestamp(timestamp, to_tz)
+                local_seconds = int(
+                    (local_dt.replace(tzinfo=None) - EPOCH).total_seconds()
+                )
+            else:
+                local_seconds = timestamp + to_offset
+            day, seconds = divmod(local_seconds, SECONDS_PER_DAY)
+            hours, seconds = divmod(seconds, 3600)
+            minutes, seconds = divmod(seconds, 60)
+            dates.append(_date_for_epoch_day(day))
+            times.append(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+
+        return TimeConversionBatch(
+            timezone=to_timezone, dates=dates, times=times, timestamps=timestamps
+        )
+
+    def save_snapshot(self, path: str | os.PathLike[str]) -> None:
+        """Writes events, venues and notifications to a columnar snapshot file
+
+        The file starts with a magic marker and a JSON header describing where
+        each column lives. Columns are raw native-endian arrays aligned to
+        8 bytes, and all strings share one pool of UTF-8 data, so the file can
+        be memory-mapped and used without parsing. A compact store is compacted
+        first, so the file holds no deleted rows or unused strings.
+        """
+
+        if isinstance(self.events, CompactEventStore):
+            self.events.compact()
+            strings = self.events.strings
+            event_columns = self.events.columns_in_order()
+        else:
+            strings = StringPool()
+            event_columns = _encode_records(self.events.values(), Event, strings)
+        event_columns["start_timestamp"] = array(
+            "d", (self._timeline.get(event_id) for event_id in self.events)
+        )
+
+        tables = {
+            "events": event_columns,
+            "venues": _encode_records(self.venues.values(), Venue, strings),
+            "notifications": _encode_records(
+                self.notifications.values(), Notification, strings
+            ),
+        }
+        string_offsets, string_data = strings.to_buffers()
+
+        blocks: list[Any] = []
+        layout: dict[str, Any] = {}
+        position = 0
+
+        def add_block(buffer: Any, typecode: str) -> dict[str, Any]:
+            nonlocal position
+            data = memoryview(buffer).cast("B")
+            block = {"offset": position, "length": len(data), "typecode": typecode}
+            blocks.append(data)
+            padding = -len(data) % 8
+            if padding:
+                blocks.append(bytes(padding))
+            position += len(data) + padding
+            return block
+
+        for table_name, columns in tables.items():
+            layout[table_name] = {
+                name: add_block(column, column.typecode)
+                for name, column in columns.items()
+            }
+        layout["string_offsets"] = add_block(string_offsets, "q")
+        layout["string_data"] = add_block(string_data, "B")
+
+        header = json.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "byteorder": sys.byteorder,
+                "layout": layout,
+                "series": [asdict(series) for series in self.series.values()],
+            }
+        ).encode("utf-8")
+        header += b" " * (-(len(SNAPSHOT_MAGIC) + 8 + len(header)) % 8)
+
+        with open(path, "wb") as snapshot_file:
+            snapshot_file.write(SNAPSHOT_MAGIC)
+            snapshot_file.write(len(header).to_bytes(8, "little"))
+            snapshot_file.write(header)
+            for block in blocks:
+                snapshot_file.write(block)
+
+    @classmethod
+    def load_snapshot(
+        cls, path: str | os.PathLike[str], compact: bool = True
+    ) -> "EventManager":
+        """Opens a snapshot written by save_snapshot
+
+        In compact mode the event columns are memoryviews over a private
+        (copy-on-write) mapping of the file, so processes loading the same
+        snapshot share its pages until they modify them. Events are neither
+        re-validated nor copied; only ids are decoded to build the indexes.
+        """
+
+        with open(path, "rb") as snapshot_file:
+            mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if mapped[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            mapped.close()
+            raise ValueError("Invalid snapshot file")
+
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        header_length = int.from_bytes(
+            mapped[len(SNAPSHOT_MAGIC) : header_start], "little"
+        )
+        header = json.loads(mapped[header_start : header_start + header_length])
+        if (
+            header["version"] != SNAPSHOT_VERSION
+            or header["byteorder"] != sys.byteorder
+        ):
+            mapped.close()
+            raise ValueError("Unsupported snapshot format")
+
+        data = memoryview(mapped)[header_start + header_length :]
+
+        def column(block: dict[str, Any]) -> memoryview:
+            view = data[block["offset"] : block["offset"] + block["length"]]
+            return view.cast(block["typecode"])
+
+        layout = header["layout"]
+        strings = StringPool.from_buffers(
+            column(layout["string_offsets"]), column(layout["string_data"])
+        )
+        tables = {
+            table_name: {name: column(block) for name, block in blocks.items()}
+            for table_name, blocks in layout.items()
+            if table_name not in ("string_offsets", "string_data")
+        }
+
+        manager = cls(compact=compact)
+        manager._snapshot = mapped
+
+        event_columns = tables["events"]
+        start_timestamps = event_columns.pop("start_timestamp")
+        if compact:
+            manager.events = CompactEventStore.from_columns(event_columns, strings)
+        else:
+            manager.events = {
+                event.id: event
+                for event in _decode_records(event_columns, Event, strings)
+            }
+
+        event_ids = list(manager.events)
+        latitudes = event_columns["latitude"]
+        longitudes = event_columns["longitude"]
+        for row, event_id in enumerate(event_ids):
+            manager._event_locations.insert(event_id, latitudes[row], longitudes[row])
+        manager._timeline.insert_many(zip(event_ids, start_timestamps, strict=True))
+
+        for venue in _decode_records(tables["venues"], Venue, strings):
+            if compact:
+                manager._intern_strings(venue)
+            manager.venues[venue.id] = venue
+            manager._venue_locations.insert(venue.id, venue.latitude, venue.longitude)
+
+        for notification in _decode_records(
+            tables["notifications"], Notification, strings
+        ):
+            manager.notifications[notification.id] = notification
+
+        for series_data in header["series"]:
+            series = RecurringSeries(
+                **{**series_data, "template": Event(**series_data["template"])}
+            )
+            manager.series[series.id] = series
+            manager._series_locations.insert(
+                series.id, series.template.latitude, series.template.longitude
+            )
+
+        return manager
+
     # Validation methods (these contain the data clumps logic)
     def _is_valid_date(self, date: str) -> bool:
         """Validates date format"""
-        if not re.match(r"^\d{4}-\d{2}-\d{2}$", date):
-            return False
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-            return True
-        except ValueError:
-            return False
+        return _is_valid_date_string(date)
 
     def _is_valid_time(self, time: str) -> bool:
         """Validates time format"""
-        return bool(re.match(r"^\d{2}:\d{2}:\d{2}$", time))
+        return _is_valid_time_string(time)
 
     def _is_valid_timezone(self, timezone_str: str) -> bool:
         """Validates timezone"""
-        try:
-            pytz.timezone(timezone_str)
-            return True
-        except pytz.exceptions.UnknownTimeZoneError:
-            return False
+        return _get_timezone(timezone_str) is not None
 
     def _is_time_range_valid(self, start_time: str, end_time: str) -> bool:
         """Validates that end time is after start time"""
@@ -510,51 +1607,117 @@ class EventManager:
 
     def _is_valid_contact(self, name: str, email: str, phone: str) -> bool:
         """Validates contact information"""
-        email_pattern = r"^[^\s@]+@[^\s@]+\.[^\s@]+$"
         return (
             name.strip() != ""
-            and re.match(email_pattern, email) is not None
+            and EMAIL_PATTERN.match(email) is not None
             and phone.strip() != ""
         )
 
-    def _is_event_in_date_range(
-        self,
-        event: Event,
-        start_date: str,
-        start_time: str,
-        end_date: str,
-        end_time: str,
-        timezone_str: str,
-    ) -> bool:
-        """Checks if event is within date range"""
-        # Simplified comparison - in real implementation would handle timezone conversion
-        event_datetime = f"{event.date} {event.start_time}"
-        range_start = f"{start_date} {start_time}"
-        range_end = f"{end_date} {end_time}"
+    def _find_event_row_error(self, row: dict[str, Any]) -> str | None:
+        """Returns the first validation error of a bulk event row, if any"""
+        for field_name in EVENT_ROW_FIELDS:
+            if field_name not in row:
+                return f"Missing field '{field_name}'"
+
+        if not self._is_valid_date(row["date"]):
+            return "Invalid date format"
+        if not self._is_valid_time(row["start_time"]) or not self._is_valid_time(
+            row["end_time"]
+        ):
+            return "Invalid time format"
+        if not self._is_valid_timezone(row["timezone_str"]):
+            return "Invalid timezone"
+        if not self._is_time_range_valid(row["start_time"], row["end_time"]):
+            return "End time must be after start time"
+        if not self._is_valid_address(
+            row["street"], row["city"], row["country"], row["postal_code"]
+        ):
+            return "Invalid address information"
+        if not self._is_valid_coordinates(row["latitude"], row["longitude"]):
+            return "Invalid coordinates"
+        if not self._is_valid_contact(
+            row["organizer_name"], row["organizer_email"], row["organizer_phone"]
+        ):
+            return "Invalid organizer contact information"
+        return None
+
+    def _local_epoch_seconds(self, index: int, date: str, time: str) -> int:
+        """Converts a validated bulk row to seconds since the epoch, ignoring zones"""
+        if not self._is_valid_date(date):
+            raise ValueError(f"Row {index}: Invalid date format")
+        if not self._is_valid_time(time):
+            raise ValueError(f"Row {index}: Invalid time format")
+
+        hours, minutes, seconds = int(time[:2]), int(time[3:5]), int(time[6:])
+        return (
+            _epoch_day(date) * SECONDS_PER_DAY + hours * 3600 + minutes * 60 + seconds
+        )
 
-        return range_start <= event_datetime <= range_end
+    def _to_utc_timestamp(self, date: str, time: str, timezone_str: str) -> float:
+        """Converts a local date and time in the given timezone to a UTC timestamp"""
+        naive_dt = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M:%S")
+        tz = _get_timezone(timezone_str)
+        return float(tz.localize(naive_dt).timestamp())
 
     def _calculate_next_date(
         self, base_date: str, pattern: str, occurrence: int
     ) -> str:
         """Calculates next date based on pattern"""
         date = datetime.strptime(base_date, "%Y-%m-%d")
+        return _shift_date(date, pattern, occurrence).strftime("%Y-%m-%d")
+
+    def _expand_series(
+        self, series: RecurringSeries, indices: range
+    ) -> Iterator[Event]:
+        """Yields the series occurrences for the given indices"""
+        start = datetime.strptime(series.start_date, "%Y-%m-%d")
+        for index in indices:
+            yield replace(
+                series.template,
+                id=series.occurrence_id(index),
+                date=_shift_date(start, series.pattern, index).strftime("%Y-%m-%d"),
+            )
 
-        if pattern == "daily":
-            from datetime import timedelta
-
-            date += timedelta(days=occurrence)
-        elif pattern == "weekly":
-            from datetime import timedelta
-
-            date += timedelta(weeks=occurrence)
-        elif pattern == "monthly":
-            month = date.month + occurrence
-            year = date.year + (month - 1) // 12
-            month = ((month - 1) % 12) + 1
-            date = date.replace(year=year, month=month)
-
-        return date.strftime("%Y-%m-%d")
+    def _cached_occurrences(self, series_id: str) -> list[Event]:
+        """Returns a series' occurrences, expanding it only on a cache miss"""
+        occurrences = self._series_cache.get(series_id)
+        if occurrences is None:
+            occurrences = list(self.iter_series_occurrences(series_id))
+            self._series_cache[series_id] = occurrences
+            if len(self._series_cache) > SERIES_CACHE_SIZE:
+                self._series_cache.popitem(last=False)
+        else:
+            self._series_cache.move_to_end(series_id)
+        return occurrences
+
+    def _series_occurrences_between(
+        self, series: RecurringSeries, range_start: float, range_end: float
+    ) -> Iterator[tuple[float, Event]]:
+        """Yields (timestamp, occurrence) pairs starting within the range"""
+        start = datetime.strptime(series.start_date, "%Y-%m-%d")
+        start_time = datetime.strptime(series.template.start_time, "%H:%M:%S").time()
+        tz = _get_timezone(series.template.timezone)
+
+        def occurrence_timestamp(index: int) -> float:
+            day = _shift_date(start, series.pattern, index)
+            return float(tz.localize(datetime.combine(day, start_time)).timestamp())
+
+        # Occurrence instants grow with their index, so bisect the virtual list
+        indices = range(series.occurrences)
+        first = bisect.bisect_left(indices, range_start, key=occurrence_timestamp)
+        last = bisect.bisect_right(indices, range_end, key=occurrence_timestamp)
+        matching = indices[first:last]
+        for index, event in zip(
+            matching, self._expand_series(series, matching), strict=True
+        ):
+            yield occurrence_timestamp(index), event
+
+    def _intern_strings(self, record: Venue) -> None:
+        """Replaces the record's strings with interned copies shared by all records"""
+        for field in fields(record):
+            value = getattr(record, field.name)
+            if isinstance(value, str):
+                setattr(record, field.name, sys.intern(value))
 
     def _generate_id(self) -> str:
         """Generates unique ID"""
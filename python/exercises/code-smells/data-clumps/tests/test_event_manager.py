@@ -1,11 +1,14 @@
 import sys
+from array import array
+from dataclasses import asdict, replace
 from pathlib import Path
 
 # Add the src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import event_manager
 import pytest
-from event_manager import EventManager
+from event_manager import Event, EventManager
 
 
 class TestEventManager:
@@ -244,6 +247,45 @@ class TestEventManager:
 
         assert result is False
 
+    def test_create_event_with_out_of_range_time(self):
+        """Test times past 23:59:59 are rejected before anything is stored"""
+        with pytest.raises(ValueError, match="Invalid time format"):
+            self.event_manager.create_event(
+                "Tech Conference",
+                "Description",
+                "2024-09-15",
+                "25:00:00",
+                "26:00:00",
+                "Europe/Berlin",
+                "Musterstraße 123",
+                "Berlin",
+                "Germany",
+                "10115",
+                52.5200,
+                13.4050,
+                "John Doe",
+                "john@example.com",
+                "+49-30-12345678",
+            )
+
+        assert self.event_manager.get_events() == []
+        assert self.event_manager.find_events_near(52.5200, 13.4050, 10) == []
+
+    def test_update_event_timing_with_out_of_range_time(self):
+        """Test an invalid time leaves the event and its index unchanged"""
+        event = self._create_event_at("Berlin Meetup", 52.5200, 13.4050)
+
+        with pytest.raises(ValueError, match="Invalid time format"):
+            self.event_manager.update_event_timing(
+                event.id, "2024-09-20", "10:00:00", "24:00:00", "Europe/London"
+            )
+
+        stored = self.event_manager.events[event.id]
+        assert (stored.date, stored.end_time) == ("2024-09-15", "17:00:00")
+        assert self.event_manager.find_events_in_date_range(
+            "2024-09-15", "00:00:00", "2024-09-15", "23:59:59", "Europe/Berlin"
+        ) == [stored]
+
     def test_update_event_location(self):
         """Test updating event location"""
         event = self.event_manager.create_event(
@@ -406,6 +448,96 @@ class TestEventManager:
                 200.0, 13.4050, 48.1351, 11.5820  # invalid latitude
             )
 
+    def test_calculate_distances_matrix(self):
+        """Test calculating an origins x targets distance matrix"""
+        origins = [(52.5200, 13.4050), (48.1351, 11.5820)]
+        targets = [(48.1351, 11.5820), (50.1109, 8.6821), (52.5200, 13.4050)]
+
+        matrix = self.event_manager.calculate_distances(origins, targets)
+
+        assert len(matrix) == 2
+        for origin, row in zip(origins, matrix, strict=True):
+            expected = [
+                self.event_manager.calculate_distance(*origin, *target)
+                for target in targets
+            ]
+            assert list(row) == pytest.approx(expected)
+
+    def test_calculate_distances_pairwise(self):
+        """Test calculating distances between matching origin and target rows"""
+        origins = array("d", [52.5200, 13.4050, 48.1351, 11.5820])
+        targets = array("d", [48.1351, 11.5820, 50.1109, 8.6821])
+
+        distances = self.event_manager.calculate_distances(
+            origins, targets, pairwise=True
+        )
+
+        assert list(distances) == pytest.approx(
+            [
+                self.event_manager.calculate_distance(
+                    52.5200, 13.4050, 48.1351, 11.5820
+                ),
+                self.event_manager.calculate_distance(
+                    48.1351, 11.5820, 50.1109, 8.6821
+                ),
+            ]
+        )
+
+    def test_calculate_distances_with_numpy(self):
+        """Test the vectorized NumPy path against calculate_distance"""
+        np = pytest.importorskip("numpy")
+        origins = np.array([[52.5200, 13.4050], [48.1351, 11.5820]])
+        targets = np.array([[48.1351, 11.5820], [50.1109, 8.6821]])
+
+        matrix = self.event_manager.calculate_distances(origins, targets)
+        distances = self.event_manager.calculate_distances(
+            origins, targets, pairwise=True
+        )
+
+        assert isinstance(matrix, np.ndarray)
+        assert matrix.shape == (2, 2)
+        for i, origin in enumerate(origins.tolist()):
+            for j, target in enumerate(targets.tolist()):
+                assert matrix[i, j] == pytest.approx(
+                    self.event_manager.calculate_distance(*origin, *target)
+                )
+                if i == j:
+                    assert distances[i] == pytest.approx(matrix[i, j])
+        assert distances.shape == (2,)
+
+    def test_calculate_distances_without_numpy(self, monkeypatch):
+        """Test the pure Python fallback used when NumPy is missing"""
+        monkeypatch.setattr(event_manager, "np", None)
+
+        matrix = self.event_manager.calculate_distances(
+            [(52.5200, 13.4050)], [(48.1351, 11.5820), (52.5200, 13.4050)]
+        )
+        distances = self.event_manager.calculate_distances(
+            [(52.5200, 13.4050)], [(48.1351, 11.5820)], pairwise=True
+        )
+
+        expected = self.event_manager.calculate_distance(
+            52.5200, 13.4050, 48.1351, 11.5820
+        )
+        assert matrix == [[pytest.approx(expected), 0.0]]
+        assert distances == [pytest.approx(expected)]
+
+    def test_calculate_distances_with_invalid_coordinates(self, monkeypatch):
+        """Test batch distances reject invalid coordinates on both paths"""
+        with pytest.raises(ValueError, match="Invalid coordinates"):
+            self.event_manager.calculate_distances([(200.0, 13.4050)], [(0.0, 0.0)])
+
+        monkeypatch.setattr(event_manager, "np", None)
+        with pytest.raises(ValueError, match="Invalid coordinates"):
+            self.event_manager.calculate_distances([(200.0, 13.4050)], [(0.0, 0.0)])
+
+    def test_calculate_distances_pairwise_with_mismatched_lengths(self):
+        """Test pairwise distances require equally long inputs"""
+        with pytest.raises(ValueError, match="equally long"):
+            self.event_manager.calculate_distances(
+                [(52.5200, 13.4050)], [(0.0, 0.0), (1.0, 1.0)], pairwise=True
+            )
+
     def test_find_events_in_date_range(self):
         """Test finding events in date range"""
         self.event_manager.create_event(
@@ -467,3 +599,715 @@ class TestEventManager:
             self.event_manager.convert_time_to_timezone(
                 "2024-09-15", "14:00:00", "Invalid/Timezone", "America/New_York"
             )
+
+    def _create_event_at(self, title, latitude, longitude, date="2024-09-15"):
+        """Create an event at the given coordinates"""
+        return self.event_manager.create_event(
+            title,
+            "Description",
+            date,
+            "09:00:00",
+            "17:00:00",
+            "Europe/Berlin",
+            "Street 1",
+            "Berlin",
+            "Germany",
+            "10115",
+            latitude,
+            longitude,
+            "John Doe",
+            "john@example.com",
+            "+49-30-12345678",
+        )
+
+    def _register_venue_at(self, name, latitude, longitude):
+        """Register a venue at the given coordinates"""
+        return self.event_manager.register_venue(
+            name,
+            "Description",
+            "Street 1",
+            "Berlin",
+            "Germany",
+            "10115",
+            latitude,
+            longitude,
+            "Jane Doe",
+            "jane@example.com",
+            "+49-30-87654321",
+        )
+
+    def test_changes_to_returned_events_are_stored(self):
+        """Test that events returned by the manager are the stored events"""
+        event = self._create_event_at("Meetup", 52.5200, 13.4050)
+
+        self.event_manager.get_events()[0].attendees += 1
+        event.title = "Renamed Meetup"
+
+        stored = self.event_manager.events[event.id]
+        assert stored.attendees == 1
+        assert stored.title == "Renamed Meetup"
+        assert event == stored
+
+    def test_find_events_near(self):
+        """Test finding events within a radius, nearest first"""
+        self._create_event_at("Munich", 48.1351, 11.5820)
+        farther = self._create_event_at("Brandenburg Gate", 52.5163, 13.3777)
+        nearest = self._create_event_at("Alexanderplatz", 52.5219, 13.4132)
+
+        events = self.event_manager.find_events_near(52.5200, 13.4050, 5)
+
+        assert events == [nearest, farther]
+
+    def test_find_events_near_follows_location_updates(self):
+        """Test that moved events are found at their new location"""
+        event = self._create_event_at("Moving Event", 52.5200, 13.4050)
+
+        self.event_manager.update_event_location(
+            event.id, "Marienplatz 1", "Munich", "Germany", "80331", 48.1374, 11.5755
+        )
+
+        assert self.event_manager.find_events_near(52.5200, 13.4050, 50) == []
+        moved = self.event_manager.find_events_near(48.1351, 11.5820, 5)
+        assert [found.id for found in moved] == [event.id]
+        assert moved[0].city == "Munich"
+
+    def test_find_events_near_across_antimeridian(self):
+        """Test radius queries that wrap around longitude 180"""
+        event = self._create_event_at("Fiji", -17.0, 179.99)
+
+        events = self.event_manager.find_events_near(-17.0, -179.99, 10)
+
+        assert events == [event]
+
+    def test_grid_index_across_antimeridian_with_uneven_cells(self):
+        """Test radius queries near longitude 180 when cells do not divide 360"""
+        index = event_manager.GeoGridIndex(cell_size_deg=7.3)
+        points = {
+            f"point-{lat}-{lon}": (float(lat), lon + 0.25)
+            for lat in range(-60, 61, 6)
+            for lon in range(-180, 180)
+        }
+        for item_id, (latitude, longitude) in points.items():
+            index.insert(item_id, latitude, longitude)
+
+        for latitude, longitude in [(0.0, 179.9), (-17.0, -179.5), (45.0, 178.0)]:
+            distances = {
+                item_id: event_manager._haversine_km(latitude, longitude, lat, lon)
+                for item_id, (lat, lon) in points.items()
+            }
+            expected = sorted(
+                (distance, item_id)
+                for item_id, distance in distances.items()
+                if distance <= 1000
+            )
+            assert index.query_radius(latitude, longitude, 1000) == expected
+
+    def test_find_events_near_with_invalid_coordinates(self):
+        """Test finding events near invalid coordinates"""
+        with pytest.raises(ValueError, match="Invalid coordinates"):
+            self.event_manager.find_events_near(200.0, 13.4050, 5)
+
+    def test_find_nearest_venues(self):
+        """Test finding the k nearest venues"""
+        berlin = self._register_venue_at("Berlin Hall", 52.5200, 13.4050)
+        potsdam = self._register_venue_at("Potsdam Hall", 52.3906, 13.0645)
+        self._register_venue_at("Munich Hall", 48.1351, 11.5820)
+
+        venues = self.event_manager.find_nearest_venues(52.5100, 13.4000, 2)
+
+        assert venues == [berlin, potsdam]
+
+    def test_find_nearest_venues_returns_all_when_k_exceeds_count(self):
+        """Test that k larger than the venue count returns every venue"""
+        berlin = self._register_venue_at("Berlin Hall", 52.5200, 13.4050)
+        sydney = self._register_venue_at("Sydney Hall", -33.8688, 151.2093)
+
+        venues = self.event_manager.find_nearest_venues(52.5200, 13.4050, 5)
+
+        assert venues == [berlin, sydney]
+
+    def test_find_events_in_date_range_honours_timezone(self):
+        """Test that range bounds are interpreted in the given timezone"""
+        event = self._create_event_at("Berlin Morning", 52.5200, 13.4050)
+
+        # 09:00 in Berlin (CEST) is 03:00 in New York (EDT)
+        in_range = self.event_manager.find_events_in_date_range(
+            "2024-09-15", "02:30:00", "2024-09-15", "03:30:00", "America/New_York"
+        )
+        out_of_range = self.event_manager.find_events_in_date_range(
+            "2024-09-15", "08:30:00", "2024-09-15", "09:30:00", "America/New_York"
+        )
+
+        assert in_range == [event]
+        assert out_of_range == []
+
+    def test_find_events_in_date_range_returns_chronological_order(self):
+        """Test that matching events are returned by start instant"""
+        later = self._create_event_at("Later", 52.5200, 13.4050, "2024-09-20")
+        earlier = self._create_event_at("Earlier", 52.5200, 13.4050, "2024-09-15")
+
+        events = self.event_manager.find_events_in_date_range(
+            "2024-09-01", "00:00:00", "2024-09-30", "23:59:59", "Europe/Berlin"
+        )
+
+        assert events == [earlier, later]
+
+    def test_find_events_in_date_range_follows_timing_updates(self):
+        """Test that rescheduled events move within the timeline"""
+        event = self._create_event_at("Moving Event", 52.5200, 13.4050)
+
+        self.event_manager.update_event_timing(
+            event.id, "2024-10-01", "09:00:00", "17:00:00", "Europe/Berlin"
+        )
+
+        september = self.event_manager.find_events_in_date_range(
+            "2024-09-01", "00:00:00", "2024-09-30", "23:59:59", "Europe/Berlin"
+        )
+        october = self.event_manager.find_events_in_date_range(
+            "2024-10-01", "00:00:00", "2024-10-31", "23:59:59", "Europe/Berlin"
+        )
+
+        assert september == []
+        assert [found.id for found in october] == [event.id]
+        assert october[0].date == "2024-10-01"
+
+    def test_find_events_in_date_range_includes_recurring_events(self):
+        """Test that scheduled recurring events are part of the timeline"""
+        base_event = self._create_event_at("Weekly", 52.5200, 13.4050, "2024-08-01")
+        self.event_manager.schedule_recurring_event(
+            base_event.id,
+            "weekly",
+            4,
+            "2024-09-01",
+            "14:00:00",
+            "15:00:00",
+            "Europe/Berlin",
+        )
+
+        events = self.event_manager.find_events_in_date_range(
+            "2024-09-07", "00:00:00", "2024-09-16", "00:00:00", "Europe/Berlin"
+        )
+
+        assert [event.date for event in events] == ["2024-09-08", "2024-09-15"]
+
+    def test_schedule_recurring_series_stores_single_record(self):
+        """Test that a recurring series does not create events up front"""
+        base_event = self._create_event_at("Daily Standup", 52.5200, 13.4050)
+
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "daily",
+            10000,
+            "2024-09-15",
+            "09:00:00",
+            "09:15:00",
+            "Europe/Berlin",
+        )
+
+        assert self.event_manager.get_events() == [base_event]
+        assert series.occurrences == 10000
+        assert series.template.title == "Daily Standup (Recurring)"
+
+    def test_iter_series_occurrences_is_lazy(self):
+        """Test that occurrences are yielded one at a time"""
+        base_event = self._create_event_at("Monthly Review", 52.5200, 13.4050)
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "monthly",
+            24,
+            "2024-11-15",
+            "14:00:00",
+            "15:00:00",
+            "Europe/Berlin",
+        )
+
+        occurrences = self.event_manager.iter_series_occurrences(series.id)
+        first = next(occurrences)
+        second = next(occurrences)
+        third = next(occurrences)
+
+        assert first.id == series.occurrence_id(0)
+        assert [first.date, second.date, third.date] == [
+            "2024-11-15",
+            "2024-12-15",
+            "2025-01-15",
+        ]
+        assert third.start_time == "14:00:00"
+        assert third.attendees == 0
+
+    def test_find_events_in_date_range_includes_series_occurrences(self):
+        """Test that range queries see virtual series occurrences"""
+        base_event = self._create_event_at("Daily", 52.5200, 13.4050, "2024-09-10")
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "daily",
+            3650,
+            "2024-09-01",
+            "08:00:00",
+            "09:00:00",
+            "Europe/Berlin",
+        )
+
+        events = self.event_manager.find_events_in_date_range(
+            "2024-09-09", "12:00:00", "2024-09-11", "12:00:00", "Europe/Berlin"
+        )
+
+        # The 08:00 occurrence on the 10th starts before the 09:00 base event
+        assert [event.id for event in events] == [
+            series.occurrence_id(9),
+            base_event.id,
+            series.occurrence_id(10),
+        ]
+        assert [event.date for event in events] == [
+            "2024-09-10",
+            "2024-09-10",
+            "2024-09-11",
+        ]
+
+    def test_find_events_near_includes_series_occurrences(self):
+        """Test that proximity queries see virtual series occurrences"""
+        base_event = self._create_event_at("Weekly", 52.5200, 13.4050)
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "weekly",
+            3,
+            "2024-10-01",
+            "18:00:00",
+            "20:00:00",
+            "Europe/Berlin",
+        )
+
+        events = self.event_manager.find_events_near(52.5200, 13.4050, 1)
+
+        assert base_event in events
+        assert {event.id for event in events} == {
+            base_event.id,
+            series.occurrence_id(0),
+            series.occurrence_id(1),
+            series.occurrence_id(2),
+        }
+
+    def test_find_events_near_reuses_expanded_series(self):
+        """Test that repeated proximity queries do not rebuild occurrences"""
+        base_event = self._create_event_at("Daily", 52.5200, 13.4050)
+        self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "daily",
+            1000,
+            "2024-10-01",
+            "08:00:00",
+            "09:00:00",
+            "Europe/Berlin",
+        )
+
+        first = self.event_manager.find_events_near(52.5200, 13.4050, 1)
+        second = self.event_manager.find_events_near(52.5200, 13.4050, 1)
+
+        assert len(first) == 1001
+        occurrences = [
+            (a, b) for a, b in zip(first, second, strict=True) if a.id != base_event.id
+        ]
+        assert all(a is b for a, b in occurrences)
+
+    def test_monthly_series_clamps_day_to_month_length(self):
+        """Test monthly rules starting on the 31st use the last day of short months"""
+        base_event = self._create_event_at("Month End", 52.5200, 13.4050)
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "monthly",
+            4,
+            "2024-01-31",
+            "18:00:00",
+            "19:00:00",
+            "Europe/Berlin",
+        )
+
+        occurrences = self.event_manager.iter_series_occurrences(series.id)
+        events = self.event_manager.find_events_in_date_range(
+            "2024-02-01", "00:00:00", "2024-04-30", "23:59:59", "Europe/Berlin"
+        )
+
+        assert [event.date for event in occurrences] == [
+            "2024-01-31",
+            "2024-02-29",
+            "2024-03-31",
+            "2024-04-30",
+        ]
+        assert [event.date for event in events] == [
+            "2024-02-29",
+            "2024-03-31",
+            "2024-04-30",
+        ]
+        assert len(self.event_manager.find_events_near(52.5200, 13.4050, 1)) == 5
+
+    def test_schedule_recurring_series_with_unknown_pattern(self):
+        """Test that unknown recurrence patterns are rejected"""
+        base_event = self._create_event_at("Yearly", 52.5200, 13.4050)
+
+        with pytest.raises(ValueError, match="Invalid recurrence pattern"):
+            self.event_manager.schedule_recurring_series(
+                base_event.id,
+                "yearly",
+                3,
+                "2024-10-01",
+                "18:00:00",
+                "20:00:00",
+                "Europe/Berlin",
+            )
+
+        assert self.event_manager.series == {}
+
+    def test_materialize_series(self):
+        """Test turning a series into stored events"""
+        base_event = self._create_event_at("Weekly", 52.5200, 13.4050)
+        series = self.event_manager.schedule_recurring_series(
+            base_event.id,
+            "weekly",
+            2,
+            "2024-10-01",
+            "18:00:00",
+            "20:00:00",
+            "Europe/Berlin",
+        )
+
+        events = self.event_manager.materialize_series(series.id)
+
+        assert [event.id for event in events] == [
+            series.occurrence_id(0),
+            series.occurrence_id(1),
+        ]
+        assert self.event_manager.get_events() == [base_event, *events]
+        assert series.id not in self.event_manager.series
+        assert (
+            self.event_manager.find_events_in_date_range(
+                "2024-10-01", "00:00:00", "2024-10-31", "23:59:59", "Europe/Berlin"
+            )
+            == events
+        )
+
+    def test_iter_series_occurrences_with_unknown_series(self):
+        """Test expanding a series that does not exist"""
+        with pytest.raises(ValueError, match="Series not found"):
+            list(self.event_manager.iter_series_occurrences("missing"))
+
+    def _event_row(self, **overrides):
+        """Build a create_events_bulk row with valid defaults"""
+        row = {
+            "title": "Bulk Event",
+            "description": "Description",
+            "date": "2024-09-15",
+            "start_time": "09:00:00",
+            "end_time": "17:00:00",
+            "timezone_str": "Europe/Berlin",
+            "street": "Street 1",
+            "city": "Berlin",
+            "country": "Germany",
+            "postal_code": "10115",
+            "latitude": 52.5200,
+            "longitude": 13.4050,
+            "organizer_name": "John Doe",
+            "organizer_email": "john@example.com",
+            "organizer_phone": "+49-30-12345678",
+        }
+        row.update(overrides)
+        return row
+
+    def test_create_events_bulk(self):
+        """Test creating many events in one batch"""
+        events = self.event_manager.create_events_bulk(
+            [
+                self._event_row(title="First", date="2024-09-20"),
+                self._event_row(title="Second", max_attendees=10, ticket_price=5.0),
+            ]
+        )
+
+        assert [event.title for event in events] == ["First", "Second"]
+        assert events[0].max_attendees == 100
+        assert events[0].ticket_price == 0.0
+        assert events[1].max_attendees == 10
+        assert events[1].ticket_price == 5.0
+        assert self.event_manager.get_events() == events
+        assert self.event_manager.find_events_in_date_range(
+            "2024-09-01", "00:00:00", "2024-09-30", "23:59:59", "Europe/Berlin"
+        ) == [events[1], events[0]]
+        nearby = self.event_manager.find_events_near(52.5200, 13.4050, 1)
+        assert sorted(event.id for event in nearby) == sorted(
+            event.id for event in events
+        )
+
+    def test_create_events_bulk_reports_every_invalid_row(self):
+        """Test that a batch with invalid rows is rejected as a whole"""
+        rows = [
+            self._event_row(),
+            self._event_row(date="2024-02-30"),
+            self._event_row(organizer_email="not-an-email"),
+        ]
+
+        with pytest.raises(ValueError) as error:
+            self.event_manager.create_events_bulk(rows)
+
+        assert "Row 1: Invalid date format" in str(error.value)
+        assert "Row 2: Invalid organizer contact information" in str(error.value)
+        assert self.event_manager.get_events() == []
+
+    def test_create_events_bulk_with_out_of_range_time(self, tmp_path):
+        """Test that a row with an impossible time stores no event at all"""
+        rows = [
+            self._event_row(),
+            self._event_row(start_time="24:00:00", end_time="24:30:00"),
+        ]
+
+        with pytest.raises(ValueError, match="Row 1: Invalid time format"):
+            self.event_manager.create_events_bulk(rows)
+
+        assert self.event_manager.get_events() == []
+        assert self.event_manager.find_events_near(52.5200, 13.4050, 10) == []
+        self.event_manager.save_snapshot(tmp_path / "events.snapshot")
+
+    def test_create_events_bulk_with_missing_field(self):
+        """Test that rows missing a required field are rejected"""
+        row = self._event_row()
+        del row["timezone_str"]
+
+        with pytest.raises(ValueError, match="Row 0: Missing field 'timezone_str'"):
+            self.event_manager.create_events_bulk([row])
+
+    def test_cached_validators_reject_invalid_values(self):
+        """Test that cached validation still rejects bad values on repeat calls"""
+        for _ in range(2):
+            assert not self.event_manager._is_valid_date("2024-13-01")
+            assert not self.event_manager._is_valid_timezone("Invalid/Timezone")
+            assert self.event_manager._is_valid_date("2024-12-01")
+            assert self.event_manager._is_valid_timezone("Europe/Berlin")
+
+    def test_convert_times_bulk(self):
+        """Test converting many rows from mixed zones in one call"""
+        rows = [
+            ("2024-09-15", "14:00:00", "Europe/Berlin"),
+            ("2024-09-15", "12:00:00", "UTC"),
+            ("2024-01-15", "14:00:00", "Europe/Berlin"),
+            ("2024-09-15", "23:30:00", "Etc/GMT-2"),
+        ]
+
+        result = self.event_manager.convert_times_bulk(rows, "America/New_York")
+
+        assert len(result) == 4
+        assert result.timezone == "America/New_York"
+        assert result.dates == ["2024-09-15", "2024-09-15", "2024-01-15", "2024-09-15"]
+        assert result.times == ["08:00:00", "08:00:00", "08:00:00", "17:30:00"]
+        assert list(result.timestamps) == [
+            1726401600,
+            1726401600,
+            1705323600,
+            1726435800,
+        ]
+
+    def test_convert_times_bulk_matches_single_conversion(self):
+        """Test bulk results against convert_time_to_timezone"""
+        rows = [
+            ("2024-03-31", "01:30:00", "Europe/Berlin"),
+            ("2024-11-03", "05:30:00", "UTC"),
+            ("2024-12-31", "23:59:59", "Asia/Kolkata"),
+        ]
+
+        result = self.event_manager.convert_times_bulk(rows, "Australia/Sydney")
+
+        for index, (date, time, from_timezone) in enumerate(rows):
+            single = self.event_manager.convert_time_to_timezone(
+                date, time, from_timezone, "Australia/Sydney"
+            )
+            assert (result.dates[index], result.times[index]) == (
+                single.date,
+                single.time,
+            )
+
+    def test_convert_times_bulk_to_fixed_offset_zone(self):
+        """Test converting into a zone without transitions"""
+        result = self.event_manager.convert_times_bulk(
+            [("2024-09-15", "01:00:00", "Europe/Berlin")], "UTC"
+        )
+
+        assert result.dates == ["2024-09-14"]
+        assert result.times == ["23:00:00"]
+
+    def test_convert_times_bulk_with_invalid_rows(self):
+        """Test that invalid bulk rows are reported with their index"""
+        with pytest.raises(ValueError, match="Invalid timezone"):
+            self.event_manager.convert_times_bulk([], "Invalid/Timezone")
+
+        with pytest.raises(ValueError, match="Row 1: Invalid timezone"):
+            self.event_manager.convert_times_bulk(
+                [
+                    ("2024-09-15", "14:00:00", "UTC"),
+                    ("2024-09-15", "14:00:00", "Invalid/Timezone"),
+                ],
+                "UTC",
+            )
+
+        with pytest.raises(ValueError, match="Row 0: Invalid time format"):
+            self.event_manager.convert_times_bulk(
+                [("2024-09-15", "25:00:00", "UTC")], "UTC"
+            )
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test saving and loading every kind of record"""
+        event = self._create_event_at("Snapshot Event", 52.5200, 13.4050)
+        venue = self._register_venue_at("Snapshot Hall", 48.1351, 11.5820)
+        self.event_manager.send_event_notification(
+            event.id, "John Doe", "john@example.com", "+49-30-12345678", "Hello"
+        )
+        series = self.event_manager.schedule_recurring_series(
+            event.id,
+            "weekly",
+            3,
+            "2024-10-01",
+            "18:00:00",
+            "20:00:00",
+            "Europe/Berlin",
+        )
+        path = tmp_path / "events.snapshot"
+
+        self.event_manager.save_snapshot(path)
+        for compact in (True, False):
+            loaded = EventManager.load_snapshot(path, compact=compact)
+
+            assert loaded.get_events() == self.event_manager.get_events()
+            assert loaded.get_venues() == [venue]
+            assert loaded.get_notifications() == self.event_manager.get_notifications()
+            assert loaded.series == self.event_manager.series
+            assert loaded.find_nearest_venues(48.1351, 11.5820, 1) == [venue]
+            assert loaded.find_events_in_date_range(
+                "2024-09-15", "00:00:00", "2024-10-31", "23:59:59", "Europe/Berlin"
+            ) == [
+                loaded.events[event.id],
+                *loaded.iter_series_occurrences(series.id),
+            ]
+
+    def test_snapshot_loaded_events_can_be_updated_and_extended(self, tmp_path):
+        """Test that a memory-mapped snapshot accepts changes and new events"""
+        event = self._create_event_at("Snapshot Event", 52.5200, 13.4050)
+        path = tmp_path / "events.snapshot"
+        self.event_manager.save_snapshot(path)
+
+        loaded = EventManager.load_snapshot(path)
+        loaded.update_event_location(
+            event.id, "Marienplatz 1", "Munich", "Germany", "80331", 48.1374, 11.5755
+        )
+        added = loaded.create_event(
+            "New Event",
+            "Description",
+            "2024-09-16",
+            "09:00:00",
+            "17:00:00",
+            "Europe/Berlin",
+            "Street 2",
+            "Hamburg",
+            "Germany",
+            "20095",
+            53.5511,
+            9.9937,
+            "Jane Doe",
+            "jane@example.com",
+            "+49-40-12345678",
+        )
+
+        assert loaded.events[event.id].city == "Munich"
+        assert loaded.events[added.id] == added
+        assert [found.id for found in loaded.find_events_near(48.1374, 11.5755, 1)] == [
+            event.id
+        ]
+        assert EventManager.load_snapshot(path).events[event.id].city == "Berlin"
+
+    def test_load_snapshot_with_invalid_file(self, tmp_path):
+        """Test loading a file that is not a snapshot"""
+        path = tmp_path / "not-a-snapshot"
+        path.write_bytes(b"definitely not a snapshot file")
+
+        with pytest.raises(ValueError, match="Invalid snapshot file"):
+            EventManager.load_snapshot(path)
+
+
+class TestCompactEventManager(TestEventManager):
+    """Runs every EventManager test against the compact storage mode"""
+
+    def setup_method(self):
+        """Set up a compact EventManager before each test method."""
+        self.event_manager = EventManager(compact=True)
+
+    def test_compact_store_shares_repeated_strings(self):
+        """Test that repeated strings are stored once across events"""
+        first = self._create_event_at("First", 52.5200, 13.4050)
+        second = self._create_event_at("Second", 52.5200, 13.4050)
+
+        stored_first, stored_second = self.event_manager.get_events()
+
+        assert stored_first == first
+        assert stored_second == second
+        assert stored_first.organizer_email is stored_second.organizer_email
+        assert len(self.event_manager.events.strings) < 2 * 15
+
+    def test_compact_store_deletes_and_reuses_rows(self):
+        """Test that deleted rows are reused without changing other events"""
+        first = self._create_event_at("First", 52.5200, 13.4050)
+        second = self._create_event_at("Second", 48.1351, 11.5820)
+
+        del self.event_manager.events[first.id]
+        third = self._create_event_at("Third", 50.1109, 8.6821)
+
+        assert self.event_manager.get_events() == [second, third]
+        assert first.id not in self.event_manager.events
+
+    def test_snapshot_after_row_reuse(self, tmp_path):
+        """Test that saving does not change the store, so later saves still work"""
+        first = self._create_event_at("First", 52.5200, 13.4050)
+        self._create_event_at("Second", 48.1351, 11.5820)
+        self.event_manager.save_snapshot(tmp_path / "before.snapshot")
+
+        del self.event_manager.events[first.id]
+        self._create_event_at("Third", 50.1109, 8.6821)
+        self.event_manager.save_snapshot(tmp_path / "after.snapshot")
+
+        loaded = EventManager.load_snapshot(tmp_path / "after.snapshot")
+        assert [event.title for event in loaded.get_events()] == ["Second", "Third"]
+        assert "start_timestamp" not in self.event_manager.events._columns
+
+    def test_compact_venues_intern_repeated_strings(self):
+        """Test that compact mode interns venue strings"""
+        first = self._register_venue_at("First Hall", 52.5200, 13.4050)
+        second = self._register_venue_at("Second Hall", 52.5200, 13.4050)
+
+        assert first.contact_email is second.contact_email
+
+    def test_changes_to_returned_events_are_stored(self):
+        """Test that compact events are copies that are stored once assigned back"""
+        event = self._create_event_at("Meetup", 52.5200, 13.4050)
+
+        event.title = "Renamed Meetup"
+        assert self.event_manager.events[event.id].title == "Meetup"
+
+        self.event_manager.events[event.id] = event
+        assert self.event_manager.events[event.id] == event
+
+    def test_compact_events_are_plain_events(self):
+        """Test that compact events work with the dataclass helpers"""
+        event = self._create_event_at("Meetup", 52.5200, 13.4050)
+
+        stored = self.event_manager.events[event.id]
+
+        assert type(stored) is Event
+        assert asdict(stored) == asdict(event)
+        assert replace(stored, title="Copy").title == "Copy"
+
+    def test_snapshot_drops_strings_of_changed_events(self, tmp_path):
+        """Test that saving a snapshot removes strings no event uses any more"""
+        event = self._create_event_at("Meetup", 52.5200, 13.4050)
+        self.event_manager.save_snapshot(tmp_path / "first.snapshot")
+        pool_size = len(self.event_manager.events.strings)
+
+        for index in range(50):
+            self.event_manager.events[event.id] = replace(event, title=f"Take {index}")
+        self.event_manager.save_snapshot(tmp_path / "second.snapshot")
+
+        assert len(self.event_manager.events.strings) == pool_size
+        loaded = EventManager.load_snapshot(tmp_path / "second.snapshot")
+        assert loaded.get_events()[0].title == "Take 49"
@@ -1,21 +1,367 @@
 """Customer service module with divergent change code smell."""
 
+import asyncio
+import base64
+import binascii
+import bisect
 import hashlib
+import hmac
+import json
+import os
 import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict, deque
+from collections.abc import Iterator
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any
 
+from customer_password_hashing import PasswordHasher
+
+LOCKOUT_THRESHOLD = 3
+LOCKOUT_WINDOW = timedelta(minutes=15)
+MAX_TRACKED_LOGIN_KEYS = 100_000
+
+# Opt-in flag each campaign channel requires, besides being a preferred channel
+CAMPAIGN_OPT_IN_FLAGS = {
+    "email": "email_marketing",
+    "sms": "sms_marketing",
+    "push": "push_notifications",
+}
+MARKETING_CHANNELS = ["email", "sms", "push", "mail"]
+
+SNAPSHOT_FILE_NAME = "customers.snapshot.json"
+WAL_FILE_NAME = "customers.wal"
+# Record fields that hold datetimes, stored as ISO strings on disk
+DATETIME_FIELDS = ("created_at", "last_login", "logged_in_at", "order_date")
+
+
+class Bitmap:
+    """Growable set of small non-negative integers, one bit per member.
+
+    Bits are set and cleared in place; to_int() exposes the whole set as a
+    Python int so segments can be combined with &, | and ~ in C.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty bitmap."""
+        self._bits = bytearray()
+
+    def add(self, member: int) -> None:
+        """Add a member to the set."""
+        byte_index = member >> 3
+        if byte_index >= len(self._bits):
+            self._bits.extend(bytes(max(byte_index + 1 - len(self._bits), 1024)))
+        self._bits[byte_index] |= 1 << (member & 7)
+
+    def discard(self, member: int) -> None:
+        """Remove a member from the set if present."""
+        byte_index = member >> 3
+        if byte_index < len(self._bits):
+            self._bits[byte_index] &= ~(1 << (member & 7)) & 0xFF
+
+    def to_int(self) -> int:
+        """Return the set as an int whose bit i is set for member i."""
+        return int.from_bytes(self._bits, "little")
+
+
+def iter_bitmap_members(bitmap: int) -> Iterator[int]:
+    """Yield the positions of the set bits of an int, lowest first.
+
+    The int is split into 64-bit words so only non-zero words are visited.
+    """
+    word_count = (bitmap.bit_length() + 63) // 64
+    words = array("Q", bitmap.to_bytes(word_count * 8, "little"))
+    if sys.byteorder == "big":
+        words.byteswap()
+    for word_index, word in enumerate(words):
+        while word:
+            lowest = word & -word
+            yield word_index * 64 + lowest.bit_length() - 1
+            word ^= lowest
+
+
+class IdAllocator:
+    """Hands out increasing integer IDs, safe to share between threads."""
+
+    def __init__(self, start: int = 1) -> None:
+        """Initialize the allocator with the first ID to hand out."""
+        self._next_id = start
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        """Return a new ID, larger than every ID handed out or observed."""
+        with self._lock:
+            allocated = self._next_id
+            self._next_id += 1
+            return allocated
+
+    def observe(self, used_id: int) -> None:
+        """Make sure an ID that is already in use is never handed out."""
+        with self._lock:
+            self._next_id = max(self._next_id, used_id + 1)
+
+
+class AddressBook:
+    """A customer's addresses plus a pointer to the default one."""
+
+    def __init__(self) -> None:
+        """Initialize an empty address book."""
+        self.addresses: dict[int, dict[str, Any]] = {}
+        self.default_id: int | None = None
+        self._ids = IdAllocator()
+
+    def allocate_id(self) -> int:
+        """Reserve the ID of the next address."""
+        return self._ids.allocate()
+
+    def add(self, address_id: int, address: dict[str, Any], make_default: bool) -> None:
+        """Store an address under its ID; the first one becomes the default."""
+        self._ids.observe(address_id)
+        self.addresses[address_id] = {"id": address_id, **address}
+        if make_default or self.default_id is None:
+            self.default_id = address_id
+
+    def set_default(self, address_id: int) -> None:
+        """Point the default at another stored address."""
+        if address_id not in self.addresses:
+            raise ValueError("Address not found")
+        self.default_id = address_id
+
+    def get_default(self) -> dict[str, Any] | None:
+        """Return the default address, if any."""
+        if self.default_id is None:
+            return None
+        return {**self.addresses[self.default_id], "is_default": True}
+
+    def to_dict(self) -> dict[int, dict[str, Any]]:
+        """Return all addresses by ID, flagging the default one."""
+        return {
+            address_id: {**address, "is_default": address_id == self.default_id}
+            for address_id, address in self.addresses.items()
+        }
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log of mutations with group commit.
+
+    append() only queues the encoded record. A background thread writes
+    everything queued so far and makes it durable with a single fsync, so
+    concurrent writers share fsyncs instead of paying one each.
+    """
+
+    def __init__(self, path: Path, commit_interval: float = 0.005) -> None:
+        """Open the log for appending and start the commit thread.
+
+        Args:
+            path: Log file, created if missing
+            commit_interval: Seconds to wait for more records before an fsync
+                when nobody is waiting for durability
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.fsync_count = 0
+        self._file = open(path, "ab")
+        self._pending: list[bytes] = []
+        self._appended = 0
+        self._durable = 0
+        self._waiters = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Serializes file writes with truncate()
+        self._io_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="customer-wal", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, record: dict[str, Any]) -> int:
+        """Queue a record and return its position for wait_durable()."""
+        line = json.dumps(record, default=_encode_json_value).encode() + b"\n"
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-ahead log is closed")
+            self._pending.append(line)
+            self._appended += 1
+            self._condition.notify_all()
+            return self._appended
+
+    def wait_durable(self, position: int) -> None:
+        """Block until the record at a position has been fsynced."""
+        with self._condition:
+            self._waiters += 1
+            self._condition.notify_all()
+            try:
+                while self._durable < position:
+                    self._condition.wait()
+            finally:
+                self._waiters -= 1
+
+    def flush(self) -> None:
+        """Block until every record appended so far has been fsynced."""
+        with self._condition:
+            position = self._appended
+        self.wait_durable(position)
+
+    def truncate(self) -> None:
+        """Drop every durable record; call after flush() while no one appends."""
+        with self._io_lock:
+            self._file.truncate(0)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Commit what is queued, stop the commit thread and close the file."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._file.close()
+
+    def _run(self) -> None:
+        """Commit loop: gather queued records, write them and fsync once."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                if not self._waiters and not self._closed:
+                    # Let more records join this group commit
+                    self._condition.wait(self.commit_interval)
+                batch, self._pending = self._pending, []
+                position = self._appended
+
+            with self._io_lock:
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+            with self._condition:
+                self._durable = position
+                self.fsync_count += 1
+                self._condition.notify_all()
+
+
+def read_wal_records(path: Path) -> tuple[list[dict[str, Any]], int]:
+    """Read the complete records of a log file.
+
+    Returns:
+        The decoded records and the byte length of the intact prefix; a torn
+        last line left by a crash is not part of either
+    """
+    records: list[dict[str, Any]] = []
+    valid_length = 0
+    if not path.exists():
+        return records, valid_length
+
+    with open(path, "rb") as log_file:
+        for line in log_file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                records.append(_decode_record(json.loads(line)))
+            except ValueError:
+                break
+            valid_length += len(line)
+    return records, valid_length
+
+
+def _encode_json_value(value: Any) -> Any:
+    """Encode values json cannot serialize on its own."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _decode_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Turn the ISO strings of known datetime fields back into datetimes."""
+    for field in DATETIME_FIELDS:
+        if isinstance(record.get(field), str):
+            record[field] = datetime.fromisoformat(record[field])
+    return record
+
+
+def _write_file_atomically(path: Path, data: bytes) -> None:
+    """Replace a file so that readers see either the old or the new content."""
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "wb") as temporary_file:
+        temporary_file.write(data)
+        temporary_file.flush()
+        os.fsync(temporary_file.fileno())
+    os.replace(temporary_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
 
 class CustomerService:
     """Service managing all customer-related operations (with divergent change issues)."""
 
-    def __init__(self) -> None:
-        """Initialize customer service with empty storage."""
+    def __init__(
+        self,
+        password_hasher: PasswordHasher | None = None,
+        data_dir: str | Path | None = None,
+        sync_commit: bool = False,
+        commit_interval: float = 0.005,
+        snapshot_every: int = 10_000,
+    ) -> None:
+        """Initialize customer service, restoring persisted state if any.
+
+        Args:
+            password_hasher: Hasher for customer passwords. The default,
+                scrypt at cost 14, deliberately takes about 50 ms per hash,
+                which every registration, login and password change pays;
+                pass a lower cost where that is too slow, e.g. in tests.
+                Hashes made with other parameters, or the legacy unsalted
+                SHA-256 hashes, are upgraded on the next successful login.
+            data_dir: Directory for the write-ahead log and snapshots. Without
+                it all state stays in memory. With it, the newest snapshot and
+                the log records after it are replayed on startup.
+            sync_commit: Wait until each mutation is fsynced before returning.
+                Otherwise mutations are committed in groups within about
+                commit_interval seconds.
+            commit_interval: Seconds the log waits to group records
+            snapshot_every: Logged mutations after which the state is written
+                to a compacted snapshot and the log is emptied
+        """
+        self._password_hasher = password_hasher or PasswordHasher()
         self._customers: dict[int, dict[str, Any]] = {}
-        self._login_attempts: dict[str, list[datetime]] = {}
+        self._customer_ids_by_email: dict[str, int] = {}
+        # Last failed attempts per email, least recently failed first
+        self._login_attempts: OrderedDict[str, deque[datetime]] = OrderedDict()
         self._marketing_preferences: dict[int, dict[str, Any]] = {}
         self._order_history: dict[int, dict[int, dict[str, Any]]] = {}
-        self._addresses: dict[int, dict[int, dict[str, Any]]] = {}
+        # Maintained by record_purchase so reads never re-scan the orders
+        self._spending_history: dict[int, list[dict[str, Any]]] = {}
+        self._order_totals: dict[int, dict[str, Any]] = {}
+        self._addresses: dict[int, AddressBook] = {}
+        self._customer_ids = IdAllocator()
+        # Orders mutations, their log records and the checks they depend on
+        self._write_lock = threading.RLock()
+        # Customers per opt-in flag and per preferred channel, for segments
+        self._opt_in_bitmaps = {
+            flag: Bitmap() for flag in CAMPAIGN_OPT_IN_FLAGS.values()
+        }
+        self._channel_bitmaps = {channel: Bitmap() for channel in MARKETING_CHANNELS}
+
+        self._data_dir = None if data_dir is None else Path(data_dir)
+        self._sync_commit = sync_commit
+        self._snapshot_every = snapshot_every
+        self._last_sequence = 0
+        self._records_since_snapshot = 0
+        self._wal: WriteAheadLog | None = None
+        if self._data_dir is not None:
+            self._data_dir.mkdir(parents=True, exist_ok=True)
+            self._restore()
+            self._wal = WriteAheadLog(
+                self._data_dir / WAL_FILE_NAME, commit_interval=commit_interval
+            )
 
     def register_customer(
         self, email: str, password: str, first_name: str, last_name: str
@@ -43,29 +389,26 @@ class CustomerService:
         if not first_name or not last_name:
             raise ValueError("First name and last name are required")
 
-        for customer in self._customers.values():
-            if customer["email"] == email:
-                raise ValueError("Customer with this email already exists")
+        if email in self._customer_ids_by_email:
+            raise ValueError("Customer with this email already exists")
 
-        customer_id = len(self._customers) + 1
-        self._customers[customer_id] = {
-            "id": customer_id,
-            "email": email,
-            "password": self._hash_password(password),
-            "first_name": first_name,
-            "last_name": last_name,
-            "phone": None,
-            "status": "active",
-            "created_at": datetime.now(),
-            "last_login": None,
-        }
+        hashed_password = self._hash_password(password)
+        with self._write_lock:
+            if email in self._customer_ids_by_email:
+                raise ValueError("Customer with this email already exists")
 
-        self._marketing_preferences[customer_id] = {
-            "email_marketing": True,
-            "sms_marketing": False,
-            "push_notifications": True,
-            "preferred_channels": ["email"],
-        }
+            customer_id = self._customer_ids.allocate()
+            self._commit(
+                {
+                    "type": "customer_registered",
+                    "customer_id": customer_id,
+                    "email": email,
+                    "password": hashed_password,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "created_at": datetime.now(),
+                }
+            )
 
         return customer_id
 
@@ -82,25 +425,51 @@ class CustomerService:
         Raises:
             RuntimeError: If account is locked due to failed attempts
         """
-        customer = self._find_customer_by_email(email)
-
-        if not customer:
-            self._record_failed_login_attempt(email)
+        customer = self._find_customer_for_login(email)
+        if customer is None:
             return None
 
-        if self._is_account_locked(customer["id"]):
-            raise RuntimeError(
-                "Account is temporarily locked due to too many failed attempts"
-            )
+        stored_hash = customer["password"]
+        verified = self._verify_password(password, stored_hash)
+        new_hash = None
+        if verified and self._password_hasher.needs_rehash(stored_hash):
+            new_hash = self._hash_password(password)
 
-        if not self._verify_password(password, customer["password"]):
-            self._record_failed_login_attempt(email)
+        return self._complete_login(customer, email, verified, new_hash)
+
+    async def authenticate_customer_async(
+        self, email: str, password: str
+    ) -> int | None:
+        """Authenticate a customer without blocking the running event loop.
+
+        Password hashing runs on the password hasher's thread pool.
+
+        Args:
+            email: Customer's email address
+            password: Customer's password
+
+        Returns:
+            Customer ID if authentication successful, None otherwise
+
+        Raises:
+            RuntimeError: If account is locked due to failed attempts
+        """
+        customer = self._find_customer_for_login(email)
+        if customer is None:
             return None
 
-        self._clear_failed_login_attempts(customer["id"])
-        self._update_last_login(customer["id"])
+        stored_hash = customer["password"]
+        verified = await asyncio.get_running_loop().run_in_executor(
+            self._password_hasher.executor,
+            self._verify_password,
+            password,
+            stored_hash,
+        )
+        new_hash = None
+        if verified and self._password_hasher.needs_rehash(stored_hash):
+            new_hash = await self._password_hasher.hash_async(password)
 
-        return customer["id"]
+        return self._complete_login(customer, email, verified, new_hash)
 
     def update_contact_information(
         self, customer_id: int, first_name: str, last_name: str, phone: str
@@ -125,9 +494,15 @@ class CustomerService:
         if phone and not self._is_valid_phone(phone):
             raise ValueError("Invalid phone number format")
 
-        self._customers[customer_id]["first_name"] = first_name
-        self._customers[customer_id]["last_name"] = last_name
-        self._customers[customer_id]["phone"] = phone
+        self._commit(
+            {
+                "type": "contact_updated",
+                "customer_id": customer_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "phone": phone,
+            }
+        )
 
     def add_customer_address(
         self,
@@ -160,25 +535,66 @@ class CustomerService:
         if not all([street, city, zip_code, country]):
             raise ValueError("All address fields are required")
 
-        if customer_id not in self._addresses:
-            self._addresses[customer_id] = {}
+        with self._write_lock:
+            address_book = self._addresses.setdefault(customer_id, AddressBook())
+            address_id = address_book.allocate_id()
+            self._commit(
+                {
+                    "type": "address_added",
+                    "customer_id": customer_id,
+                    "address_id": address_id,
+                    "street": street,
+                    "city": city,
+                    "zip_code": zip_code,
+                    "country": country,
+                    "is_default": is_default,
+                }
+            )
 
-        address_id = len(self._addresses[customer_id]) + 1
+        return address_id
 
-        if is_default:
-            for address in self._addresses[customer_id].values():
-                address["is_default"] = False
+    def set_default_address(self, customer_id: int, address_id: int) -> None:
+        """Make one of a customer's addresses the default.
 
-        self._addresses[customer_id][address_id] = {
-            "id": address_id,
-            "street": street,
-            "city": city,
-            "zip_code": zip_code,
-            "country": country,
-            "is_default": is_default or len(self._addresses[customer_id]) == 0,
-        }
+        Args:
+            customer_id: Customer's ID
+            address_id: ID of the address to use as default
 
-        return address_id
+        Raises:
+            ValueError: If customer or address not found
+        """
+        if customer_id not in self._customers:
+            raise ValueError("Customer not found")
+
+        address_book = self._addresses.get(customer_id)
+        if address_book is None or address_id not in address_book.addresses:
+            raise ValueError("Address not found")
+
+        self._commit(
+            {
+                "type": "default_address_set",
+                "customer_id": customer_id,
+                "address_id": address_id,
+            }
+        )
+
+    def get_default_address(self, customer_id: int) -> dict[str, Any] | None:
+        """Get a customer's default address.
+
+        Args:
+            customer_id: Customer's ID
+
+        Returns:
+            The default address, or None if the customer has no addresses
+
+        Raises:
+            ValueError: If customer not found
+        """
+        if customer_id not in self._customers:
+            raise ValueError("Customer not found")
+
+        address_book = self._addresses.get(customer_id)
+        return None if address_book is None else address_book.get_default()
 
     def update_marketing_preferences(
         self,
@@ -203,17 +619,20 @@ class CustomerService:
         if customer_id not in self._customers:
             raise ValueError("Customer not found")
 
-        valid_channels = ["email", "sms", "push", "mail"]
         for channel in preferred_channels:
-            if channel not in valid_channels:
+            if channel not in MARKETING_CHANNELS:
                 raise ValueError(f"Invalid marketing channel: {channel}")
 
-        self._marketing_preferences[customer_id] = {
-            "email_marketing": email_marketing,
-            "sms_marketing": sms_marketing,
-            "push_notifications": push_notifications,
-            "preferred_channels": preferred_channels,
-        }
+        self._commit(
+            {
+                "type": "marketing_preferences_updated",
+                "customer_id": customer_id,
+                "email_marketing": email_marketing,
+                "sms_marketing": sms_marketing,
+                "push_notifications": push_notifications,
+                "preferred_channels": list(preferred_channels),
+            }
+        )
 
     def send_marketing_campaign(
         self, customer_id: int, subject: str, content: str, channel: str
@@ -263,6 +682,37 @@ class CustomerService:
 
         return True
 
+    def send_campaign_to_segment(
+        self, channel: str, subject: str, content: str
+    ) -> Iterator[int]:
+        """Send marketing campaign to every customer reachable on a channel.
+
+        The audience is the intersection of the channel's opt-in bitmap and
+        its preferred-channel bitmap, so no preferences are visited one by
+        one. It is resolved when this method is called; later preference
+        changes do not affect the returned iterator.
+
+        Args:
+            channel: Marketing channel to use
+            subject: Campaign subject
+            content: Campaign content
+
+        Returns:
+            Iterator over the IDs of the customers the campaign goes to, in
+            ascending order
+
+        Raises:
+            ValueError: If channel is not supported
+        """
+        if channel not in CAMPAIGN_OPT_IN_FLAGS:
+            raise ValueError(f"Unsupported marketing channel: {channel}")
+
+        audience = (
+            self._opt_in_bitmaps[CAMPAIGN_OPT_IN_FLAGS[channel]].to_int()
+            & self._channel_bitmaps[channel].to_int()
+        )
+        return iter_bitmap_members(audience)
+
     def record_purchase(
         self, customer_id: int, items: list[dict[str, Any]], total_amount: float
     ) -> int:
@@ -270,14 +720,17 @@ class CustomerService:
 
         Args:
             customer_id: Customer's ID
-            items: List of purchased items
+            items: List of purchased items. With persistence enabled they must
+                be JSON-serializable apart from datetimes, since they are
+                written to the log.
             total_amount: Total purchase amount
 
         Returns:
             The ID of the created order
 
         Raises:
-            ValueError: If customer not found or validation fails
+            ValueError: If customer not found, validation fails or the items
+                cannot be written to the log
         """
         if customer_id not in self._customers:
             raise ValueError("Customer not found")
@@ -288,17 +741,18 @@ class CustomerService:
         if total_amount <= 0:
             raise ValueError("Total amount must be positive")
 
-        if customer_id not in self._order_history:
-            self._order_history[customer_id] = {}
-
-        order_id = len(self._order_history[customer_id]) + 1
-        self._order_history[customer_id][order_id] = {
-            "id": order_id,
-            "items": items,
-            "total_amount": total_amount,
-            "order_date": datetime.now(),
-            "status": "completed",
-        }
+        with self._write_lock:
+            order_id = len(self._order_history.get(customer_id, {})) + 1
+            self._commit(
+                {
+                    "type": "purchase_recorded",
+                    "customer_id": customer_id,
+                    "order_id": order_id,
+                    "items": items,
+                    "total_amount": total_amount,
+                    "order_date": datetime.now(),
+                }
+            )
 
         return order_id
 
@@ -317,22 +771,50 @@ class CustomerService:
         if customer_id not in self._customers:
             raise ValueError("Customer not found")
 
-        if customer_id not in self._order_history:
-            return []
+        history = self._spending_history.get(customer_id, [])
+        return [dict(entry) for entry in reversed(history)]
 
-        history = []
-        for order in self._order_history[customer_id].values():
-            history.append(
-                {
-                    "order_id": order["id"],
-                    "amount": order["total_amount"],
-                    "date": order["order_date"],
-                    "item_count": len(order["items"]),
-                }
+    def get_customer_spending_history_page(
+        self, customer_id: int, limit: int = 50, cursor: str | None = None
+    ) -> dict[str, Any]:
+        """Get one page of customer's spending history, newest first.
+
+        Args:
+            customer_id: Customer's ID
+            limit: Maximum number of entries on the page
+            cursor: Opaque cursor from the previous page, or None for the first
+
+        Returns:
+            Dictionary with the page's "orders" and the "next_cursor" to pass
+            for the following page (None on the last page). Orders recorded
+            after the first page was read do not shift later pages.
+
+        Raises:
+            ValueError: If customer not found, limit is not positive or the
+                cursor is invalid
+        """
+        if customer_id not in self._customers:
+            raise ValueError("Customer not found")
+
+        if limit < 1:
+            raise ValueError("Limit must be positive")
+
+        history = self._spending_history.get(customer_id, [])
+        end = len(history)
+        if cursor is not None:
+            end = bisect.bisect_left(
+                history,
+                self._decode_history_cursor(cursor),
+                key=lambda order: (order["date"], order["order_id"]),
             )
 
-        history.sort(key=lambda x: x["date"], reverse=True)
-        return history
+        start = max(end - limit, 0)
+        orders = [dict(entry) for entry in reversed(history[start:end])]
+        next_cursor = None
+        if start > 0:
+            next_cursor = self._encode_history_cursor(orders[-1])
+
+        return {"orders": orders, "next_cursor": next_cursor}
 
     def calculate_customer_lifetime_value(self, customer_id: int) -> float:
         """Calculate customer's lifetime value.
@@ -349,20 +831,22 @@ class CustomerService:
         if customer_id not in self._customers:
             raise ValueError("Customer not found")
 
-        if customer_id not in self._order_history:
+        totals = self._order_totals.get(customer_id)
+        if totals is None:
             return 0.0
 
-        total_spent = 0.0
-        for order in self._order_history[customer_id].values():
-            total_spent += order["total_amount"]
+        return float(totals["lifetime_value"])
 
-        return total_spent
-
-    def get_customer_profile(self, customer_id: int) -> dict[str, Any]:
+    def get_customer_profile(
+        self, customer_id: int, aggregates_only: bool = False
+    ) -> dict[str, Any]:
         """Get complete customer profile.
 
         Args:
             customer_id: Customer's ID
+            aggregates_only: Leave out the order history and only report the
+                order aggregates, so the profile size does not grow with the
+                number of orders
 
         Returns:
             Dictionary containing all customer information
@@ -374,8 +858,9 @@ class CustomerService:
             raise ValueError("Customer not found")
 
         customer = self._customers[customer_id]
+        totals = self._order_totals.get(customer_id, {})
 
-        return {
+        profile: dict[str, Any] = {
             "personal": {
                 "id": customer["id"],
                 "first_name": customer["first_name"],
@@ -384,51 +869,364 @@ class CustomerService:
                 "phone": customer["phone"],
                 "status": customer["status"],
             },
-            "addresses": self._addresses.get(customer_id, {}),
+            "addresses": (
+                self._addresses[customer_id].to_dict()
+                if customer_id in self._addresses
+                else {}
+            ),
             "marketing": self._marketing_preferences.get(customer_id),
-            "order_history": self.get_customer_spending_history(customer_id),
             "lifetime_value": self.calculate_customer_lifetime_value(customer_id),
+            "order_count": totals.get("order_count", 0),
+            "last_order_date": totals.get("last_order_date"),
         }
+        if not aggregates_only:
+            profile["order_history"] = self.get_customer_spending_history(customer_id)
+
+        return profile
+
+    def flush(self) -> None:
+        """Block until every mutation so far is durable in the log."""
+        if self._wal is not None:
+            self._wal.flush()
+
+    def compact(self) -> None:
+        """Write the current state to a snapshot and empty the log.
+
+        Raises:
+            RuntimeError: If the service was created without a data_dir
+        """
+        if self._wal is None or self._data_dir is None:
+            raise RuntimeError("Persistence is not enabled")
+
+        with self._write_lock:
+            self._wal.flush()
+            snapshot = json.dumps(
+                self._snapshot_state(), default=_encode_json_value
+            ).encode()
+            _write_file_atomically(self._data_dir / SNAPSHOT_FILE_NAME, snapshot)
+            # Records up to the snapshot's sequence are skipped on replay, so
+            # a crash before this truncation loses nothing
+            self._wal.truncate()
+            self._records_since_snapshot = 0
+
+    def close(self) -> None:
+        """Make every mutation durable and stop the log's commit thread."""
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+
+    def _commit(self, record: dict[str, Any]) -> None:
+        """Log a mutation (when persistent) and apply it to the state.
+
+        Raises:
+            ValueError: If the record cannot be encoded for the log; nothing
+                is logged or applied then
+        """
+        with self._write_lock:
+            record["sequence"] = self._last_sequence + 1
+            position = None
+            if self._wal is not None:
+                try:
+                    position = self._wal.append(record)
+                except (TypeError, ValueError) as error:
+                    raise ValueError(
+                        f"Cannot write {record['type']} record to the log: {error}"
+                    ) from error
+                self._records_since_snapshot += 1
+            self._last_sequence += 1
+            self._apply(record)
+            if self._records_since_snapshot >= self._snapshot_every:
+                self.compact()
+
+        if position is not None and self._sync_commit and self._wal is not None:
+            self._wal.wait_durable(position)
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        """Apply a logged mutation to the in-memory state."""
+        customer_id = record["customer_id"]
+        record_type = record["type"]
+
+        if record_type == "customer_registered":
+            self._customer_ids.observe(customer_id)
+            self._customers[customer_id] = {
+                "id": customer_id,
+                "email": record["email"],
+                "password": record["password"],
+                "first_name": record["first_name"],
+                "last_name": record["last_name"],
+                "phone": None,
+                "status": "active",
+                "created_at": record["created_at"],
+                "last_login": None,
+            }
+            self._customer_ids_by_email[record["email"]] = customer_id
+            self._marketing_preferences[customer_id] = {
+                "email_marketing": True,
+                "sms_marketing": False,
+                "push_notifications": True,
+                "preferred_channels": ["email"],
+            }
+            self._index_marketing_preferences(customer_id)
+        elif record_type == "contact_updated":
+            customer = self._customers[customer_id]
+            customer["first_name"] = record["first_name"]
+            customer["last_name"] = record["last_name"]
+            customer["phone"] = record["phone"]
+        elif record_type == "customer_logged_in":
+            customer = self._customers[customer_id]
+            customer["last_login"] = record["logged_in_at"]
+            if record["password"] is not None:
+                customer["password"] = record["password"]
+        elif record_type == "address_added":
+            self._addresses.setdefault(customer_id, AddressBook()).add(
+                record["address_id"],
+                {
+                    "street": record["street"],
+                    "city": record["city"],
+                    "zip_code": record["zip_code"],
+                    "country": record["country"],
+                },
+                make_default=record["is_default"],
+            )
+        elif record_type == "default_address_set":
+            self._addresses[customer_id].set_default(record["address_id"])
+        elif record_type == "marketing_preferences_updated":
+            self._marketing_preferences[customer_id] = {
+                "email_marketing": record["email_marketing"],
+                "sms_marketing": record["sms_marketing"],
+                "push_notifications": record["push_notifications"],
+                "preferred_channels": record["preferred_channels"],
+            }
+            self._index_marketing_preferences(customer_id)
+        elif record_type == "purchase_recorded":
+            self._add_order(
+                customer_id,
+                {
+                    "id": record["order_id"],
+                    "items": record["items"],
+                    "total_amount": record["total_amount"],
+                    "order_date": record["order_date"],
+                    "status": "completed",
+                },
+            )
+        else:
+            raise ValueError(f"Unknown record type: {record_type}")
+
+    def _add_order(self, customer_id: int, order: dict[str, Any]) -> None:
+        """Store an order and update the history and totals derived from it."""
+        self._order_history.setdefault(customer_id, {})[order["id"]] = order
+
+        # History is kept oldest first; orders normally arrive in date order
+        history = self._spending_history.setdefault(customer_id, [])
+        entry = {
+            "order_id": order["id"],
+            "amount": order["total_amount"],
+            "date": order["order_date"],
+            "item_count": len(order["items"]),
+        }
+        if not history or history[-1]["date"] <= entry["date"]:
+            history.append(entry)
+        else:
+            bisect.insort(history, entry, key=lambda order: order["date"])
+
+        totals = self._order_totals.setdefault(
+            customer_id,
+            {"lifetime_value": 0.0, "order_count": 0, "last_order_date": None},
+        )
+        totals["lifetime_value"] += order["total_amount"]
+        totals["order_count"] += 1
+        totals["last_order_date"] = history[-1]["date"]
+
+    def _snapshot_state(self) -> dict[str, Any]:
+        """Collect the state that cannot be derived from other state."""
+        return {
+            "sequence": self._last_sequence,
+            "customers": list(self._customers.values()),
+            "marketing_preferences": [
+                {"customer_id": customer_id, **preferences}
+                for customer_id, preferences in self._marketing_preferences.items()
+            ],
+            "orders": [
+                {"customer_id": customer_id, **order}
+                for customer_id, orders in self._order_history.items()
+                for order in orders.values()
+            ],
+            "addresses": [
+                {
+                    "customer_id": customer_id,
+                    "default_id": address_book.default_id,
+                    "addresses": list(address_book.addresses.values()),
+                }
+                for customer_id, address_book in self._addresses.items()
+            ],
+        }
+
+    def _restore(self) -> None:
+        """Load the newest snapshot and replay the log records after it."""
+        assert self._data_dir is not None
+        snapshot_path = self._data_dir / SNAPSHOT_FILE_NAME
+        if snapshot_path.exists():
+            self._load_snapshot(json.loads(snapshot_path.read_bytes()))
+
+        wal_path = self._data_dir / WAL_FILE_NAME
+        records, valid_length = read_wal_records(wal_path)
+        for record in records:
+            if record["sequence"] > self._last_sequence:
+                self._apply(record)
+                self._last_sequence = record["sequence"]
+                self._records_since_snapshot += 1
+
+        # Cut off a record torn by a crash so new records start on a new line
+        if wal_path.exists() and wal_path.stat().st_size > valid_length:
+            with open(wal_path, "r+b") as wal_file:
+                wal_file.truncate(valid_length)
+
+    def _load_snapshot(self, snapshot: dict[str, Any]) -> None:
+        """Replace the state with a snapshot and rebuild the derived indexes."""
+        self._last_sequence = snapshot["sequence"]
+        for customer in snapshot["customers"]:
+            customer = _decode_record(customer)
+            self._customers[customer["id"]] = customer
+            self._customer_ids_by_email[customer["email"]] = customer["id"]
+            self._customer_ids.observe(customer["id"])
+
+        for preferences in snapshot["marketing_preferences"]:
+            customer_id = preferences.pop("customer_id")
+            self._marketing_preferences[customer_id] = preferences
+            self._index_marketing_preferences(customer_id)
+
+        for order in snapshot["orders"]:
+            order = _decode_record(order)
+            self._add_order(order.pop("customer_id"), order)
+
+        for entry in snapshot["addresses"]:
+            address_book = AddressBook()
+            for address in entry["addresses"]:
+                address_book.add(address["id"], address, make_default=False)
+            address_book.default_id = entry["default_id"]
+            self._addresses[entry["customer_id"]] = address_book
+
+    def _index_marketing_preferences(self, customer_id: int) -> None:
+        """Mirror a customer's marketing preferences in the segment bitmaps."""
+        preferences = self._marketing_preferences[customer_id]
+        for flag, bitmap in self._opt_in_bitmaps.items():
+            if preferences[flag]:
+                bitmap.add(customer_id)
+            else:
+                bitmap.discard(customer_id)
+        for channel, bitmap in self._channel_bitmaps.items():
+            if channel in preferences["preferred_channels"]:
+                bitmap.add(customer_id)
+            else:
+                bitmap.discard(customer_id)
+
+    def _encode_history_cursor(self, entry: dict[str, Any]) -> str:
+        """Encode the position of a history entry as an opaque cursor."""
+        position = f"{entry['date'].isoformat()}|{entry['order_id']}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def _decode_history_cursor(self, cursor: str) -> tuple[datetime, int]:
+        """Decode a cursor into the (date, order id) it points at."""
+        try:
+            date, order_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            return datetime.fromisoformat(date), int(order_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError("Invalid cursor") from None
 
     def _find_customer_by_email(self, email: str) -> dict[str, Any] | None:
         """Find customer by email address."""
-        for customer in self._customers.values():
-            if customer["email"] == email:
-                return customer
-        return None
+        customer_id = self._customer_ids_by_email.get(email)
+        if customer_id is None:
+            return None
+        return self._customers[customer_id]
+
+    def _find_customer_for_login(self, email: str) -> dict[str, Any] | None:
+        """Find the customer a login attempt is for, checking the lockout."""
+        customer = self._find_customer_by_email(email)
+
+        if not customer:
+            self._record_failed_login_attempt(email)
+            return None
+
+        if self._is_account_locked(customer["id"]):
+            raise RuntimeError(
+                "Account is temporarily locked due to too many failed attempts"
+            )
+
+        return customer
+
+    def _complete_login(
+        self,
+        customer: dict[str, Any],
+        email: str,
+        verified: bool,
+        new_hash: str | None,
+    ) -> int | None:
+        """Record the outcome of a checked login attempt."""
+        if not verified:
+            self._record_failed_login_attempt(email)
+            return None
+
+        self._clear_failed_login_attempts(customer["id"])
+        self._commit(
+            {
+                "type": "customer_logged_in",
+                "customer_id": customer["id"],
+                "logged_in_at": datetime.now(),
+                "password": new_hash,
+            }
+        )
+
+        return customer["id"]
 
     def _record_failed_login_attempt(self, email: str) -> None:
-        """Record a failed login attempt for an email."""
-        if email not in self._login_attempts:
-            self._login_attempts[email] = []
-        self._login_attempts[email].append(datetime.now())
+        """Record a failed login attempt for an email.
+
+        Only the last LOCKOUT_THRESHOLD attempts are kept per email, and emails
+        without a failure inside the lockout window are evicted, so unknown
+        emails from credential stuffing cannot grow the table without bound.
+        """
+        now = datetime.now()
+        attempts = self._login_attempts.get(email)
+        if attempts is None:
+            attempts = deque(maxlen=LOCKOUT_THRESHOLD)
+            self._login_attempts[email] = attempts
+        else:
+            self._login_attempts.move_to_end(email)
+        attempts.append(now)
+
+        self._evict_stale_login_attempts(now)
+
+    def _evict_stale_login_attempts(self, now: datetime) -> None:
+        """Drop tracked emails whose last failure left the lockout window."""
+        cutoff = now - LOCKOUT_WINDOW
+        while self._login_attempts:
+            email, attempts = next(iter(self._login_attempts.items()))
+            if (
+                attempts[-1] > cutoff
+                and len(self._login_attempts) <= MAX_TRACKED_LOGIN_KEYS
+            ):
+                break
+            del self._login_attempts[email]
 
     def _is_account_locked(self, customer_id: int) -> bool:
         """Check if account is locked due to failed login attempts."""
         customer = self._customers[customer_id]
-        email = customer["email"]
+        attempts = self._login_attempts.get(customer["email"])
 
-        if email not in self._login_attempts:
-            return False
-
-        recent_attempts = [
-            attempt
-            for attempt in self._login_attempts[email]
-            if attempt > datetime.now() - timedelta(minutes=15)
-        ]
-
-        return len(recent_attempts) >= 3
+        # The oldest of the last LOCKOUT_THRESHOLD failures is inside the window
+        return (
+            attempts is not None
+            and len(attempts) == LOCKOUT_THRESHOLD
+            and attempts[0] > datetime.now() - LOCKOUT_WINDOW
+        )
 
     def _clear_failed_login_attempts(self, customer_id: int) -> None:
         """Clear failed login attempts for a customer."""
         customer = self._customers[customer_id]
-        email = customer["email"]
-        if email in self._login_attempts:
-            del self._login_attempts[email]
-
-    def _update_last_login(self, customer_id: int) -> None:
-        """Update customer's last login timestamp."""
-        self._customers[customer_id]["last_login"] = datetime.now()
+        self._login_attempts.pop(customer["email"], None)
 
     def _is_valid_email(self, email: str) -> bool:
         """Validate email format."""
@@ -441,9 +1239,13 @@ class CustomerService:
         return re.match(pattern, phone) is not None
 
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with a salted, tunable key derivation function."""
+        return self._password_hasher.hash(password)
 
     def _verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash."""
-        return self._hash_password(password) == hashed
+        if "$" not in hashed:
+            # Legacy unsalted SHA-256, replaced on the next successful login
+            legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy_hash.encode(), hashed.encode())
+        return self._password_hasher.verify(password, hashed)
@@ -1,13 +1,27 @@
 """Test suite for CustomerService with divergent change issues."""
 
+import asyncio
+import hashlib
 import sys
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
 from pathlib import Path
 
 # Add the src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import customer_service
 import pytest
-from customer_service import CustomerService
+from customer_password_hashing import PasswordHasher
+from customer_service import (
+    Bitmap,
+    CustomerService,
+    IdAllocator,
+    WriteAheadLog,
+    iter_bitmap_members,
+    read_wal_records,
+)
 
 
 class TestCustomerService:
@@ -15,7 +29,8 @@ class TestCustomerService:
 
     def setup_method(self) -> None:
         """Set up test fixtures before each test method."""
-        self.customer_service = CustomerService()
+        # A low hashing cost keeps the many registrations in these tests fast
+        self.customer_service = CustomerService(PasswordHasher(cost=4))
 
     def test_register_customer(self) -> None:
         """Test successful customer registration."""
@@ -26,6 +41,40 @@ class TestCustomerService:
         assert isinstance(customer_id, int)
         assert customer_id > 0
 
+    def test_concurrent_registrations_get_unique_ids(self) -> None:
+        """Test that customers registered from many threads get distinct IDs."""
+        ids: list[int] = []
+        barrier = threading.Barrier(8)
+
+        def register(thread_index: int) -> None:
+            barrier.wait()
+            for index in range(25):
+                ids.append(
+                    self.customer_service.register_customer(
+                        f"c{thread_index}-{index}@example.com",
+                        "password123",
+                        "John",
+                        "Doe",
+                    )
+                )
+
+        threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(ids) == list(range(1, 201))
+
+    def test_id_allocator_skips_observed_ids(self) -> None:
+        """Test that IDs already in use are never handed out again."""
+        allocator = IdAllocator()
+
+        assert allocator.allocate() == 1
+        allocator.observe(10)
+        allocator.observe(5)
+        assert allocator.allocate() == 11
+
     def test_register_customer_with_invalid_email(self) -> None:
         """Test customer registration with invalid email."""
         with pytest.raises(ValueError, match="Invalid email format"):
@@ -110,6 +159,146 @@ class TestCustomerService:
                 "john.doe@example.com", "password123"
             )
 
+    def test_find_customer_by_email_uses_index(self) -> None:
+        """Test email lookups for registered and unknown customers."""
+        for index in range(50):
+            self.customer_service.register_customer(
+                f"customer{index}@example.com", "password123", "John", "Doe"
+            )
+
+        customer = self.customer_service._find_customer_by_email(
+            "customer42@example.com"
+        )
+
+        assert customer is not None
+        assert customer["email"] == "customer42@example.com"
+        assert self.customer_service._find_customer_by_email("x@example.com") is None
+
+    def test_login_attempts_keep_only_the_lockout_window(self) -> None:
+        """Test that each email keeps at most the last few failed attempts."""
+        for _ in range(10):
+            self.customer_service.authenticate_customer("ghost@example.com", "wrong")
+
+        assert len(self.customer_service._login_attempts["ghost@example.com"]) == 3
+
+    def test_account_unlocks_after_lockout_window(self) -> None:
+        """Test that failures older than the lockout window no longer lock."""
+        self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        for _ in range(3):
+            self.customer_service.authenticate_customer(
+                "john.doe@example.com", "wrongpassword"
+            )
+
+        attempts = self.customer_service._login_attempts["john.doe@example.com"]
+        attempts[0] -= timedelta(minutes=16)
+
+        assert (
+            self.customer_service.authenticate_customer(
+                "john.doe@example.com", "password123"
+            )
+            is not None
+        )
+        assert "john.doe@example.com" not in self.customer_service._login_attempts
+
+    def test_stale_login_attempt_keys_are_evicted(self) -> None:
+        """Test that emails without recent failures are dropped."""
+        self.customer_service.authenticate_customer("old@example.com", "wrong")
+        self.customer_service._login_attempts["old@example.com"][
+            -1
+        ] = datetime.now() - timedelta(minutes=20)
+
+        self.customer_service.authenticate_customer("new@example.com", "wrong")
+
+        assert list(self.customer_service._login_attempts) == ["new@example.com"]
+
+    def test_tracked_login_keys_are_capped(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that credential stuffing cannot grow the attempt table unbounded."""
+        monkeypatch.setattr(customer_service, "MAX_TRACKED_LOGIN_KEYS", 2)
+
+        for index in range(5):
+            self.customer_service.authenticate_customer(
+                f"guess{index}@example.com", "wrong"
+            )
+
+        assert list(self.customer_service._login_attempts) == [
+            "guess3@example.com",
+            "guess4@example.com",
+        ]
+
+    def test_passwords_are_stored_salted(self) -> None:
+        """Test that passwords are stored as salted scrypt hashes."""
+        first_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        second_id = self.customer_service.register_customer(
+            "jane.doe@example.com", "password123", "Jane", "Doe"
+        )
+
+        first_hash = self.customer_service._customers[first_id]["password"]
+        second_hash = self.customer_service._customers[second_id]["password"]
+        assert first_hash.startswith("scrypt$")
+        assert first_hash != second_hash
+
+    def test_authenticate_upgrades_legacy_sha256_hash(self) -> None:
+        """Test that unsalted SHA-256 hashes still work and are rehashed."""
+        service = CustomerService(PasswordHasher(cost=4))
+        customer_id = service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        customer = service._customers[customer_id]
+        customer["password"] = hashlib.sha256(b"password123").hexdigest()
+
+        assert service.authenticate_customer("john.doe@example.com", "wrong") is None
+        assert customer["password"] == hashlib.sha256(b"password123").hexdigest()
+
+        result = service.authenticate_customer("john.doe@example.com", "password123")
+
+        assert result == customer_id
+        assert customer["password"].startswith("scrypt$4$")
+
+    def test_authenticate_rehashes_when_cost_changes(self) -> None:
+        """Test that changing the hasher cost upgrades hashes on login."""
+        service = CustomerService(PasswordHasher(cost=4))
+        customer_id = service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        service._password_hasher = PasswordHasher("pbkdf2_sha256", cost=5)
+
+        service.authenticate_customer("john.doe@example.com", "password123")
+
+        stored_hash = service._customers[customer_id]["password"]
+        assert stored_hash.startswith("pbkdf2_sha256$5$")
+        assert (
+            service.authenticate_customer("john.doe@example.com", "password123")
+            == customer_id
+        )
+
+    def test_authenticate_customer_async(self) -> None:
+        """Test authentication from an event loop."""
+        service = CustomerService(PasswordHasher(cost=4))
+        customer_id = service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        assert (
+            asyncio.run(
+                service.authenticate_customer_async(
+                    "john.doe@example.com", "password123"
+                )
+            )
+            == customer_id
+        )
+        assert (
+            asyncio.run(
+                service.authenticate_customer_async("john.doe@example.com", "wrong")
+            )
+            is None
+        )
+
     def test_update_contact_information(self) -> None:
         """Test updating customer contact information."""
         customer_id = self.customer_service.register_customer(
@@ -179,6 +368,67 @@ class TestCustomerService:
         assert profile["addresses"][address1_id]["is_default"] is False
         assert profile["addresses"][address2_id]["is_default"] is True
 
+    def test_first_address_becomes_default(self) -> None:
+        """Test that a customer's first address is the default."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        assert self.customer_service.get_default_address(customer_id) is None
+
+        address_id = self.customer_service.add_customer_address(
+            customer_id, "123 Main St", "New York", "10001", "USA"
+        )
+        self.customer_service.add_customer_address(
+            customer_id, "456 Oak Ave", "Los Angeles", "90210", "USA"
+        )
+
+        default = self.customer_service.get_default_address(customer_id)
+        assert default is not None
+        assert default["id"] == address_id
+        assert default["is_default"] is True
+
+    def test_set_default_address(self) -> None:
+        """Test switching the default address."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        address_ids = [
+            self.customer_service.add_customer_address(
+                customer_id, f"{number} Main St", "New York", "10001", "USA"
+            )
+            for number in range(1, 4)
+        ]
+
+        self.customer_service.set_default_address(customer_id, address_ids[2])
+
+        profile = self.customer_service.get_customer_profile(customer_id)
+        assert [address["is_default"] for address in profile["addresses"].values()] == [
+            False,
+            False,
+            True,
+        ]
+        default = self.customer_service.get_default_address(customer_id)
+        assert default is not None
+        assert default["street"] == "3 Main St"
+
+    def test_set_default_address_errors(self) -> None:
+        """Test switching to unknown customers or addresses."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        with pytest.raises(ValueError, match="Customer not found"):
+            self.customer_service.set_default_address(999, 1)
+        with pytest.raises(ValueError, match="Address not found"):
+            self.customer_service.set_default_address(customer_id, 1)
+
+        self.customer_service.add_customer_address(
+            customer_id, "123 Main St", "New York", "10001", "USA"
+        )
+        with pytest.raises(ValueError, match="Address not found"):
+            self.customer_service.set_default_address(customer_id, 2)
+
     def test_add_address_with_missing_fields(self) -> None:
         """Test adding address with missing required fields."""
         customer_id = self.customer_service.register_customer(
@@ -263,6 +513,84 @@ class TestCustomerService:
                 "carrier-pigeon",
             )
 
+    def test_send_campaign_to_segment(self) -> None:
+        """Test resolving a campaign audience from the preference bitmaps."""
+        ids = [
+            self.customer_service.register_customer(
+                f"customer{index}@example.com", "password123", "John", "Doe"
+            )
+            for index in range(5)
+        ]
+        self.customer_service.update_marketing_preferences(
+            ids[1], False, False, True, ["email", "push"]
+        )
+        self.customer_service.update_marketing_preferences(
+            ids[2], True, True, False, ["sms"]
+        )
+        self.customer_service.update_marketing_preferences(
+            ids[3], True, False, True, ["push", "mail"]
+        )
+
+        def segment(channel: str) -> list[int]:
+            return list(
+                self.customer_service.send_campaign_to_segment(
+                    channel, "Sale", "50% off"
+                )
+            )
+
+        assert segment("email") == [ids[0], ids[4]]
+        assert segment("sms") == [ids[2]]
+        assert segment("push") == [ids[1], ids[3]]
+        for channel in ["email", "sms", "push"]:
+            assert segment(channel) == [
+                customer_id
+                for customer_id in ids
+                if self.customer_service.send_marketing_campaign(
+                    customer_id, "Sale", "50% off", channel
+                )
+            ]
+
+    def test_send_campaign_to_segment_resolves_audience_on_call(self) -> None:
+        """Test that the returned iterator is not affected by later changes."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        audience = self.customer_service.send_campaign_to_segment(
+            "email", "Sale", "50% off"
+        )
+        self.customer_service.update_marketing_preferences(
+            customer_id, False, False, False, []
+        )
+
+        assert list(audience) == [customer_id]
+        assert (
+            list(
+                self.customer_service.send_campaign_to_segment(
+                    "email", "Sale", "50% off"
+                )
+            )
+            == []
+        )
+
+    def test_send_campaign_to_segment_with_unsupported_channel(self) -> None:
+        """Test that segment campaigns reject unsupported channels."""
+        with pytest.raises(ValueError, match="Unsupported marketing channel: mail"):
+            self.customer_service.send_campaign_to_segment("mail", "Sale", "50% off")
+
+    def test_bitmap_members(self) -> None:
+        """Test bitmap updates and iteration across 64-bit word boundaries."""
+        members = [0, 1, 63, 64, 65, 1000, 123_456]
+        bitmap = Bitmap()
+        for member in members + [7, 500]:
+            bitmap.add(member)
+        bitmap.discard(7)
+        bitmap.discard(500)
+        bitmap.discard(10**7)
+
+        assert list(iter_bitmap_members(bitmap.to_int())) == members
+        assert list(iter_bitmap_members(0)) == []
+
     def test_record_purchase(self) -> None:
         """Test recording a customer purchase."""
         customer_id = self.customer_service.register_customer(
@@ -317,6 +645,109 @@ class TestCustomerService:
         assert history[0]["amount"] == 31.00  # Most recent first
         assert history[1]["amount"] == 29.99
 
+    def test_spending_history_returns_copies(self) -> None:
+        """Test that callers cannot change the stored history."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        self.customer_service.record_purchase(customer_id, [{"name": "A"}], 10.0)
+
+        history = self.customer_service.get_customer_spending_history(customer_id)
+        history[0]["amount"] = 0.0
+        history.clear()
+
+        history = self.customer_service.get_customer_spending_history(customer_id)
+        assert [entry["amount"] for entry in history] == [10.0]
+
+    def test_spending_history_stays_date_ordered(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an order with an earlier date lands in date order."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        dates = iter([datetime(2024, 1, 1), datetime(2024, 3, 1), datetime(2024, 2, 1)])
+
+        class ScriptedDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):  # type: ignore[no-untyped-def]
+                return next(dates)
+
+        monkeypatch.setattr(customer_service, "datetime", ScriptedDatetime)
+        for amount in [1.0, 3.0, 2.0]:
+            self.customer_service.record_purchase(customer_id, [{}], amount)
+
+        history = self.customer_service.get_customer_spending_history(customer_id)
+        profile = self.customer_service.get_customer_profile(customer_id)
+
+        assert [entry["amount"] for entry in history] == [3.0, 2.0, 1.0]
+        assert profile["last_order_date"] == datetime(2024, 3, 1)
+
+    def test_spending_history_pages(self) -> None:
+        """Test walking the spending history page by page with cursors."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        for amount in range(1, 8):
+            self.customer_service.record_purchase(customer_id, [{}], float(amount))
+
+        amounts = []
+        cursor = None
+        pages = 0
+        while True:
+            page = self.customer_service.get_customer_spending_history_page(
+                customer_id, limit=3, cursor=cursor
+            )
+            amounts.extend(entry["amount"] for entry in page["orders"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert amounts == [7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0]
+
+    def test_spending_history_page_is_stable_under_new_orders(self) -> None:
+        """Test that orders recorded between pages do not shift later pages."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        for amount in range(1, 5):
+            self.customer_service.record_purchase(customer_id, [{}], float(amount))
+
+        first = self.customer_service.get_customer_spending_history_page(
+            customer_id, limit=2
+        )
+        self.customer_service.record_purchase(customer_id, [{}], 99.0)
+        second = self.customer_service.get_customer_spending_history_page(
+            customer_id, limit=2, cursor=first["next_cursor"]
+        )
+
+        assert [entry["amount"] for entry in first["orders"]] == [4.0, 3.0]
+        assert [entry["amount"] for entry in second["orders"]] == [2.0, 1.0]
+        assert second["next_cursor"] is None
+
+    def test_spending_history_page_validation(self) -> None:
+        """Test errors for unknown customers, bad limits and bad cursors."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        assert self.customer_service.get_customer_spending_history_page(
+            customer_id
+        ) == {"orders": [], "next_cursor": None}
+        with pytest.raises(ValueError, match="Customer not found"):
+            self.customer_service.get_customer_spending_history_page(999)
+        with pytest.raises(ValueError, match="Limit must be positive"):
+            self.customer_service.get_customer_spending_history_page(
+                customer_id, limit=0
+            )
+        for cursor in ["not a cursor!", "bm9waXBl", ""]:
+            with pytest.raises(ValueError, match="Invalid cursor"):
+                self.customer_service.get_customer_spending_history_page(
+                    customer_id, cursor=cursor
+                )
+
     def test_get_customer_spending_history_for_customer_without_orders(self) -> None:
         """Test getting spending history for customer without orders."""
         customer_id = self.customer_service.register_customer(
@@ -388,6 +819,38 @@ class TestCustomerService:
         assert len(profile["addresses"]) == 1
         assert len(profile["order_history"]) == 1
         assert profile["lifetime_value"] == 29.99
+        assert profile["order_count"] == 1
+        assert profile["last_order_date"] == profile["order_history"][0]["date"]
+
+    def test_get_customer_profile_aggregates_only(self) -> None:
+        """Test the lightweight profile that leaves out the order history."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        for amount in [10.0, 20.0, 30.0]:
+            self.customer_service.record_purchase(customer_id, [{}], amount)
+
+        profile = self.customer_service.get_customer_profile(
+            customer_id, aggregates_only=True
+        )
+
+        assert "order_history" not in profile
+        assert profile["lifetime_value"] == 60.0
+        assert profile["order_count"] == 3
+        assert profile["personal"]["email"] == "john.doe@example.com"
+
+    def test_get_customer_profile_without_orders(self) -> None:
+        """Test the order aggregates of a customer who never ordered."""
+        customer_id = self.customer_service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+
+        profile = self.customer_service.get_customer_profile(customer_id)
+
+        assert profile["order_history"] == []
+        assert profile["lifetime_value"] == 0.0
+        assert profile["order_count"] == 0
+        assert profile["last_order_date"] is None
 
     def test_get_customer_profile_for_nonexistent_customer(self) -> None:
         """Test getting profile for non-existent customer."""
@@ -416,3 +879,207 @@ class TestCustomerService:
         assert marketing["sms_marketing"] is False
         assert marketing["push_notifications"] is True
         assert marketing["preferred_channels"] == ["email"]
+
+
+class TestCustomerServicePersistence:
+    """Test cases for the write-ahead log and snapshots."""
+
+    def open_service(
+        self, data_dir: Path, sync_commit: bool = False, snapshot_every: int = 10_000
+    ) -> CustomerService:
+        """Open a persistent service with a fast password hasher."""
+        return CustomerService(
+            PasswordHasher(cost=4),
+            data_dir=data_dir,
+            sync_commit=sync_commit,
+            snapshot_every=snapshot_every,
+        )
+
+    def populate(self, service: CustomerService) -> int:
+        """Apply one mutation of every kind and return the customer ID."""
+        customer_id = service.register_customer(
+            "john.doe@example.com", "password123", "John", "Doe"
+        )
+        service.update_contact_information(customer_id, "Johnny", "Doe", "+1555")
+        service.add_customer_address(customer_id, "1 Main St", "Town", "12345", "US")
+        second = service.add_customer_address(
+            customer_id, "2 Side St", "City", "54321", "US"
+        )
+        service.set_default_address(customer_id, second)
+        service.update_marketing_preferences(
+            customer_id, True, True, False, ["email", "sms"]
+        )
+        service.record_purchase(customer_id, [{"sku": "A"}], 40.0)
+        service.record_purchase(customer_id, [{"sku": "B"}, {"sku": "C"}], 60.0)
+        service.authenticate_customer("john.doe@example.com", "password123")
+        return customer_id
+
+    def test_state_is_replayed_from_log_after_restart(self, tmp_path: Path) -> None:
+        """Test every kind of mutation survives a restart via the log."""
+        service = self.open_service(tmp_path)
+        customer_id = self.populate(service)
+        expected = service.get_customer_profile(customer_id)
+        service.close()
+
+        restored = self.open_service(tmp_path)
+
+        assert restored.get_customer_profile(customer_id) == expected
+        assert restored.get_default_address(customer_id)["street"] == "2 Side St"
+        assert restored.calculate_customer_lifetime_value(customer_id) == 100.0
+        assert (
+            restored.authenticate_customer("john.doe@example.com", "password123")
+            == customer_id
+        )
+        assert list(restored.send_campaign_to_segment("sms", "Sale", "Hi")) == [
+            customer_id
+        ]
+        with pytest.raises(ValueError, match="already exists"):
+            restored.register_customer("john.doe@example.com", "password123", "J", "D")
+        restored.close()
+
+    def test_new_ids_continue_after_restart(self, tmp_path: Path) -> None:
+        """Test IDs allocated after a restart do not collide with old ones."""
+        service = self.open_service(tmp_path)
+        first = service.register_customer("a@example.com", "password123", "A", "A")
+        address_id = service.add_customer_address(first, "1 St", "X", "1", "US")
+        service.close()
+
+        restored = self.open_service(tmp_path)
+        second = restored.register_customer("b@example.com", "password123", "B", "B")
+        next_address_id = restored.add_customer_address(first, "2 St", "X", "2", "US")
+
+        assert second > first
+        assert next_address_id > address_id
+        restored.close()
+
+    def test_snapshot_plus_log_tail_is_restored(self, tmp_path: Path) -> None:
+        """Test a restart loads the snapshot and replays later records."""
+        service = self.open_service(tmp_path)
+        customer_id = self.populate(service)
+        service.compact()
+        assert (tmp_path / "customers.wal").stat().st_size == 0
+
+        service.record_purchase(customer_id, [{"sku": "D"}], 25.0)
+        expected = service.get_customer_profile(customer_id)
+        service.close()
+
+        restored = self.open_service(tmp_path)
+
+        assert restored.get_customer_profile(customer_id) == expected
+        assert restored.calculate_customer_lifetime_value(customer_id) == 125.0
+        history = restored.get_customer_spending_history(customer_id)
+        assert [order["order_id"] for order in history] == [3, 2, 1]
+        restored.close()
+
+    def test_snapshot_is_taken_automatically(self, tmp_path: Path) -> None:
+        """Test the log is compacted after snapshot_every mutations."""
+        service = self.open_service(tmp_path, snapshot_every=3)
+        customer_id = service.register_customer(
+            "a@example.com", "password123", "A", "A"
+        )
+        service.record_purchase(customer_id, [{"sku": "A"}], 1.0)
+        service.record_purchase(customer_id, [{"sku": "A"}], 2.0)
+        service.record_purchase(customer_id, [{"sku": "A"}], 3.0)
+        service.close()
+
+        assert (tmp_path / "customers.snapshot.json").exists()
+        records, _ = read_wal_records(tmp_path / "customers.wal")
+        assert [record["type"] for record in records] == ["purchase_recorded"]
+
+        restored = self.open_service(tmp_path)
+        assert restored.calculate_customer_lifetime_value(customer_id) == 6.0
+        restored.close()
+
+    def test_torn_last_record_is_discarded(self, tmp_path: Path) -> None:
+        """Test a partially written record from a crash is ignored and cut off."""
+        service = self.open_service(tmp_path)
+        customer_id = service.register_customer(
+            "a@example.com", "password123", "A", "A"
+        )
+        service.close()
+        with open(tmp_path / "customers.wal", "ab") as wal_file:
+            wal_file.write(b'{"type": "purchase_recor')
+
+        restored = self.open_service(tmp_path)
+        assert restored.calculate_customer_lifetime_value(customer_id) == 0
+        restored.record_purchase(customer_id, [{"sku": "A"}], 5.0)
+        restored.close()
+
+        reopened = self.open_service(tmp_path)
+        assert reopened.calculate_customer_lifetime_value(customer_id) == 5.0
+        reopened.close()
+
+    def test_sync_commit_makes_each_mutation_durable(self, tmp_path: Path) -> None:
+        """Test a mutation is on disk when it returns with sync_commit."""
+        service = self.open_service(tmp_path, sync_commit=True)
+        service.register_customer("a@example.com", "password123", "A", "A")
+
+        records, _ = read_wal_records(tmp_path / "customers.wal")
+        assert [record["type"] for record in records] == ["customer_registered"]
+        service.close()
+
+    def test_unserializable_purchase_is_rejected(self, tmp_path: Path) -> None:
+        """Test items the log cannot encode are rejected before any change."""
+        service = self.open_service(tmp_path)
+        customer_id = service.register_customer(
+            "a@example.com", "password123", "A", "A"
+        )
+
+        with pytest.raises(ValueError, match="Cannot write purchase_recorded record"):
+            service.record_purchase(customer_id, [{"price": Decimal("9.99")}], 9.99)
+
+        assert service.get_customer_spending_history(customer_id) == []
+        assert service.record_purchase(customer_id, [{"sku": "A"}], 5.0) == 1
+        service.close()
+
+        restored = self.open_service(tmp_path)
+        assert restored.calculate_customer_lifetime_value(customer_id) == 5.0
+        restored.close()
+
+    def test_compact_requires_persistence(self) -> None:
+        """Test compacting an in-memory service is rejected."""
+        with pytest.raises(RuntimeError, match="Persistence is not enabled"):
+            CustomerService(PasswordHasher(cost=4)).compact()
+
+
+class TestWriteAheadLog:
+    """Test cases for WriteAheadLog."""
+
+    def test_group_commit_shares_fsyncs(self, tmp_path: Path) -> None:
+        """Test concurrent writers need far fewer fsyncs than records."""
+        wal = WriteAheadLog(tmp_path / "test.wal", commit_interval=0.01)
+
+        def write(worker: int) -> None:
+            for index in range(50):
+                wal.wait_durable(wal.append({"worker": worker, "index": index}))
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wal.close()
+
+        records, _ = read_wal_records(tmp_path / "test.wal")
+        assert len(records) == 400
+        assert wal.fsync_count < 400
+
+    def test_records_round_trip_datetimes(self, tmp_path: Path) -> None:
+        """Test known datetime fields are restored as datetimes."""
+        wal = WriteAheadLog(tmp_path / "test.wal")
+        order_date = datetime(2024, 1, 2, 3, 4, 5)
+        wal.append({"type": "purchase_recorded", "order_date": order_date})
+        wal.close()
+
+        records, valid_length = read_wal_records(tmp_path / "test.wal")
+
+        assert records[0]["order_date"] == order_date
+        assert valid_length == (tmp_path / "test.wal").stat().st_size
+
+    def test_append_after_close_is_rejected(self, tmp_path: Path) -> None:
+        """Test appending to a closed log raises."""
+        wal = WriteAheadLog(tmp_path / "test.wal")
+        wal.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            wal.append({"type": "x"})
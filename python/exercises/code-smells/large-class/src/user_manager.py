@@ -9,11 +9,32 @@ This class demonstrates the "Large Class" code smell by having too many responsi
 - Activity logging
 """
 
+import asyncio
+import heapq
+import hmac
+import itertools
+import queue
 import re
+import smtplib
+import threading
+import time
 import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any
+from email.message import EmailMessage
+from functools import partial
+from typing import Any, Protocol
+
+from password_hashing import PasswordHasher
+
+EMAIL_PATTERN = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+# Uppercase, lowercase and a digit, checked in a single search
+PASSWORD_COMPLEXITY_PATTERN = re.compile(
+    r"^(?=.*[A-Z])(?=.*[a-z])(?=.*[0-9])", re.DOTALL
+)
 
 
 @dataclass
@@ -47,12 +68,18 @@ class Session:
     expires_at: str
     ip_address: str
     user_agent: str
+    # Parsed once, so expiry checks compare numbers instead of parsing strings
+    expires_at_timestamp: float = field(init=False)
 
+    def __post_init__(self) -> None:
+        self.expires_at_timestamp = datetime.fromisoformat(self.expires_at).timestamp()
 
-@dataclass
+
+# Frozen, so permissions only change through UserManager.set_role
+@dataclass(frozen=True)
 class Role:
     name: str
-    permissions: list[str]
+    permissions: tuple[str, ...]
 
 
 @dataclass
@@ -64,6 +91,12 @@ class ActivityLog:
     ip_address: str
 
 
+@dataclass
+class BulkCreateResult:
+    users: list[User]
+    errors: dict[int, str]
+
+
 @dataclass
 class EmailItem:
     to: str
@@ -72,14 +105,321 @@ class EmailItem:
     queued_at: str
 
 
+class EmailTransport(Protocol):
+    """Delivers a batch of emails, e.g. over SMTP"""
+
+    def send_batch(self, emails: list[EmailItem]) -> None: ...
+
+
+class SmtpEmailTransport:
+    """Sends each batch over a single SMTP connection"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        sender: str = "noreply@example.com",
+        timeout: float = 10.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def send_batch(self, emails: list[EmailItem]) -> None:
+        """Opens one connection and sends every email of the batch"""
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for email in emails:
+                message = EmailMessage()
+                message["From"] = self.sender
+                message["To"] = email.to
+                message["Subject"] = email.subject
+                message.set_content(email.message)
+                smtp.send_message(message)
+
+
+_STOP = object()
+
+
+class EmailDispatcher:
+    """Builds and sends queued emails in batches on background threads
+
+    submit() only enqueues the recipient, subject and a message builder; it
+    blocks once max_pending emails are waiting, which pushes back on callers
+    when the transport cannot keep up. Workers take up to batch_size emails at
+    a time, drop identical emails to the same recipient within a batch and
+    hand the rest to the transport. Emails that could not be built or sent are
+    counted in failed_count and the most recent max_failed are kept in failed.
+    """
+
+    def __init__(
+        self,
+        transport: EmailTransport,
+        batch_size: int = 100,
+        max_pending: int = 10_000,
+        workers: int = 1,
+        max_failed: int = 1_000,
+    ) -> None:
+        if batch_size < 1 or max_pending < 1 or workers < 1 or max_failed < 1:
+            raise ValueError(
+                "batch_size, max_pending, workers and max_failed must be positive"
+            )
+        self.transport = transport
+        self.batch_size = batch_size
+        self.sent_count = 0
+        self.coalesced_count = 0
+        self.failed_count = 0
+        self.failed: deque[EmailItem] = deque(maxlen=max_failed)
+        self._pending: queue.Queue[Any] = queue.Queue(maxsize=max_pending)
+        self._stats_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run, name=f"email-dispatcher-{index}")
+            for index in range(workers)
+        ]
+        for worker in self._workers:
+            worker.daemon = True
+            worker.start()
+
+    def submit(self, to: str, subject: str, build_message: Callable[[], str]) -> None:
+        """Queues an email whose message is built on a worker thread"""
+        self._pending.put((to, subject, build_message, datetime.now().isoformat()))
+
+    def submit_item(self, item: EmailItem) -> None:
+        """Queues an email that has already been built"""
+        self._pending.put(item)
+
+    def flush(self) -> None:
+        """Blocks until every email submitted so far has been handled"""
+        self._pending.join()
+
+    def drain_failed(self) -> list[EmailItem]:
+        """Returns the recorded failed emails and clears them"""
+        with self._stats_lock:
+            failed = list(self.failed)
+            self.failed.clear()
+        return failed
+
+    def stop(self) -> None:
+        """Sends everything still queued and stops the worker threads"""
+        for _ in self._workers:
+            self._pending.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def _run(self) -> None:
+        """Worker loop: collect a batch, build it, coalesce it and send it"""
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            try:
+                if batch:
+                    self._send(batch)
+            finally:
+                for _ in range(len(batch) + stopping):
+                    self._pending.task_done()
+            if stopping:
+                return
+
+    def _send(self, batch: list[Any]) -> None:
+        """Builds pending emails and sends one copy of each distinct email"""
+        emails: dict[tuple[str, str, str], EmailItem] = {}
+        build_failures = 0
+        for pending in batch:
+            if isinstance(pending, EmailItem):
+                item = pending
+            else:
+                to, subject, build_message, queued_at = pending
+                item = EmailItem(
+                    to=to, subject=subject, message="", queued_at=queued_at
+                )
+                try:
+                    item.message = build_message()
+                except Exception:
+                    build_failures += 1
+                    with self._stats_lock:
+                        self.failed.append(item)
+                        self.failed_count += 1
+                    continue
+            emails.setdefault((item.to, item.subject, item.message), item)
+
+        unique = list(emails.values())
+        if not unique:
+            return
+        try:
+            self.transport.send_batch(unique)
+        except Exception:
+            with self._stats_lock:
+                self.failed.extend(unique)
+                self.failed_count += len(unique)
+            return
+
+        with self._stats_lock:
+            self.sent_count += len(unique)
+            self.coalesced_count += len(batch) - build_failures - len(unique)
+
+
+class ActivityLogStore:
+    """Append-only activity log with a per-user index and bounded retention
+
+    Entries are grouped into time partitions so whole partitions can be
+    dropped once they exceed the maximum age, and the oldest entries are
+    evicted once max_entries is reached. Per-user lookups read a deque of
+    that user's entries instead of filtering the whole log.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100_000,
+        max_age: timedelta | None = timedelta(days=30),
+        partition_size: timedelta = timedelta(hours=1),
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._partition_seconds = partition_size.total_seconds()
+        self._partitions: deque[tuple[int, deque[ActivityLog]]] = deque()
+        self._by_user: dict[str, deque[ActivityLog]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[ActivityLog]:
+        for _, entries in self._partitions:
+            yield from entries
+
+    def append(self, entry: ActivityLog, now: float | None = None) -> None:
+        """Adds an entry and evicts whatever falls outside the retention limits"""
+        if now is None:
+            now = time.time()
+
+        partition = int(now // self._partition_seconds)
+        if not self._partitions or self._partitions[-1][0] < partition:
+            self._partitions.append((partition, deque()))
+        self._partitions[-1][1].append(entry)
+        self._by_user.setdefault(entry.user_id, deque()).append(entry)
+        self._size += 1
+
+        if self.max_age is not None:
+            self.evict_older_than(now - self.max_age.total_seconds())
+        while self._size > self.max_entries:
+            self._evict_oldest()
+
+    def extend(self, entries: list[ActivityLog], now: float | None = None) -> None:
+        """Adds a batch of entries logged at the same time, evicting once"""
+        if not entries:
+            return
+        if now is None:
+            now = time.time()
+
+        partition = int(now // self._partition_seconds)
+        if not self._partitions or self._partitions[-1][0] < partition:
+            self._partitions.append((partition, deque()))
+        self._partitions[-1][1].extend(entries)
+        for entry in entries:
+            self._by_user.setdefault(entry.user_id, deque()).append(entry)
+        self._size += len(entries)
+
+        if self.max_age is not None:
+            self.evict_older_than(now - self.max_age.total_seconds())
+        while self._size > self.max_entries:
+            self._evict_oldest()
+
+    def for_user(self, user_id: str) -> list[ActivityLog]:
+        """Returns a user's entries, oldest first"""
+        return list(self._by_user.get(user_id, ()))
+
+    def evict_older_than(self, cutoff: float) -> None:
+        """Drops every partition that ended before the cutoff timestamp"""
+        while self._partitions and (
+            (self._partitions[0][0] + 1) * self._partition_seconds <= cutoff
+        ):
+            for _ in range(len(self._partitions[0][1])):
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Removes the oldest entry from its partition and its user's index"""
+        partition = self._partitions[0][1]
+        entry = partition.popleft()
+        if not partition:
+            self._partitions.popleft()
+
+        # Entries are appended in time order, so the oldest entry overall is
+        # also the oldest remaining entry of its user
+        user_entries = self._by_user[entry.user_id]
+        user_entries.popleft()
+        if not user_entries:
+            del self._by_user[entry.user_id]
+        self._size -= 1
+
+
 class UserManager:
-    def __init__(self):
+    def __init__(
+        self,
+        concurrent: bool = False,
+        lock_stripes: int = 64,
+        password_hasher: PasswordHasher | None = None,
+    ):
+        """Creates a user manager
+
+        Passwords are hashed with password_hasher. The default, scrypt at
+        cost 14, deliberately takes about 50 ms per hash, which every
+        create_user, login and password update pays; pass a lower cost where
+        that is too slow, e.g. in tests. Hashes from older parameters or the
+        legacy "hashed_" format are upgraded on the next successful login.
+
+        With concurrent=True one instance can be shared between threads.
+        Writes lock one of lock_stripes locks chosen by user id (plus the
+        stripes of the username and email they claim), session validation
+        reads without locking, and get_all_users serves a copy-on-write
+        snapshot.
+        """
+        if lock_stripes < 1:
+            raise ValueError("lock_stripes must be at least 1")
+        self.concurrent = concurrent
+        self.password_hasher = password_hasher or PasswordHasher()
+        self._locks: list[AbstractContextManager[Any]] = (
+            [threading.RLock() for _ in range(lock_stripes)]
+            if concurrent
+            else [nullcontext()]
+        )
         self.users: dict[str, User] = {}
+        # Unique version numbers, so concurrent writers never reuse one
+        self._users_versions = itertools.count(1)
+        self._users_version = 0
+        self._users_snapshot: tuple[int, tuple[User, ...]] = (0, ())
+        self._user_ids_by_username: dict[str, str] = {}
+        self._user_ids_by_email: dict[str, str] = {}
         self.sessions: dict[str, Session] = {}
+        self._session_tokens_by_user: dict[str, set[str]] = {}
+        # One expiry heap and live-session count per lock stripe
+        self._session_expiry_heaps: list[list[tuple[float, str]]] = [
+            [] for _ in self._locks
+        ]
+        self._session_counts = [0] * len(self._locks)
         self.roles: dict[str, Role] = {}
+        # Cached permissions are tagged with the generation and the user's roles
+        # they were computed from
+        self._effective_permissions: dict[
+            str, tuple[int, tuple[str, ...], frozenset[str]]
+        ] = {}
+        self._permission_generations = itertools.count(1)
+        self._permission_generation = 0
         self.permissions: dict[str, str] = {}
-        self.activity_log: list[ActivityLog] = []
+        self.activity_log = ActivityLogStore()
+        self._pending_activity: deque[tuple[ActivityLog, float]] = deque()
+        self._activity_lock = threading.Lock()
         self.email_queue: list[EmailItem] = []
+        self.email_dispatcher: EmailDispatcher | None = None
         self.email_enabled: bool = True
         self.logging_enabled: bool = True
 
@@ -103,8 +443,7 @@ class UserManager:
             raise ValueError("Username already exists")
 
         # Validate email
-        email_pattern = r"^[^\s@]+@[^\s@]+\.[^\s@]+$"
-        if not re.match(email_pattern, email):
+        if not EMAIL_PATTERN.match(email):
             raise ValueError("Invalid email address")
 
         if self.get_user_by_email(email) is not None:
@@ -114,11 +453,7 @@ class UserManager:
         if len(password) < 8:
             raise ValueError("Password must be at least 8 characters long")
 
-        if not (
-            re.search(r"[A-Z]", password)
-            and re.search(r"[a-z]", password)
-            and re.search(r"[0-9]", password)
-        ):
+        if not PASSWORD_COMPLEXITY_PATTERN.match(password):
             raise ValueError("Password must contain uppercase, lowercase, and numbers")
 
         # Validate roles
@@ -144,7 +479,19 @@ class UserManager:
             email_verified=False,
         )
 
-        self.users[user.id] = user
+        username_key = self._normalize_key(username)
+        email_key = self._normalize_key(email)
+        with self._locked(username_key, email_key):
+            # Check again under the locks in case another thread claimed them
+            if username_key in self._user_ids_by_username:
+                raise ValueError("Username already exists")
+            if email_key in self._user_ids_by_email:
+                raise ValueError("Email already registered")
+
+            self.users[user.id] = user
+            self._user_ids_by_username[username_key] = user.id
+            self._user_ids_by_email[email_key] = user.id
+            self._users_version = next(self._users_versions)
 
         # Log activity
         self._log_activity(user.id, "user_created", f"User {username} created")
@@ -154,8 +501,120 @@ class UserManager:
 
         return user
 
+    def create_users_bulk(self, rows: Iterable[dict[str, Any]]) -> BulkCreateResult:
+        """Creates many users at once, skipping the rows that fail validation
+
+        Each row holds the keyword arguments of create_user. Rows are checked
+        in one pass against the existing users and the earlier rows of the
+        batch; the errors of rejected rows are returned by row index. Passwords
+        are hashed on the password hasher's thread pool, and the activity log
+        entries and welcome emails of the batch are written together.
+        """
+        errors: dict[int, str] = {}
+        valid: list[tuple[int, str, str, str, list[str]]] = []
+        batch_usernames: set[str] = set()
+        batch_emails: set[str] = set()
+
+        for index, row in enumerate(rows):
+            username = row.get("username") or ""
+            email = row.get("email") or ""
+            password = row.get("password") or ""
+            roles = row.get("roles")
+            if roles is None:
+                roles = ["user"]
+            username_key = self._normalize_key(username)
+            email_key = self._normalize_key(email)
+
+            error = None
+            if len(username) < 3:
+                error = "Username must be at least 3 characters long"
+            elif (
+                username_key in batch_usernames
+                or username_key in self._user_ids_by_username
+            ):
+                error = "Username already exists"
+            elif not EMAIL_PATTERN.match(email):
+                error = "Invalid email address"
+            elif email_key in batch_emails or email_key in self._user_ids_by_email:
+                error = "Email already registered"
+            elif len(password) < 8:
+                error = "Password must be at least 8 characters long"
+            elif not PASSWORD_COMPLEXITY_PATTERN.match(password):
+                error = "Password must contain uppercase, lowercase, and numbers"
+            else:
+                invalid_roles = [role for role in roles if role not in self.roles]
+                if invalid_roles:
+                    error = f"Invalid role: {invalid_roles[0]}"
+
+            if error is not None:
+                errors[index] = error
+                continue
+
+            batch_usernames.add(username_key)
+            batch_emails.add(email_key)
+            valid.append((index, username, email, password, list(roles)))
+
+        hashed_passwords = self.password_hasher.executor.map(
+            self._hash_password, [password for _, _, _, password, _ in valid]
+        )
+
+        users = []
+        now = datetime.now().isoformat()
+        for (index, username, email, _, roles), hashed_password in zip(
+            valid, hashed_passwords, strict=True
+        ):
+            user = User(
+                id=str(uuid.uuid4()),
+                username=username,
+                email=email,
+                password=hashed_password,
+                roles=roles,
+                created_at=now,
+                updated_at=now,
+                last_login=None,
+                login_count=0,
+                status="active",
+                email_verified=False,
+            )
+            username_key = self._normalize_key(username)
+            email_key = self._normalize_key(email)
+            with self._locked(username_key, email_key):
+                # Another thread may have claimed the name since validation
+                if username_key in self._user_ids_by_username:
+                    errors[index] = "Username already exists"
+                    continue
+                if email_key in self._user_ids_by_email:
+                    errors[index] = "Email already registered"
+                    continue
+
+                self.users[user.id] = user
+                self._user_ids_by_username[username_key] = user.id
+                self._user_ids_by_email[email_key] = user.id
+                self._users_version = next(self._users_versions)
+            users.append(user)
+
+        self._log_activities(
+            [
+                (user.id, "user_created", f"User {user.username} created")
+                for user in users
+            ]
+        )
+        self._send_welcome_emails(users)
+
+        return BulkCreateResult(users=users, errors=dict(sorted(errors.items())))
+
     def update_user(self, user_id: str, data: dict[str, Any]) -> User:
         """Updates user information with validation"""
+        claimed_keys = [
+            self._normalize_key(data[key])
+            for key in ("username", "email")
+            if isinstance(data.get(key), str)
+        ]
+        with self._locked(user_id, *claimed_keys):
+            return self._update_user(user_id, data)
+
+    def _update_user(self, user_id: str, data: dict[str, Any]) -> User:
+        """Applies update_user while holding the locks of the user and new keys"""
         user = self.get_user_by_id(user_id)
         if user is None:
             raise ValueError("User not found")
@@ -169,12 +628,13 @@ class UserManager:
             if existing_user is not None and existing_user.id != user_id:
                 raise ValueError("Username already exists")
 
+            del self._user_ids_by_username[self._normalize_key(user.username)]
+            self._user_ids_by_username[self._normalize_key(data["username"])] = user_id
             user.username = data["username"]
 
         # Validate and update email
         if "email" in data:
-            email_pattern = r"^[^\s@]+@[^\s@]+\.[^\s@]+$"
-            if not re.match(email_pattern, data["email"]):
+            if not EMAIL_PATTERN.match(data["email"]):
                 raise ValueError("Invalid email address")
 
             existing_user = self.get_user_by_email(data["email"])
@@ -182,6 +642,8 @@ class UserManager:
                 raise ValueError("Email already registered")
 
             old_email = user.email
+            del self._user_ids_by_email[self._normalize_key(old_email)]
+            self._user_ids_by_email[self._normalize_key(data["email"])] = user_id
             user.email = data["email"]
             user.email_verified = False
 
@@ -193,11 +655,7 @@ class UserManager:
             if len(data["password"]) < 8:
                 raise ValueError("Password must be at least 8 characters long")
 
-            if not (
-                re.search(r"[A-Z]", data["password"])
-                and re.search(r"[a-z]", data["password"])
-                and re.search(r"[0-9]", data["password"])
-            ):
+            if not PASSWORD_COMPLEXITY_PATTERN.match(data["password"]):
                 raise ValueError(
                     "Password must contain uppercase, lowercase, and numbers"
                 )
@@ -210,6 +668,7 @@ class UserManager:
                 if role not in self.roles:
                     raise ValueError(f"Invalid role: {role}")
             user.roles = data["roles"]
+            self._effective_permissions.pop(user_id, None)
 
         # Update profile data
         if "profile" in data:
@@ -231,9 +690,25 @@ class UserManager:
 
     def delete_user(self, user_id: str) -> bool:
         """Deletes a user and cleans up associated data"""
-        user = self.get_user_by_id(user_id)
-        if user is None:
-            raise ValueError("User not found")
+        while True:
+            user = self.get_user_by_id(user_id)
+            if user is None:
+                raise ValueError("User not found")
+
+            username, email = user.username, user.email
+            with self._locked(
+                user_id, self._normalize_key(username), self._normalize_key(email)
+            ):
+                # Retry if the user was renamed before the locks were taken
+                if self.users.get(user_id) is user and (user.username, user.email) == (
+                    username,
+                    email,
+                ):
+                    return self._delete_user(user)
+
+    def _delete_user(self, user: User) -> bool:
+        """Applies delete_user while holding the locks of the user and its keys"""
+        user_id = user.id
 
         # Log activity before deletion
         self._log_activity(user_id, "user_deleted", f"User {user.username} deleted")
@@ -246,6 +721,10 @@ class UserManager:
 
         # Remove user
         del self.users[user_id]
+        self._effective_permissions.pop(user_id, None)
+        del self._user_ids_by_username[self._normalize_key(user.username)]
+        del self._user_ids_by_email[self._normalize_key(user.email)]
+        self._users_version = next(self._users_versions)
 
         return True
 
@@ -253,6 +732,33 @@ class UserManager:
 
     def login(self, username: str, password: str) -> Session:
         """Authenticates user and creates session"""
+        user = self._get_login_user(username)
+        stored_hash = user.password
+        verified = self._verify_password(password, stored_hash)
+        new_hash = None
+        if verified and self.password_hasher.needs_rehash(stored_hash):
+            new_hash = self._hash_password(password)
+
+        return self._complete_login(user, username, stored_hash, verified, new_hash)
+
+    async def login_async(self, username: str, password: str) -> Session:
+        """Like login, but hashes on the password hasher's thread pool"""
+        user = self._get_login_user(username)
+        stored_hash = user.password
+        verified = await asyncio.get_running_loop().run_in_executor(
+            self.password_hasher.executor,
+            self._verify_password,
+            password,
+            stored_hash,
+        )
+        new_hash = None
+        if verified and self.password_hasher.needs_rehash(stored_hash):
+            new_hash = await self.password_hasher.hash_async(password)
+
+        return self._complete_login(user, username, stored_hash, verified, new_hash)
+
+    def _get_login_user(self, username: str) -> User:
+        """Finds the active user a login attempt is for"""
         user = self.get_user_by_username(username)
         if user is None:
             raise ValueError("Invalid username or password")
@@ -260,30 +766,52 @@ class UserManager:
         if user.status != "active":
             raise RuntimeError("Account is not active")
 
-        if not self._verify_password(password, user.password):
+        return user
+
+    def _complete_login(
+        self,
+        user: User,
+        username: str,
+        stored_hash: str,
+        verified: bool,
+        new_hash: str | None,
+    ) -> Session:
+        """Creates the session once the password has been checked"""
+        if not verified:
             # Log failed login attempt
             self._log_activity(
                 user.id, "login_failed", f"Failed login attempt for {username}"
             )
             raise ValueError("Invalid username or password")
 
+        # Evict sessions of this user's stripe that expired since the last login
+        self._purge_expired_stripe(self._stripe(user.id), time.time())
+
         # Generate session token
         session_token = self._generate_session_token()
+        expires_at = datetime.now() + timedelta(hours=24)
         session = Session(
             token=session_token,
             user_id=user.id,
             created_at=datetime.now().isoformat(),
-            expires_at=(datetime.now() + timedelta(hours=24)).isoformat(),
+            expires_at=expires_at.isoformat(),
             ip_address="unknown",  # Would be from request in real app
             user_agent="unknown",  # Would be from request in real app
         )
 
-        self.sessions[session_token] = session
+        with self._locked(user.id):
+            if self.users.get(user.id) is not user:
+                raise ValueError("Invalid username or password")
+
+            self._add_session(session)
 
-        # Update user login info
-        user.last_login = datetime.now().isoformat()
-        user.login_count += 1
-        self.users[user.id] = user
+            # Upgrade the stored hash unless the password changed meanwhile
+            if new_hash is not None and user.password == stored_hash:
+                user.password = new_hash
+
+            # Update user login info
+            user.last_login = datetime.now().isoformat()
+            user.login_count += 1
 
         # Log successful login
         self._log_activity(user.id, "login_success", f"User {username} logged in")
@@ -297,27 +825,26 @@ class UserManager:
 
     def validate_session(self, token: str) -> User | None:
         """Validates session token and returns user data"""
-        if token not in self.sessions:
+        session = self.sessions.get(token)
+        if session is None:
             return None
 
-        session = self.sessions[token]
-
         # Check if session is expired
-        if datetime.fromisoformat(session.expires_at) < datetime.now():
-            del self.sessions[token]
+        if session.expires_at_timestamp < time.time():
+            self._discard_session(session)
             return None
 
         user = self.get_user_by_id(session.user_id)
         if user is None or user.status != "active":
-            del self.sessions[token]
+            self._discard_session(session)
             return None
 
         return user
 
     def logout(self, token: str) -> bool:
         """Logs out user and destroys session"""
-        if token in self.sessions:
-            session = self.sessions[token]
+        session = self.sessions.get(token)
+        if session is not None and self._discard_session(session):
             user = self.get_user_by_id(session.user_id)
 
             if user is not None:
@@ -325,11 +852,35 @@ class UserManager:
                     user.id, "logout", f"User {user.username} logged out"
                 )
 
-            del self.sessions[token]
             return True
 
         return False
 
+    def purge_expired_sessions(self, now: float | None = None) -> int:
+        """Removes every expired session and returns how many were removed"""
+        if now is None:
+            now = time.time()
+
+        return sum(
+            self._purge_expired_stripe(stripe, now)
+            for stripe in range(len(self._locks))
+        )
+
+    def _purge_expired_stripe(self, stripe: int, now: float) -> int:
+        """Removes the expired sessions of users in one lock stripe"""
+        purged = 0
+        with self._locks[stripe]:
+            heap = self._session_expiry_heaps[stripe]
+            while heap and heap[0][0] < now:
+                expires_at, token = heapq.heappop(heap)
+                session = self.sessions.get(token)
+                # Entries of sessions that already ended are skipped lazily
+                if session is not None and session.expires_at_timestamp == expires_at:
+                    self._remove_session(token)
+                    purged += 1
+
+        return purged
+
     # ==== AUTHORIZATION ====
 
     def has_permission(self, user_id: str, permission: str) -> bool:
@@ -338,13 +889,30 @@ class UserManager:
         if user is None or user.status != "active":
             return False
 
-        for role_name in user.roles:
-            if role_name in self.roles:
-                role = self.roles[role_name]
-                if permission in role.permissions:
-                    return True
+        return permission in self._get_effective_permissions(user)
 
-        return False
+    def has_permissions_bulk(
+        self, user_ids: list[str], permission: str
+    ) -> dict[str, bool]:
+        """Checks one permission for many users
+
+        The role table is scanned once for the roles granting the permission,
+        so each user costs one set check instead of a permission lookup.
+        """
+        granting_roles = frozenset(
+            role_name
+            for role_name, role in self.roles.items()
+            if permission in role.permissions
+        )
+        result = {}
+        for user_id in user_ids:
+            user = self.get_user_by_id(user_id)
+            result[user_id] = (
+                user is not None
+                and user.status == "active"
+                and not granting_roles.isdisjoint(user.roles)
+            )
+        return result
 
     def has_role(self, user_id: str, role_name: str) -> bool:
         """Checks if user has specific role"""
@@ -359,21 +927,60 @@ class UserManager:
         if role_name not in self.roles:
             raise ValueError(f"Invalid role: {role_name}")
 
-        user = self.get_user_by_id(user_id)
-        if user is None:
-            raise ValueError("User not found")
+        with self._locked(user_id):
+            user = self.get_user_by_id(user_id)
+            if user is None:
+                raise ValueError("User not found")
 
-        if role_name not in user.roles:
-            user.roles.append(role_name)
-            self.users[user_id] = user
-            self._log_activity(
-                user_id,
-                "role_assigned",
-                f"Role {role_name} assigned to user {user.username}",
-            )
+            if role_name not in user.roles:
+                user.roles.append(role_name)
+                self.users[user_id] = user
+                self._effective_permissions.pop(user_id, None)
+                self._log_activity(
+                    user_id,
+                    "role_assigned",
+                    f"Role {role_name} assigned to user {user.username}",
+                )
 
         return True
 
+    def set_role(self, role_key: str, name: str, permissions: list[str]) -> Role:
+        """Creates or replaces a role and invalidates cached permissions"""
+        role = Role(name=name, permissions=tuple(permissions))
+        self.roles[role_key] = role
+        self.invalidate_permission_cache()
+        return role
+
+    def invalidate_permission_cache(self) -> None:
+        """Drops all cached effective permissions, e.g. after editing self.roles"""
+        self._permission_generation = next(self._permission_generations)
+        self._effective_permissions.clear()
+
+    def _get_effective_permissions(self, user: User) -> frozenset[str]:
+        """Returns the union of the user's role permissions, cached per user
+
+        Misses are computed under the user's lock stripe, which role changes
+        also hold. Entries from before the last invalidation, or computed from
+        other roles than the user has now, e.g. after user.roles was edited in
+        place, are ignored, so stale permissions are never served.
+        """
+        generation = self._permission_generation
+        roles = tuple(user.roles)
+        cached = self._effective_permissions.get(user.id)
+        if cached is not None and cached[:2] == (generation, roles):
+            return cached[2]
+
+        with self._locked(user.id):
+            permissions = frozenset(
+                permission
+                for role_name in roles
+                if role_name in self.roles
+                for permission in self.roles[role_name].permissions
+            )
+            if self.users.get(user.id) is user:
+                self._effective_permissions[user.id] = (generation, roles, permissions)
+        return permissions
+
     # ==== EMAIL OPERATIONS ====
 
     def _send_welcome_email(self, email: str, username: str) -> None:
@@ -382,9 +989,24 @@ class UserManager:
             return
 
         subject = "Welcome to our platform!"
-        message = f"Hello {username},\n\nWelcome to our platform! Your account has been created successfully.\n\nBest regards,\nThe Team"
+        self._queue_email(email, subject, partial(self._welcome_message, username))
+
+    def _send_welcome_emails(self, users: list[User]) -> None:
+        """Sends the welcome emails of a bulk import as one batch"""
+        if not self.email_enabled:
+            return
+
+        subject = "Welcome to our platform!"
+        self._queue_emails(
+            [
+                (user.email, subject, partial(self._welcome_message, user.username))
+                for user in users
+            ]
+        )
 
-        self._queue_email(email, subject, message)
+    def _welcome_message(self, username: str) -> str:
+        """Builds the body of the welcome email"""
+        return f"Hello {username},\n\nWelcome to our platform! Your account has been created successfully.\n\nBest regards,\nThe Team"
 
     def _send_email_change_notification(self, old_email: str, new_email: str) -> None:
         """Sends email change notification"""
@@ -392,10 +1014,12 @@ class UserManager:
             return
 
         subject = "Email address changed"
-        message = f"Your email address has been changed from {old_email} to {new_email}.\n\nIf you didn't make this change, please contact support immediately."
 
-        self._queue_email(old_email, subject, message)
-        self._queue_email(new_email, subject, message)
+        def build_message() -> str:
+            return f"Your email address has been changed from {old_email} to {new_email}.\n\nIf you didn't make this change, please contact support immediately."
+
+        self._queue_email(old_email, subject, build_message)
+        self._queue_email(new_email, subject, build_message)
 
     def _send_login_notification_email(
         self, email: str, username: str, ip_address: str
@@ -405,9 +1029,11 @@ class UserManager:
             return
 
         subject = "New login detected"
-        message = f"Hello {username},\n\nA new login was detected from IP address: {ip_address}\n\nIf this wasn't you, please change your password immediately."
-
-        self._queue_email(email, subject, message)
+        self._queue_email(
+            email,
+            subject,
+            lambda: f"Hello {username},\n\nA new login was detected from IP address: {ip_address}\n\nIf this wasn't you, please change your password immediately.",
+        )
 
     def _send_goodbye_email(self, email: str, username: str) -> None:
         """Sends goodbye email when user is deleted"""
@@ -415,21 +1041,55 @@ class UserManager:
             return
 
         subject = "Account deleted"
-        message = f"Hello {username},\n\nYour account has been deleted. We're sorry to see you go!\n\nBest regards,\nThe Team"
+        self._queue_email(
+            email,
+            subject,
+            lambda: f"Hello {username},\n\nYour account has been deleted. We're sorry to see you go!\n\nBest regards,\nThe Team",
+        )
+
+    def _queue_email(
+        self, to: str, subject: str, build_message: Callable[[], str]
+    ) -> None:
+        """Queues email for sending
 
-        self._queue_email(email, subject, message)
+        With a dispatcher attached the message is built and sent on its
+        worker threads, so the caller never waits for either.
+        """
+        if self.email_dispatcher is not None:
+            self.email_dispatcher.submit(to, subject, build_message)
+            return
 
-    def _queue_email(self, to: str, subject: str, message: str) -> None:
-        """Queues email for sending"""
         self.email_queue.append(
             EmailItem(
                 to=to,
                 subject=subject,
-                message=message,
+                message=build_message(),
                 queued_at=datetime.now().isoformat(),
             )
         )
 
+    def _queue_emails(self, emails: list[tuple[str, str, Callable[[], str]]]) -> None:
+        """Queues a batch of emails given as (to, subject, build_message)"""
+        if self.email_dispatcher is not None:
+            for to, subject, build_message in emails:
+                self.email_dispatcher.submit(to, subject, build_message)
+            return
+
+        queued_at = datetime.now().isoformat()
+        self.email_queue.extend(
+            EmailItem(
+                to=to, subject=subject, message=build_message(), queued_at=queued_at
+            )
+            for to, subject, build_message in emails
+        )
+
+    def attach_email_dispatcher(self, dispatcher: "EmailDispatcher") -> None:
+        """Routes future emails through a dispatcher and hands it the queued ones"""
+        self.email_dispatcher = dispatcher
+        pending, self.email_queue = self.email_queue, []
+        for item in pending:
+            dispatcher.submit_item(item)
+
     # ==== ACTIVITY LOGGING ====
 
     def _log_activity(self, user_id: str, action: str, description: str) -> None:
@@ -437,19 +1097,67 @@ class UserManager:
         if not self.logging_enabled:
             return
 
-        self.activity_log.append(
+        entry = ActivityLog(
+            user_id=user_id,
+            action=action,
+            description=description,
+            timestamp=datetime.now().isoformat(),
+            ip_address="unknown",  # Would be from request in real app
+        )
+        if not self.concurrent:
+            self.activity_log.append(entry)
+            return
+
+        # Writers never wait for each other: entries are buffered and whichever
+        # thread finds the log unlocked moves the buffer into it
+        self._pending_activity.append((entry, time.time()))
+        if self._activity_lock.acquire(blocking=False):
+            try:
+                self._drain_pending_activity()
+            finally:
+                self._activity_lock.release()
+
+    def _log_activities(self, activities: list[tuple[str, str, str]]) -> None:
+        """Logs a batch of (user_id, action, description) activities at once"""
+        if not self.logging_enabled or not activities:
+            return
+
+        timestamp = datetime.now().isoformat()
+        entries = [
             ActivityLog(
                 user_id=user_id,
                 action=action,
                 description=description,
-                timestamp=datetime.now().isoformat(),
+                timestamp=timestamp,
                 ip_address="unknown",  # Would be from request in real app
             )
-        )
+            for user_id, action, description in activities
+        ]
+        if not self.concurrent:
+            self.activity_log.extend(entries)
+            return
+
+        with self._activity_lock:
+            self._drain_pending_activity()
+            self.activity_log.extend(entries)
+
+    def _drain_pending_activity(self) -> None:
+        """Moves buffered entries into the activity log; needs _activity_lock"""
+        pending = self._pending_activity
+        while pending:
+            entry, logged_at = pending.popleft()
+            self.activity_log.append(entry, logged_at)
+
+    def _flush_activity_log(self) -> None:
+        """Makes every buffered entry visible to readers of the activity log"""
+        if self.concurrent:
+            with self._activity_lock:
+                self._drain_pending_activity()
 
     def get_user_activity_log(self, user_id: str) -> list[ActivityLog]:
         """Gets activity log for specific user"""
-        return [log for log in self.activity_log if log.user_id == user_id]
+        self._flush_activity_log()
+        return self.activity_log.for_user(user_id)
 
     # ==== HELPER METHODS ====
 
@@ -458,22 +1166,28 @@ class UserManager:
         return self.users.get(user_id)
 
     def get_user_by_username(self, username: str) -> User | None:
-        """Gets user by username"""
-        for user in self.users.values():
-            if user.username == username:
-                return user
-        return None
+        """Gets user by username, ignoring case"""
+        user_id = self._user_ids_by_username.get(self._normalize_key(username))
+        return None if user_id is None else self.users.get(user_id)
 
     def get_user_by_email(self, email: str) -> User | None:
-        """Gets user by email"""
-        for user in self.users.values():
-            if user.email == email:
-                return user
-        return None
+        """Gets user by email, ignoring case"""
+        user_id = self._user_ids_by_email.get(self._normalize_key(email))
+        return None if user_id is None else self.users.get(user_id)
 
     def get_all_users(self) -> list[User]:
         """Gets all users"""
-        return list(self.users.values())
+        if not self.concurrent:
+            return list(self.users.values())
+
+        # Writers only bump the version; the first reader after a change
+        # copies the users once and later readers share that snapshot
+        version, users = self._users_snapshot
+        if version != self._users_version:
+            version = self._users_version
+            users = tuple(self.users.copy().values())
+            self._users_snapshot = (version, users)
+        return list(users)
 
     def get_user_count(self) -> int:
         """Gets user count"""
@@ -481,32 +1195,90 @@ class UserManager:
 
     def _cleanup_user_sessions(self, user_id: str) -> None:
         """Cleans up sessions for a user"""
-        tokens_to_remove = []
-        for token, session in self.sessions.items():
-            if session.user_id == user_id:
-                tokens_to_remove.append(token)
+        for token in list(self._session_tokens_by_user.get(user_id, ())):
+            self._remove_session(token)
+
+    def _stripe(self, key: str) -> int:
+        """Returns the lock stripe guarding a user id, username or email key"""
+        return hash(key) % len(self._locks)
+
+    @contextmanager
+    def _locked(self, *keys: str) -> Iterator[None]:
+        """Holds the stripe locks of all keys, taken in stripe order"""
+        with ExitStack() as stack:
+            for stripe in sorted({self._stripe(key) for key in keys}):
+                stack.enter_context(self._locks[stripe])
+            yield
+
+    def _add_session(self, session: Session) -> None:
+        """Stores a session and registers it in the user and expiry indexes
+
+        Callers hold the lock stripe of the session's user.
+        """
+        stripe = self._stripe(session.user_id)
+        self.sessions[session.token] = session
+        self._session_tokens_by_user.setdefault(session.user_id, set()).add(
+            session.token
+        )
+        heapq.heappush(
+            self._session_expiry_heaps[stripe],
+            (session.expires_at_timestamp, session.token),
+        )
+        self._session_counts[stripe] += 1
+
+    def _discard_session(self, session: Session) -> bool:
+        """Removes a session unless another thread already has"""
+        with self._locked(session.user_id):
+            if self.sessions.get(session.token) is not session:
+                return False
+            self._remove_session(session.token)
+            return True
 
-        for token in tokens_to_remove:
-            del self.sessions[token]
+    def _remove_session(self, token: str) -> None:
+        """Removes a session from the store and its indexes
+
+        Callers hold the lock stripe of the session's user.
+        """
+        session = self.sessions.pop(token)
+        user_tokens = self._session_tokens_by_user[session.user_id]
+        user_tokens.discard(token)
+        if not user_tokens:
+            del self._session_tokens_by_user[session.user_id]
+
+        stripe = self._stripe(session.user_id)
+        self._session_counts[stripe] -= 1
+
+        # Heap entries are dropped lazily; rebuild once most of them are stale
+        heap = self._session_expiry_heaps[stripe]
+        if len(heap) > 2 * self._session_counts[stripe] + 64:
+            live = [
+                (expires_at, live_token)
+                for expires_at, live_token in heap
+                if (active := self.sessions.get(live_token)) is not None
+                and active.expires_at_timestamp == expires_at
+            ]
+            heapq.heapify(live)
+            self._session_expiry_heaps[stripe] = live
 
     def _initialize_default_roles(self) -> None:
         """Initializes default roles"""
+        self._effective_permissions.clear()
         self.roles = {
             "admin": Role(
                 name="Administrator",
-                permissions=[
+                permissions=(
                     "user_create",
                     "user_read",
                     "user_update",
                     "user_delete",
                     "admin_panel",
-                ],
+                ),
             ),
             "moderator": Role(
                 name="Moderator",
-                permissions=["user_read", "user_update", "moderate_content"],
+                permissions=("user_read", "user_update", "moderate_content"),
             ),
-            "user": Role(name="User", permissions=["user_read", "profile_update"]),
+            "user": Role(name="User", permissions=("user_read", "profile_update")),
         }
 
     def _initialize_default_permissions(self) -> None:
@@ -522,6 +1294,10 @@ class UserManager:
         }
 
     # Utility methods
+    def _normalize_key(self, value: str) -> str:
+        """Normalizes usernames and emails for case-insensitive lookups"""
+        return value.casefold()
+
     def _generate_id(self) -> str:
         """Generates a unique ID"""
         return str(uuid.uuid4())
@@ -531,12 +1307,17 @@ class UserManager:
         return str(uuid.uuid4()).replace("-", "")
 
     def _hash_password(self, password: str) -> str:
-        """Hashes a password (simplified for demo)"""
-        return f"hashed_{password}"
+        """Hashes a password with a salted, tunable key derivation function"""
+        return self.password_hasher.hash(password)
 
     def _verify_password(self, password: str, hashed_password: str) -> bool:
         """Verifies a password against its hash"""
-        return hashed_password == f"hashed_{password}"
+        if hashed_password.startswith("hashed_"):
+            # Legacy format, replaced on the next successful login
+            return hmac.compare_digest(
+                hashed_password.encode(), f"hashed_{password}".encode()
+            )
+        return self.password_hasher.verify(password, hashed_password)
 
     # Configuration methods
     def set_email_enabled(self, enabled: bool) -> None:
@@ -553,4 +1334,5 @@ class UserManager:
 
     def get_activity_log(self) -> list[ActivityLog]:
         """Gets activity log"""
-        return self.activity_log
+        self._flush_activity_log()
+        return list(self.activity_log)
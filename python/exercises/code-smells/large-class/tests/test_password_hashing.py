@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from password_hashing import PasswordHasher, benchmark
+
+
+class TestPasswordHasher:
+    @pytest.mark.parametrize("algorithm", ["scrypt", "pbkdf2_sha256"])
+    def test_hash_and_verify(self, algorithm):
+        """Test that a hash verifies only the password it was made from."""
+        hasher = PasswordHasher(algorithm, cost=4)
+        encoded = hasher.hash("Password123")
+
+        assert encoded.startswith(f"{algorithm}$4$")
+        assert hasher.verify("Password123", encoded)
+        assert not hasher.verify("Password124", encoded)
+
+    def test_hashes_are_salted(self):
+        """Test that hashing the same password twice gives different hashes."""
+        hasher = PasswordHasher(cost=4)
+
+        assert hasher.hash("Password123") != hasher.hash("Password123")
+
+    def test_verify_uses_parameters_stored_in_hash(self):
+        """Test that hashes made with other parameters still verify."""
+        old_hash = PasswordHasher("pbkdf2_sha256", cost=5).hash("Password123")
+        hasher = PasswordHasher(cost=4)
+
+        assert hasher.verify("Password123", old_hash)
+        assert hasher.needs_rehash(old_hash)
+        assert not hasher.needs_rehash(hasher.hash("Password123"))
+
+    def test_unknown_formats_do_not_verify(self):
+        """Test that malformed or foreign hashes are rejected and need rehashing."""
+        hasher = PasswordHasher(cost=4)
+
+        for encoded in ["hashed_Password123", "scrypt$x$00$00", "scrypt$4$zz$00", ""]:
+            assert not hasher.verify("Password123", encoded)
+            assert hasher.needs_rehash(encoded)
+
+    def test_invalid_parameters(self):
+        """Test that unknown algorithms and out-of-range costs are rejected."""
+        with pytest.raises(ValueError, match="Unsupported hashing algorithm: md5"):
+            PasswordHasher("md5")
+        with pytest.raises(ValueError, match="cost must be between 1 and 24"):
+            PasswordHasher(cost=0)
+
+    def test_verify_on_executor(self):
+        """Test verification off the caller's thread, sync and async."""
+        hasher = PasswordHasher(cost=4, max_workers=2)
+        encoded = hasher.hash("Password123")
+
+        assert hasher.submit_verify("Password123", encoded).result()
+        assert asyncio.run(hasher.verify_async("Password123", encoded))
+        assert hasher.verify(
+            "Password123", asyncio.run(hasher.hash_async("Password123"))
+        )
+        hasher.shutdown()
+
+    def test_benchmark_reports_each_cost_level(self):
+        """Test that the benchmark measures every requested cost."""
+        results = benchmark("pbkdf2_sha256", range(1, 4), min_seconds=0.01)
+
+        assert [result.cost for result in results] == [1, 2, 3]
+        for result in results:
+            assert result.logins_per_second_per_core == pytest.approx(
+                1 / result.seconds_per_hash
+            )
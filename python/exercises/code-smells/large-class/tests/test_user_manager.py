@@ -1,4 +1,8 @@
+import asyncio
 import sys
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
@@ -6,13 +10,25 @@ import pytest
 # Add the src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from user_manager import UserManager
+from password_hashing import PasswordHasher
+from user_manager import (
+    ActivityLog,
+    ActivityLogStore,
+    EmailDispatcher,
+    EmailItem,
+    Role,
+    Session,
+    UserManager,
+)
+
+# A low cost keeps the many logins in these tests fast
+FAST_HASHER = PasswordHasher(cost=4)
 
 
 class TestUserManager:
     def setup_method(self):
         """Set up test fixtures before each test method."""
-        self.user_manager = UserManager()
+        self.user_manager = UserManager(password_hasher=FAST_HASHER)
         # Disable email and logging for tests
         self.user_manager.set_email_enabled(False)
         self.user_manager.set_logging_enabled(False)
@@ -100,6 +116,130 @@ class TestUserManager:
 
         assert updated_user.username == "newusername"
 
+    def test_create_users_bulk(self):
+        """Test creating a batch of users with per-row errors."""
+        self.user_manager.create_user("existing", "existing@example.com", "Password123")
+
+        result = self.user_manager.create_users_bulk(
+            [
+                {
+                    "username": "alice",
+                    "email": "alice@example.com",
+                    "password": "Password123",
+                },
+                {
+                    "username": "ab",
+                    "email": "ab@example.com",
+                    "password": "Password123",
+                },
+                {
+                    "username": "EXISTING",
+                    "email": "new@example.com",
+                    "password": "Password123",
+                },
+                {
+                    "username": "bob",
+                    "email": "Alice@Example.com",
+                    "password": "Password123",
+                },
+                {
+                    "username": "carol",
+                    "email": "carol@example",
+                    "password": "Password123",
+                },
+                {"username": "dave", "email": "dave@example.com", "password": "short"},
+                {
+                    "username": "erin",
+                    "email": "erin@example.com",
+                    "password": "password123",
+                },
+                {
+                    "username": "frank",
+                    "email": "frank@example.com",
+                    "password": "Password123",
+                    "roles": ["ghost"],
+                },
+                {
+                    "username": "ALICE",
+                    "email": "alice2@example.com",
+                    "password": "Password123",
+                },
+                {
+                    "username": "grace",
+                    "email": "grace@example.com",
+                    "password": "Password123",
+                    "roles": ["admin"],
+                },
+            ]
+        )
+
+        assert [user.username for user in result.users] == ["alice", "grace"]
+        assert result.errors == {
+            1: "Username must be at least 3 characters long",
+            2: "Username already exists",
+            3: "Email already registered",
+            4: "Invalid email address",
+            5: "Password must be at least 8 characters long",
+            6: "Password must contain uppercase, lowercase, and numbers",
+            7: "Invalid role: ghost",
+            8: "Username already exists",
+        }
+        assert self.user_manager.get_user_count() == 3
+        assert self.user_manager.get_user_by_username("grace").roles == ["admin"]
+        assert self.user_manager.get_user_by_email("ALICE@example.com") is not None
+        assert self.user_manager.login("alice", "Password123") is not None
+
+    def test_create_users_bulk_keeps_empty_roles(self):
+        """Test that bulk rows default roles like create_user does."""
+        result = self.user_manager.create_users_bulk(
+            [
+                {
+                    "username": "alice",
+                    "email": "alice@example.com",
+                    "password": "Password123",
+                    "roles": [],
+                },
+                {
+                    "username": "bob",
+                    "email": "bob@example.com",
+                    "password": "Password123",
+                },
+            ]
+        )
+
+        single = self.user_manager.create_user(
+            "carol", "carol@example.com", "Password123", roles=[]
+        )
+
+        assert [user.roles for user in result.users] == [[], ["user"]]
+        assert single.roles == []
+
+    def test_create_users_bulk_logs_and_emails_in_one_batch(self):
+        """Test that bulk creation writes the log and email entries of every user."""
+        self.user_manager.set_email_enabled(True)
+        self.user_manager.set_logging_enabled(True)
+
+        result = self.user_manager.create_users_bulk(
+            {
+                "username": f"user{index}",
+                "email": f"user{index}@example.com",
+                "password": "Password123",
+            }
+            for index in range(5)
+        )
+
+        activity_log = self.user_manager.get_activity_log()
+        email_queue = self.user_manager.get_email_queue()
+        assert result.errors == {}
+        assert [entry.user_id for entry in activity_log] == [
+            user.id for user in result.users
+        ]
+        assert {entry.action for entry in activity_log} == {"user_created"}
+        assert [email.to for email in email_queue] == [
+            f"user{index}@example.com" for index in range(5)
+        ]
+        assert "Hello user3," in email_queue[3].message
+
     def test_update_user_email(self):
         """Test updating user email."""
         user = self.user_manager.create_user(
@@ -145,6 +285,62 @@ class TestUserManager:
         assert session.created_at is not None
         assert session.expires_at is not None
 
+    def test_passwords_are_stored_salted(self):
+        """Test that passwords are stored as salted hashes."""
+        first = self.user_manager.create_user(
+            "firstuser", "first@example.com", "Password123"
+        )
+        second = self.user_manager.create_user(
+            "seconduser", "second@example.com", "Password123"
+        )
+
+        assert "Password123" not in first.password
+        assert first.password.startswith("scrypt$4$")
+        assert first.password != second.password
+
+    def test_login_upgrades_legacy_password_hash(self):
+        """Test that old "hashed_" passwords still log in and get rehashed."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        user.password = "hashed_Password123"
+
+        with pytest.raises(ValueError, match="Invalid username or password"):
+            self.user_manager.login("testuser", "WrongPassword")
+        assert user.password == "hashed_Password123"
+
+        self.user_manager.login("testuser", "Password123")
+
+        assert user.password.startswith("scrypt$4$")
+        assert self.user_manager.login("testuser", "Password123") is not None
+
+    def test_login_rehashes_when_cost_changes(self):
+        """Test that changing the hasher cost upgrades hashes on login."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        old_hash = user.password
+        self.user_manager.password_hasher = PasswordHasher(cost=5)
+
+        self.user_manager.login("testuser", "Password123")
+        upgraded_hash = user.password
+        self.user_manager.login("testuser", "Password123")
+
+        assert old_hash.startswith("scrypt$4$")
+        assert upgraded_hash.startswith("scrypt$5$")
+        # Hashes with current parameters are left alone
+        assert user.password == upgraded_hash
+
+    def test_login_async(self):
+        """Test logging in from an event loop."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+
+        session = asyncio.run(self.user_manager.login_async("testuser", "Password123"))
+
+        assert self.user_manager.validate_session(session.token) is not None
+        with pytest.raises(ValueError, match="Invalid username or password"):
+            asyncio.run(self.user_manager.login_async("testuser", "WrongPassword"))
+
     def test_login_with_invalid_username(self):
         """Test login with invalid username."""
         with pytest.raises(ValueError, match="Invalid username or password"):
@@ -199,6 +395,61 @@ class TestUserManager:
 
         assert result is False
 
+    def test_validate_session_with_expired_session(self):
+        """Test that expired sessions are rejected and removed."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+        session = self.user_manager.login("testuser", "Password123")
+        session.expires_at_timestamp = time.time() - 1
+
+        assert self.user_manager.validate_session(session.token) is None
+        assert session.token not in self.user_manager.sessions
+
+    def test_session_derives_expiry_timestamp(self):
+        """Test that sessions built directly get their expiry timestamp."""
+        session = Session(
+            "token", "user-1", "2024-01-01T00:00:00", "2024-01-02T00:00:00", "", ""
+        )
+
+        assert session.expires_at_timestamp == datetime(2024, 1, 2).timestamp()
+
+    def test_purge_expired_sessions(self):
+        """Test purging only the sessions that have expired."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+        first = self.user_manager.login("testuser", "Password123")
+        second = self.user_manager.login("testuser", "Password123")
+        self.user_manager.logout(first.token)
+
+        assert self.user_manager.purge_expired_sessions() == 0
+        assert (
+            self.user_manager.purge_expired_sessions(second.expires_at_timestamp + 1)
+            == 1
+        )
+        assert self.user_manager.sessions == {}
+
+    def test_delete_user_removes_only_their_sessions(self):
+        """Test that deleting a user ends exactly that user's sessions."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        self.user_manager.create_user("otheruser", "other@example.com", "Password123")
+        self.user_manager.login("testuser", "Password123")
+        self.user_manager.login("testuser", "Password123")
+        other_session = self.user_manager.login("otheruser", "Password123")
+
+        self.user_manager.delete_user(user.id)
+
+        assert list(self.user_manager.sessions) == [other_session.token]
+
+    def test_session_expiry_heap_stays_bounded(self):
+        """Test that ended sessions do not pile up in the expiry heap."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+
+        for _ in range(500):
+            session = self.user_manager.login("testuser", "Password123")
+            self.user_manager.logout(session.token)
+
+        assert all(len(heap) <= 64 for heap in self.user_manager._session_expiry_heaps)
+
     def test_has_permission(self):
         """Test permission checking."""
         user = self.user_manager.create_user(
@@ -251,6 +502,79 @@ class TestUserManager:
         with pytest.raises(ValueError, match="User not found"):
             self.user_manager.assign_role("invalid-id", "admin")
 
+    def test_has_permission_follows_role_changes(self):
+        """Test that cached permissions are refreshed when roles change."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        assert self.user_manager.has_permission(user.id, "moderate_content") is False
+
+        self.user_manager.assign_role(user.id, "moderator")
+        assert self.user_manager.has_permission(user.id, "moderate_content") is True
+
+        self.user_manager.update_user(user.id, {"roles": ["user"]})
+        assert self.user_manager.has_permission(user.id, "moderate_content") is False
+
+        self.user_manager.set_role("user", "User", ["user_read", "moderate_content"])
+        assert self.user_manager.has_permission(user.id, "moderate_content") is True
+
+    def test_has_permission_with_inactive_user(self):
+        """Test that inactive users have no permissions."""
+        user = self.user_manager.create_user(
+            "admin", "admin@example.com", "Password123", ["admin"]
+        )
+        assert self.user_manager.has_permission(user.id, "admin_panel") is True
+
+        self.user_manager.update_user(user.id, {"status": "suspended"})
+
+        assert self.user_manager.has_permission(user.id, "admin_panel") is False
+
+    def test_has_permission_follows_in_place_role_edits(self):
+        """Test that editing user.roles directly is not hidden by the cache."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        assert self.user_manager.has_permission(user.id, "admin_panel") is False
+
+        user.roles.append("admin")
+        assert self.user_manager.has_permission(user.id, "admin_panel") is True
+
+        user.roles.remove("admin")
+        assert self.user_manager.has_permission(user.id, "admin_panel") is False
+
+    def test_role_permissions_are_read_only(self):
+        """Test that role permissions can only change through set_role."""
+        role = self.user_manager.roles["user"]
+
+        with pytest.raises(AttributeError):
+            role.permissions = ("admin_panel",)
+        assert not hasattr(role.permissions, "append")
+
+    def test_has_permissions_bulk(self):
+        """Test checking one permission for many users."""
+        admin = self.user_manager.create_user(
+            "admin", "admin@example.com", "Password123", ["admin"]
+        )
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+
+        suspended = self.user_manager.create_user(
+            "suspended", "suspended@example.com", "Password123", ["admin"]
+        )
+        self.user_manager.update_user(suspended.id, {"status": "suspended"})
+
+        result = self.user_manager.has_permissions_bulk(
+            [admin.id, user.id, suspended.id, "invalid-id"], "user_delete"
+        )
+
+        assert result == {
+            admin.id: True,
+            user.id: False,
+            suspended.id: False,
+            "invalid-id": False,
+        }
+
     def test_get_user_by_id(self):
         """Test getting user by ID."""
         user = self.user_manager.create_user(
@@ -299,6 +623,53 @@ class TestUserManager:
 
         assert user is None
 
+    def test_lookups_ignore_case(self):
+        """Test that username and email lookups are case-insensitive."""
+        user = self.user_manager.create_user(
+            "TestUser", "Test@Example.com", "Password123"
+        )
+
+        assert self.user_manager.get_user_by_username("testuser") == user
+        assert self.user_manager.get_user_by_email("test@example.COM") == user
+
+    def test_create_user_with_duplicate_username_in_other_case(self):
+        """Test that uniqueness checks ignore case."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+
+        with pytest.raises(ValueError, match="Username already exists"):
+            self.user_manager.create_user(
+                "TESTUSER", "other@example.com", "Password123"
+            )
+        with pytest.raises(ValueError, match="Email already registered"):
+            self.user_manager.create_user(
+                "otheruser", "TEST@example.com", "Password123"
+            )
+
+    def test_lookup_indexes_follow_updates_and_deletes(self):
+        """Test that lookups stay consistent through update and delete."""
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+
+        self.user_manager.update_user(
+            user.id, {"username": "renamed", "email": "renamed@example.com"}
+        )
+
+        assert self.user_manager.get_user_by_username("testuser") is None
+        assert self.user_manager.get_user_by_email("test@example.com") is None
+        assert self.user_manager.get_user_by_username("renamed") == user
+        assert self.user_manager.get_user_by_email("renamed@example.com") == user
+
+        # The old name and email are free again
+        other = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        self.user_manager.delete_user(user.id)
+
+        assert self.user_manager.get_user_by_username("renamed") is None
+        assert self.user_manager.get_user_by_email("renamed@example.com") is None
+        assert self.user_manager.get_user_by_username("testuser") == other
+
     def test_get_all_users(self):
         """Test getting all users."""
         user1 = self.user_manager.create_user(
@@ -335,6 +706,39 @@ class TestUserManager:
         assert email_queue[0].to == "test@example.com"
         assert "Welcome" in email_queue[0].subject
 
+    def test_email_dispatcher_sends_in_background(self):
+        """Test that emails go through an attached dispatcher instead of the queue."""
+        transport = RecordingTransport()
+        dispatcher = EmailDispatcher(transport)
+        self.user_manager.set_email_enabled(True)
+        self.user_manager.attach_email_dispatcher(dispatcher)
+
+        user = self.user_manager.create_user(
+            "testuser", "test@example.com", "Password123"
+        )
+        self.user_manager.login("testuser", "Password123")
+        self.user_manager.delete_user(user.id)
+        dispatcher.stop()
+
+        assert self.user_manager.get_email_queue() == []
+        subjects = [email.subject for email in transport.sent]
+        assert len(subjects) == 3
+        assert "Welcome" in subjects[0]
+        assert "testuser" in transport.sent[1].message
+
+    def test_attach_email_dispatcher_hands_over_queued_emails(self):
+        """Test that emails queued before attaching a dispatcher are sent by it."""
+        transport = RecordingTransport()
+        self.user_manager.set_email_enabled(True)
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+
+        dispatcher = EmailDispatcher(transport)
+        self.user_manager.attach_email_dispatcher(dispatcher)
+        dispatcher.stop()
+
+        assert self.user_manager.get_email_queue() == []
+        assert [email.to for email in transport.sent] == ["test@example.com"]
+
     def test_activity_log_with_enabled_logging(self):
         """Test activity log when logging is enabled."""
         self.user_manager.set_logging_enabled(True)
@@ -391,3 +795,416 @@ class TestUserManager:
 
         # Verify session is invalid
         assert self.user_manager.validate_session(session.token) is None
+
+
+class TestActivityLogStore:
+    def _entry(self, user_id, action="login_success"):
+        """Build an activity log entry for a user."""
+        return ActivityLog(
+            user_id=user_id,
+            action=action,
+            description="",
+            timestamp="",
+            ip_address="unknown",
+        )
+
+    def test_for_user_returns_only_that_users_entries(self):
+        """Test the per-user index."""
+        store = ActivityLogStore()
+        store.append(self._entry("alice", "login_success"))
+        store.append(self._entry("bob"))
+        store.append(self._entry("alice", "logout"))
+
+        assert [entry.action for entry in store.for_user("alice")] == [
+            "login_success",
+            "logout",
+        ]
+        assert store.for_user("nobody") == []
+        assert len(store) == 3
+
+    def test_max_entries_evicts_oldest(self):
+        """Test that the size cap evicts the oldest entries first."""
+        store = ActivityLogStore(max_entries=2)
+        store.append(self._entry("alice"), now=100.0)
+        store.append(self._entry("bob"), now=101.0)
+        store.append(self._entry("carol"), now=102.0)
+
+        assert [entry.user_id for entry in store] == ["bob", "carol"]
+        assert store.for_user("alice") == []
+
+    def test_max_age_drops_old_partitions(self):
+        """Test that entries older than max_age are evicted on append."""
+        store = ActivityLogStore(
+            max_age=timedelta(hours=2), partition_size=timedelta(hours=1)
+        )
+        store.append(self._entry("alice"), now=0.0)
+        store.append(self._entry("bob"), now=3600.0)
+        store.append(self._entry("alice"), now=3 * 3600.0)
+
+        assert [entry.user_id for entry in store] == ["bob", "alice"]
+        assert len(store.for_user("alice")) == 1
+
+    def test_extend_adds_batch_and_evicts_once(self):
+        """Test that a batch of entries is indexed and bounded like appends."""
+        store = ActivityLogStore(max_entries=3)
+        store.append(self._entry("alice"), now=0.0)
+
+        store.extend([self._entry("bob"), self._entry("alice"), self._entry("bob")])
+
+        assert [entry.user_id for entry in store] == ["bob", "alice", "bob"]
+        assert len(store.for_user("alice")) == 1
+        assert len(store.for_user("bob")) == 2
+
+    def test_user_manager_activity_log_is_bounded(self):
+        """Test that UserManager logs through the bounded store."""
+        user_manager = UserManager(password_hasher=FAST_HASHER)
+        user_manager.set_email_enabled(False)
+        user_manager.activity_log = ActivityLogStore(max_entries=3)
+        user = user_manager.create_user("testuser", "test@example.com", "Password123")
+
+        for _ in range(5):
+            user_manager.login("testuser", "Password123")
+
+        assert len(user_manager.get_activity_log()) == 3
+        assert len(user_manager.get_user_activity_log(user.id)) == 3
+
+
+class RecordingTransport:
+    """Email transport that keeps every batch in memory."""
+
+    def __init__(self, release=None):
+        self.batches = []
+        self.release = release
+        self.entered = threading.Event()
+
+    @property
+    def sent(self):
+        return [email for batch in self.batches for email in batch]
+
+    def send_batch(self, emails):
+        self.entered.set()
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        self.batches.append(list(emails))
+
+
+class TestEmailDispatcher:
+    """Tests for the background email dispatcher."""
+
+    def test_submit_does_not_build_message_on_caller_thread(self):
+        """Test that the message builder runs on a worker thread."""
+        release = threading.Event()
+        dispatcher = EmailDispatcher(RecordingTransport(release))
+        caller = threading.current_thread()
+        built_on = []
+
+        def build_message():
+            built_on.append(threading.current_thread())
+            return "body"
+
+        dispatcher.submit("a@example.com", "Subject", build_message)
+        release.set()
+        dispatcher.stop()
+
+        assert built_on and built_on[0] is not caller
+
+    def test_batches_and_coalesces_duplicates(self):
+        """Test that queued emails are sent in batches without duplicates."""
+        release = threading.Event()
+        transport = RecordingTransport(release)
+        dispatcher = EmailDispatcher(transport, batch_size=3)
+
+        # The first email occupies the worker until released
+        dispatcher.submit("first@example.com", "Hi", lambda: "body")
+        assert transport.entered.wait(timeout=5)
+        for _ in range(3):
+            dispatcher.submit("a@example.com", "Hi", lambda: "body")
+        dispatcher.submit("b@example.com", "Hi", lambda: "body")
+        release.set()
+        dispatcher.stop()
+
+        assert [len(batch) for batch in transport.batches] == [1, 1, 1]
+        assert [email.to for email in transport.sent] == [
+            "first@example.com",
+            "a@example.com",
+            "b@example.com",
+        ]
+        assert dispatcher.sent_count == 3
+        assert dispatcher.coalesced_count == 2
+
+    def test_flush_waits_for_pending_emails(self):
+        """Test that flush returns once everything submitted was sent."""
+        transport = RecordingTransport()
+        dispatcher = EmailDispatcher(transport, batch_size=10, workers=2)
+
+        for index in range(25):
+            dispatcher.submit_item(
+                EmailItem(f"user{index}@example.com", "Hi", "body", "now")
+            )
+        dispatcher.flush()
+
+        assert len(transport.sent) == 25
+        dispatcher.stop()
+
+    def test_bounded_queue_applies_backpressure(self):
+        """Test that submit blocks once max_pending emails are waiting."""
+        release = threading.Event()
+        transport = RecordingTransport(release)
+        dispatcher = EmailDispatcher(transport, max_pending=1)
+        dispatcher.submit("a@example.com", "Hi", lambda: "1")
+        assert transport.entered.wait(timeout=5)
+        dispatcher.submit("b@example.com", "Hi", lambda: "2")
+
+        blocked = threading.Thread(
+            target=dispatcher.submit, args=("c@example.com", "Hi", lambda: "3")
+        )
+        blocked.start()
+        blocked.join(timeout=0.1)
+        assert blocked.is_alive()
+
+        release.set()
+        blocked.join(timeout=5)
+        assert not blocked.is_alive()
+        dispatcher.stop()
+
+    def test_transport_failures_are_recorded(self):
+        """Test that a failing transport does not stop the dispatcher."""
+
+        class FailingTransport:
+            def send_batch(self, emails):
+                raise OSError("connection refused")
+
+        dispatcher = EmailDispatcher(FailingTransport())
+        dispatcher.submit("a@example.com", "Hi", lambda: "body")
+        dispatcher.flush()
+        dispatcher.submit("b@example.com", "Hi", lambda: "body")
+        dispatcher.stop()
+
+        assert [email.to for email in dispatcher.failed] == [
+            "a@example.com",
+            "b@example.com",
+        ]
+        assert dispatcher.sent_count == 0
+
+    def test_build_failures_are_not_counted_as_coalesced(self):
+        """Test that emails whose message cannot be built are counted as failed."""
+
+        def broken_message():
+            raise RuntimeError("template missing")
+
+        release = threading.Event()
+        transport = RecordingTransport(release)
+        dispatcher = EmailDispatcher(transport, batch_size=10)
+        dispatcher.submit("first@example.com", "Hi", lambda: "body")
+        assert transport.entered.wait(timeout=5)
+        dispatcher.submit("a@example.com", "Hi", broken_message)
+        dispatcher.submit("b@example.com", "Hi", lambda: "body")
+        dispatcher.submit("b@example.com", "Hi", lambda: "body")
+        release.set()
+        dispatcher.stop()
+
+        assert dispatcher.sent_count == 2
+        assert dispatcher.coalesced_count == 1
+        assert dispatcher.failed_count == 1
+        assert [email.to for email in dispatcher.failed] == ["a@example.com"]
+
+    def test_failed_emails_are_bounded_and_drained(self):
+        """Test that only the most recent failures are kept until drained."""
+
+        class FailingTransport:
+            def send_batch(self, emails):
+                raise OSError("connection refused")
+
+        dispatcher = EmailDispatcher(FailingTransport(), batch_size=1, max_failed=2)
+        for index in range(5):
+            dispatcher.submit(f"user{index}@example.com", "Hi", lambda: "body")
+        dispatcher.flush()
+
+        assert dispatcher.failed_count == 5
+        assert [email.to for email in dispatcher.drain_failed()] == [
+            "user3@example.com",
+            "user4@example.com",
+        ]
+        assert len(dispatcher.failed) == 0
+        dispatcher.stop()
+
+    def test_invalid_configuration(self):
+        """Test that non-positive sizes are rejected."""
+        with pytest.raises(ValueError):
+            EmailDispatcher(RecordingTransport(), batch_size=0)
+
+
+class TestConcurrentUserManager(TestUserManager):
+    """Runs every UserManager test in concurrent mode, plus threaded tests."""
+
+    def setup_method(self):
+        """Set up a concurrent user manager before each test method."""
+        self.user_manager = UserManager(
+            concurrent=True, lock_stripes=8, password_hasher=FAST_HASHER
+        )
+        self.user_manager.set_email_enabled(False)
+        self.user_manager.set_logging_enabled(False)
+
+    def _run_threads(self, target, count=8):
+        """Runs target(index) on count threads that start together."""
+        barrier = threading.Barrier(count)
+        errors = []
+
+        def run(index):
+            barrier.wait()
+            try:
+                target(index)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def _block_admin_permission_reads(self):
+        """Makes reads of the admin permissions wait for the returned release."""
+        entered = threading.Event()
+        release = threading.Event()
+
+        class BlockingPermissions(tuple):
+            def __iter__(self):
+                entered.set()
+                release.wait(timeout=5)
+                return super().__iter__()
+
+        admin = self.user_manager.roles["admin"]
+        self.user_manager.roles["admin"] = Role(
+            admin.name, BlockingPermissions(admin.permissions)
+        )
+        return entered, release
+
+    def _check_admin_panel_in_background(self, user_id):
+        """Starts a has_permission check that stops inside the role lookup."""
+        entered, release = self._block_admin_permission_reads()
+        checker = threading.Thread(
+            target=self.user_manager.has_permission, args=(user_id, "admin_panel")
+        )
+        checker.start()
+        assert entered.wait(timeout=5)
+        return checker, release
+
+    def test_role_change_during_permission_check_is_not_cached_stale(self):
+        """Test that revoking a role while permissions are computed sticks."""
+        user = self.user_manager.create_user(
+            "adminuser", "admin@example.com", "Password123", roles=["admin"]
+        )
+        checker, release = self._check_admin_panel_in_background(user.id)
+
+        updater = threading.Thread(
+            target=self.user_manager.update_user, args=(user.id, {"roles": ["user"]})
+        )
+        updater.start()
+        updater.join(timeout=0.1)
+        release.set()
+        checker.join(timeout=5)
+        updater.join(timeout=5)
+
+        assert self.user_manager.has_permission(user.id, "admin_panel") is False
+
+    def test_role_edit_during_permission_check_is_not_cached_stale(self):
+        """Test that editing a role while permissions are computed sticks."""
+        user = self.user_manager.create_user(
+            "adminuser", "admin@example.com", "Password123", roles=["admin"]
+        )
+        checker, release = self._check_admin_panel_in_background(user.id)
+
+        self.user_manager.set_role("admin", "Administrator", ["user_read"])
+        release.set()
+        checker.join(timeout=5)
+
+        assert self.user_manager.has_permission(user.id, "admin_panel") is False
+
+    def test_invalid_lock_stripes(self):
+        """Test that at least one lock stripe is required."""
+        with pytest.raises(ValueError, match="lock_stripes must be at least 1"):
+            UserManager(concurrent=True, lock_stripes=0)
+
+    def test_concurrent_create_user_claims_username_once(self):
+        """Test that racing registrations of one username create one user."""
+        errors = self._run_threads(
+            lambda index: self.user_manager.create_user(
+                "sameuser", f"user{index}@example.com", "Password123"
+            )
+        )
+
+        assert self.user_manager.get_user_count() == 1
+        assert len(errors) == 7
+        assert all("Username already exists" in str(error) for error in errors)
+
+    def test_concurrent_logins_and_validation(self):
+        """Test that parallel logins keep sessions and counters consistent."""
+        for index in range(8):
+            self.user_manager.create_user(
+                f"user{index}", f"user{index}@example.com", "Password123"
+            )
+        tokens = []
+
+        def login_and_validate(index):
+            for _ in range(50):
+                session = self.user_manager.login(f"user{index}", "Password123")
+                assert self.user_manager.validate_session(session.token) is not None
+                tokens.append(session.token)
+
+        assert self._run_threads(login_and_validate) == []
+        assert len(self.user_manager.sessions) == 400
+        assert set(self.user_manager.sessions) == set(tokens)
+        assert all(user.login_count == 50 for user in self.user_manager.get_all_users())
+
+    def test_concurrent_logout_removes_session_once(self):
+        """Test that only one of several racing logouts succeeds."""
+        self.user_manager.create_user("testuser", "test@example.com", "Password123")
+        session = self.user_manager.login("testuser", "Password123")
+        results = []
+
+        assert (
+            self._run_threads(
+                lambda _: results.append(self.user_manager.logout(session.token))
+            )
+            == []
+        )
+        assert results.count(True) == 1
+        assert self.user_manager.sessions == {}
+
+    def test_get_all_users_snapshot_follows_writes(self):
+        """Test that the copy-on-write snapshot is refreshed after changes."""
+        first = self.user_manager.create_user(
+            "firstuser", "first@example.com", "Password123"
+        )
+        assert self.user_manager.get_all_users() == [first]
+        assert self.user_manager.get_all_users() is not (
+            self.user_manager.get_all_users()
+        )
+
+        second = self.user_manager.create_user(
+            "seconduser", "second@example.com", "Password123"
+        )
+        assert self.user_manager.get_all_users() == [first, second]
+
+        self.user_manager.delete_user(first.id)
+        assert self.user_manager.get_all_users() == [second]
+
+    def test_concurrent_activity_logging(self):
+        """Test that buffered activity entries all reach the log."""
+        self.user_manager.set_logging_enabled(True)
+        users = [
+            self.user_manager.create_user(
+                f"user{index}", f"user{index}@example.com", "Password123"
+            )
+            for index in range(8)
+        ]
+
+        def log_in(index):
+            for _ in range(25):
+                self.user_manager.login(users[index].username, "Password123")
+
+        assert self._run_threads(log_in) == []
+        assert len(self.user_manager.get_activity_log()) == 8 + 8 * 25
+        assert len(self.user_manager.get_user_activity_log(users[0].id)) == 26
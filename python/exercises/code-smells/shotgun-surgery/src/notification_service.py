@@ -8,9 +8,337 @@ we have to modify code in multiple places, making maintenance difficult.
 The notification logic here should be centralized and organized better.
 """
 
+import queue
+import threading
+import time
 import uuid
-from datetime import datetime
-from typing import Any
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from functools import partial
+from itertools import islice
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Resolves to the sent notification, or None if the customer is unreachable
+Delivery = Future["Notification | None"]
+
+# Fields a notification record can have; unset ones are not part of it
+NOTIFICATION_FIELDS = (
+    "id",
+    "type",
+    "customer_id",
+    "recipient",
+    "device_token",
+    "subject",
+    "body",
+    "headers",
+    "message",
+    "data",
+    "sent_at",
+    "status",
+)
+
+# Worker threads per channel; SMS providers are typically the slowest
+DEFAULT_CHANNEL_WORKERS = {"email": 4, "sms": 8, "push": 4}
+
+
+class DeliveryEngine:
+    """
+    Delivers notifications on per-channel bounded queues and worker pools.
+
+    Every channel has its own queue and threads, so a slow provider only
+    backs up its own channel: a stalled SMS gateway adds no latency to email
+    or push deliveries. A full queue is not waited on either; the delivery's
+    future fails with queue.Full and the caller decides whether to retry.
+    """
+
+    def __init__(
+        self,
+        channel_workers: dict[str, int] | None = None,
+        queue_size: int = 10_000,
+    ) -> None:
+        """
+        Start the worker threads of every channel.
+
+        Args:
+            channel_workers: Worker threads per channel, merged over
+                DEFAULT_CHANNEL_WORKERS
+            queue_size: Maximum number of queued deliveries per channel
+        """
+        self._workers = {**DEFAULT_CHANNEL_WORKERS, **(channel_workers or {})}
+        self._queues: dict[
+            str, queue.Queue[tuple[Future[Any], Callable[[], Any]] | None]
+        ] = {channel: queue.Queue(maxsize=queue_size) for channel in self._workers}
+        self._closed = False
+        # Makes the closed check and the enqueue in submit() one step, so no
+        # delivery is queued behind the stop markers of shutdown()
+        self._submit_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        for channel, count in self._workers.items():
+            for index in range(count):
+                thread = threading.Thread(
+                    target=self._run,
+                    args=(self._queues[channel],),
+                    name=f"notification-{channel}-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def channels(self) -> list[str]:
+        """Channels this engine has worker pools for."""
+        return list(self._queues)
+
+    def submit(self, channel: str, deliver: Callable[[], T]) -> "Future[T]":
+        """
+        Queue a delivery on a channel without waiting for it.
+
+        Args:
+            channel: Channel whose workers run the delivery
+            deliver: Performs the delivery and returns its result
+
+        Returns:
+            Future of the delivery's result
+
+        Raises:
+            ValueError: If the channel has no worker pool
+            RuntimeError: If the engine has been shut down
+        """
+        if channel not in self._queues:
+            raise ValueError(f"Unknown channel: {channel}")
+
+        future: Future[T] = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("Delivery engine is shut down")
+            try:
+                self._queues[channel].put_nowait((future, deliver))
+            except queue.Full as error:
+                future.set_exception(error)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop accepting deliveries and stop the workers once queues drain.
+
+        Args:
+            wait: Block until every queued delivery has finished
+        """
+        with self._submit_lock:
+            stopping = not self._closed
+            self._closed = True
+        if stopping:
+            for channel, channel_queue in self._queues.items():
+                for _ in range(self._workers[channel]):
+                    channel_queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    @staticmethod
+    def _run(
+        channel_queue: queue.Queue[tuple[Future[Any], Callable[[], Any]] | None],
+    ) -> None:
+        """Worker loop: run deliveries until a stop marker arrives."""
+        while True:
+            job = channel_queue.get()
+            if job is None:
+                return
+            future, deliver = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(deliver())
+            except Exception as error:
+                future.set_exception(error)
+
+
+class Notification(Mapping[str, Any]):
+    """
+    A sent notification, stored in slots instead of a per-record dict.
+
+    It reads like the dict it replaces: notification["subject"], "headers"
+    in notification and dict(notification) all work, and fields that a
+    channel does not use are simply absent.
+    """
+
+    __slots__ = NOTIFICATION_FIELDS + ("stored_at",)
+
+    id: str
+    type: str
+    customer_id: str
+    recipient: str | None
+    device_token: str | None
+    subject: str | None
+    body: str | None
+    headers: dict[str, str] | None
+    message: str | None
+    data: dict[str, Any] | None
+    sent_at: str | None
+    status: str | None
+    # Monotonic time the store received the record, for its TTL
+    stored_at: float
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        customer_id: str,
+        recipient: str | None = None,
+        device_token: str | None = None,
+        subject: str | None = None,
+        body: str | None = None,
+        headers: dict[str, str] | None = None,
+        message: str | None = None,
+        data: dict[str, Any] | None = None,
+        sent_at: str | None = None,
+        status: str | None = None,
+    ) -> None:
+        self.id = id
+        self.type = type
+        self.customer_id = customer_id
+        self.recipient = recipient
+        self.device_token = device_token
+        self.subject = subject
+        self.body = body
+        self.headers = headers
+        self.message = message
+        self.data = data
+        self.sent_at = sent_at
+        self.status = status
+        self.stored_at = 0.0
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, None) if key in NOTIFICATION_FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in NOTIFICATION_FIELDS if getattr(self, name) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Notification({dict(self)!r})"
+
+
+class NotificationStore:
+    """
+    Sent notifications indexed by type and by customer, with retention.
+
+    Records are kept in sending order, in one deque overall and one per type
+    and per customer. Lookups copy a single index, so they cost O(k) for k
+    matches. The oldest record is at the front of every deque it is in,
+    which makes evicting it O(1) whether the size cap or the TTL applies.
+    """
+
+    def __init__(
+        self, max_records: int | None = 100_000, ttl: timedelta | None = None
+    ) -> None:
+        """
+        Create an empty store.
+
+        Args:
+            max_records: Records kept before the oldest are evicted; None keeps
+                every record until it expires
+            ttl: How long records are kept; None keeps them until the size
+                cap evicts them
+
+        Raises:
+            ValueError: If max_records is less than 1
+        """
+        if max_records is not None and max_records < 1:
+            raise ValueError("max_records must be at least 1")
+
+        self.max_records = max_records
+        self.ttl = ttl
+        self._records: deque[Notification] = deque()
+        self._by_type: dict[str, deque[Notification]] = {}
+        self._by_customer: dict[str, deque[Notification]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, notification: Notification) -> None:
+        """Store a record, evicting the oldest ones the policy no longer keeps."""
+        self.extend([notification])
+
+    def extend(self, notifications: Iterable[Notification]) -> None:
+        """Store several records under a single lock acquisition."""
+        now = time.monotonic()
+        with self._lock:
+            for notification in notifications:
+                notification.stored_at = now
+                self._records.append(notification)
+                self._index(self._by_type, notification.type, notification)
+                self._index(self._by_customer, notification.customer_id, notification)
+            self._evict(now)
+
+    def all(self) -> list[Notification]:
+        """Get every retained record, oldest first."""
+        with self._lock:
+            self._evict(time.monotonic())
+            return list(self._records)
+
+    def by_type(self, notification_type: str) -> list[Notification]:
+        """Get the retained records of one type, oldest first."""
+        with self._lock:
+            self._evict(time.monotonic())
+            return list(self._by_type.get(notification_type, ()))
+
+    def by_customer(self, customer_id: str) -> list[Notification]:
+        """Get the retained records of one customer, oldest first."""
+        with self._lock:
+            self._evict(time.monotonic())
+            return list(self._by_customer.get(customer_id, ()))
+
+    def clear(self) -> None:
+        """Remove every record."""
+        with self._lock:
+            self._records.clear()
+            self._by_type.clear()
+            self._by_customer.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._records)
+
+    def _evict(self, now: float) -> None:
+        """Drop the oldest records while over the size cap or past the TTL."""
+        expired_before = None if self.ttl is None else now - self.ttl.total_seconds()
+        while self._records and (
+            (self.max_records is not None and len(self._records) > self.max_records)
+            or (
+                expired_before is not None
+                and self._records[0].stored_at <= expired_before
+            )
+        ):
+            oldest = self._records.popleft()
+            self._pop_oldest(self._by_type, oldest.type)
+            self._pop_oldest(self._by_customer, oldest.customer_id)
+
+    @staticmethod
+    def _index(
+        index: dict[str, deque[Notification]], key: str, notification: Notification
+    ) -> None:
+        """Append a record to an index entry, creating the entry if needed."""
+        records = index.get(key)
+        if records is None:
+            records = index[key] = deque()
+        records.append(notification)
+
+    @staticmethod
+    def _pop_oldest(index: dict[str, deque[Notification]], key: str) -> None:
+        """Drop the oldest record of an index entry and the entry once empty."""
+        records = index[key]
+        records.popleft()
+        if not records:
+            del index[key]
 
 
 class NotificationService:
@@ -23,9 +351,25 @@ class NotificationService:
     approaches to handling emails, SMS, and push notifications.
     """
 
-    def __init__(self) -> None:
-        """Initialize the NotificationService with default configurations."""
-        self.sent_notifications: list[dict[str, Any]] = []
+    def __init__(
+        self,
+        delivery_engine: DeliveryEngine | None = None,
+        notification_store: NotificationStore | None = None,
+    ) -> None:
+        """
+        Initialize the NotificationService with default configurations.
+
+        Args:
+            delivery_engine: Engine delivering each channel on its own worker
+                pool. Without one, notifications are delivered on the calling
+                thread before the send method returns.
+            notification_store: Store for sent notifications and its
+                retention policy (the newest 100,000 records by default)
+        """
+        self.delivery_engine = delivery_engine
+        self.sent_notifications = (
+            NotificationStore() if notification_store is None else notification_store
+        )
 
         # Configuration scattered across different domains
         self.email_config: dict[str, Any] = {
@@ -43,7 +387,7 @@ class NotificationService:
 
     def send_order_confirmation(
         self, customer_id: str, order_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send order confirmation notifications via multiple channels.
 
@@ -53,71 +397,94 @@ class NotificationService:
         Args:
             customer_id: The customer identifier
             order_data: Dictionary containing order details
+
+        Returns:
+            Futures of the queued deliveries
         """
+        deliveries: list[Delivery] = []
+
         # Email notification
         email_subject = f"Order Confirmation #{order_data['order_id']}"
         email_body = self._build_order_confirmation_email_body(order_data)
-        self._send_email(customer_id, email_subject, email_body)
+        deliveries.append(self._send_email(customer_id, email_subject, email_body))
 
         # SMS notification if customer prefers SMS
         if self._customer_prefers_sms(customer_id):
             sms_message = f"Order #{order_data['order_id']} confirmed. Total: €{order_data['total']}"
-            self._send_sms(customer_id, sms_message)
+            deliveries.append(self._send_sms(customer_id, sms_message))
 
         # Push notification for mobile app users
         if self._customer_has_mobile_app(customer_id):
             push_message = "Your order has been confirmed!"
-            self._send_push_notification(
-                customer_id,
-                push_message,
-                {"type": "order_confirmation", "order_id": order_data["order_id"]},
+            deliveries.append(
+                self._send_push_notification(
+                    customer_id,
+                    push_message,
+                    {"type": "order_confirmation", "order_id": order_data["order_id"]},
+                )
             )
 
+        return deliveries
+
     def send_order_shipped(
         self, customer_id: str, shipping_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send order shipped notifications with tracking information.
 
         Args:
             customer_id: The customer identifier
             shipping_data: Dictionary containing shipping details
+
+        Returns:
+            Futures of the queued deliveries
         """
+        deliveries: list[Delivery] = []
+
         # Email with tracking info
         email_subject = "Your Order Has Shipped!"
         email_body = f"""Your order #{shipping_data['order_id']} has been shipped.
 Tracking Number: {shipping_data['tracking_number']}
 Expected Delivery: {shipping_data['expected_delivery']}"""
-        self._send_email(customer_id, email_subject, email_body)
+        deliveries.append(self._send_email(customer_id, email_subject, email_body))
 
         # SMS with short tracking info
         if self._customer_prefers_sms(customer_id):
             sms_message = f"Order shipped! Track: {shipping_data['tracking_number']}"
-            self._send_sms(customer_id, sms_message)
+            deliveries.append(self._send_sms(customer_id, sms_message))
 
         # Push notification
         if self._customer_has_mobile_app(customer_id):
-            self._send_push_notification(
-                customer_id,
-                "Package on the way!",
-                {
-                    "type": "shipping_update",
-                    "tracking_number": shipping_data["tracking_number"],
-                },
+            deliveries.append(
+                self._send_push_notification(
+                    customer_id,
+                    "Package on the way!",
+                    {
+                        "type": "shipping_update",
+                        "tracking_number": shipping_data["tracking_number"],
+                    },
+                )
             )
 
+        return deliveries
+
     # PAYMENT-RELATED NOTIFICATIONS (scattered logic)
 
     def send_payment_confirmation(
         self, customer_id: str, payment_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send payment confirmation with different email format for payments.
 
         Args:
             customer_id: The customer identifier
             payment_data: Dictionary containing payment details
+
+        Returns:
+            Futures of the queued deliveries
         """
+        deliveries: list[Delivery] = []
+
         # Different email format for payments
         email_subject = f"Payment Received - Order #{payment_data['order_id']}"
         email_body = f"""Thank you for your payment!
@@ -131,25 +498,34 @@ Transaction ID: {payment_data['transaction_id']}"""
             "X-Payment-Notification": "true",
             "X-Transaction-ID": payment_data["transaction_id"],
         }
-        self._send_email_with_headers(
-            customer_id, email_subject, email_body, email_headers
+        deliveries.append(
+            self._send_email_with_headers(
+                customer_id, email_subject, email_body, email_headers
+            )
         )
 
         # SMS for high-value payments
         if payment_data["amount"] > 500.0:
             sms_message = f"Payment of €{payment_data['amount']} confirmed for order #{payment_data['order_id']}"
-            self._send_sms(customer_id, sms_message)
+            deliveries.append(self._send_sms(customer_id, sms_message))
+
+        return deliveries
 
     def send_payment_failed(
         self, customer_id: str, payment_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send urgent notifications for failed payments.
 
         Args:
             customer_id: The customer identifier
             payment_data: Dictionary containing payment failure details
+
+        Returns:
+            Futures of the queued deliveries
         """
+        deliveries: list[Delivery] = []
+
         # Urgent email notification
         email_subject = f"URGENT: Payment Failed - Order #{payment_data['order_id']}"
         email_body = f"""Your payment could not be processed.
@@ -158,31 +534,37 @@ Reason: {payment_data['failure_reason']}
 Please update your payment method to complete your order."""
 
         urgent_headers = {"X-Priority": "1", "X-MSMail-Priority": "High"}
-        self._send_email_with_headers(
-            customer_id, email_subject, email_body, urgent_headers
+        deliveries.append(
+            self._send_email_with_headers(
+                customer_id, email_subject, email_body, urgent_headers
+            )
         )
 
         # Always send SMS for failed payments
         sms_message = f"Payment failed for order #{payment_data['order_id']}. Please check your payment method."
-        self._send_sms(customer_id, sms_message)
+        deliveries.append(self._send_sms(customer_id, sms_message))
 
         # Push notification with high priority
         if self._customer_has_mobile_app(customer_id):
-            self._send_push_notification(
-                customer_id,
-                "Payment Issue - Action Required",
-                {
-                    "type": "payment_failed",
-                    "order_id": payment_data["order_id"],
-                    "priority": "high",
-                },
+            deliveries.append(
+                self._send_push_notification(
+                    customer_id,
+                    "Payment Issue - Action Required",
+                    {
+                        "type": "payment_failed",
+                        "order_id": payment_data["order_id"],
+                        "priority": "high",
+                    },
+                )
             )
 
+        return deliveries
+
     # CUSTOMER SERVICE NOTIFICATIONS (different patterns again)
 
     def send_account_update(
         self, customer_id: str, update_type: str, data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send account update notifications using template-based approach.
 
@@ -191,9 +573,14 @@ Please update your payment method to complete your order."""
             update_type: Type of account update
             data: Update-specific data
 
+        Returns:
+            Futures of the queued deliveries
+
         Raises:
             ValueError: If update_type is not recognized
         """
+        deliveries: list[Delivery] = []
+
         templates = {
             "profile_updated": {
                 "email_subject": "Profile Updated Successfully",
@@ -218,164 +605,331 @@ Please update your payment method to complete your order."""
         template = templates[update_type]
 
         # Send email
-        self._send_email(customer_id, template["email_subject"], template["email_body"])
+        deliveries.append(
+            self._send_email(
+                customer_id, template["email_subject"], template["email_body"]
+            )
+        )
 
         # Send SMS if template has SMS message
         if template["sms_message"] and self._customer_prefers_sms(customer_id):
-            self._send_sms(customer_id, template["sms_message"])
+            deliveries.append(self._send_sms(customer_id, template["sms_message"]))
+
+        return deliveries
 
     def send_welcome_messages(
         self, customer_id: str, customer_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send welcome message series to new customers.
 
         Args:
             customer_id: The customer identifier
             customer_data: Dictionary containing customer details
+
+        Returns:
+            Futures of the queued deliveries
         """
+        deliveries: list[Delivery] = []
+
         # Welcome email series
         welcome_email_subject = "Welcome to Our Store!"
         welcome_email_body = f"""Dear {customer_data['name']},
 
 Welcome to our online store! We're excited to have you."""
-        self._send_email(customer_id, welcome_email_subject, welcome_email_body)
+        deliveries.append(
+            self._send_email(customer_id, welcome_email_subject, welcome_email_body)
+        )
 
         # SMS welcome if customer provided mobile
         if customer_data.get("mobile"):
             welcome_sms = f"Welcome {customer_data['name']}! Thanks for joining us."
-            self._send_sms(customer_id, welcome_sms)
+            deliveries.append(self._send_sms(customer_id, welcome_sms))
 
         # Setup push notifications
         if customer_data.get("mobile_app"):
-            self._send_push_notification(
-                customer_id,
-                "Welcome! Get notified about deals and orders.",
-                {"type": "welcome", "setup_notifications": True},
+            deliveries.append(
+                self._send_push_notification(
+                    customer_id,
+                    "Welcome! Get notified about deals and orders.",
+                    {"type": "welcome", "setup_notifications": True},
+                )
             )
 
+        return deliveries
+
     # PROMOTIONAL NOTIFICATIONS (yet another different approach)
 
     def send_promotional_offer(
         self, customer_id: str, offer_data: dict[str, Any]
-    ) -> None:
+    ) -> list[Delivery]:
         """
         Send promotional offers with different styling and tracking.
 
         Args:
             customer_id: The customer identifier
             offer_data: Dictionary containing offer details
+
+        Returns:
+            Futures of the queued deliveries
         """
-        # Promotional emails have different styling and tracking
-        promo_subject = f"🎉 Special Offer: {offer_data['title']}"
-        promo_body = self._build_promo_email_body(offer_data)
-
-        promo_headers = {
-            "X-Campaign-ID": offer_data["campaign_id"],
-            "X-Offer-Code": offer_data["code"],
-            "List-Unsubscribe": "<mailto:unsubscribe@example.com>",
-        }
-        self._send_email_with_headers(
-            customer_id, promo_subject, promo_body, promo_headers
+        deliveries: list[Delivery] = []
+
+        promo = self._build_promo_messages(offer_data)
+        deliveries.append(
+            self._send_email_with_headers(
+                customer_id, promo["subject"], promo["body"], promo["headers"]
+            )
         )
 
-        # SMS promos are shorter and different
         if self._customer_accepts_promo_sms(customer_id):
-            promo_sms = f"🎁 {offer_data['title']} - Use code {offer_data['code']}. Reply STOP to opt out."
-            self._send_sms(customer_id, promo_sms)
+            deliveries.append(self._send_sms(customer_id, promo["sms"]))
 
-        # Push notifications for app users
         if self._customer_has_mobile_app(customer_id):
-            self._send_push_notification(
-                customer_id,
-                offer_data["title"],
-                {
-                    "type": "promotion",
-                    "offer_code": offer_data["code"],
-                    "campaign_id": offer_data["campaign_id"],
-                },
+            deliveries.append(
+                self._send_push_notification(
+                    customer_id, offer_data["title"], promo["push_data"]
+                )
+            )
+
+        return deliveries
+
+    def send_promotional_offer_bulk(
+        self,
+        customer_ids: Iterable[str],
+        offer_data: dict[str, Any],
+        chunk_size: int = 1000,
+    ) -> list["Future[int]"]:
+        """
+        Send a promotional offer to many customers in chunks.
+
+        The messages are rendered once and shared by every record. Each chunk
+        resolves SMS and app preferences and contact details in one batch and
+        becomes a single delivery per channel rather than one per customer.
+
+        Args:
+            customer_ids: The customer identifiers
+            offer_data: Dictionary containing offer details
+            chunk_size: Number of customers per delivery
+
+        Returns:
+            Futures of the chunk deliveries, each resolving to the number of
+            notifications sent
+
+        Raises:
+            ValueError: If chunk_size is less than 1
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        promo = self._build_promo_messages(offer_data)
+        deliveries: list[Future[int]] = []
+
+        remaining = iter(customer_ids)
+        while chunk := list(islice(remaining, chunk_size)):
+            deliveries.append(
+                self._deliver(
+                    "email",
+                    partial(
+                        self._send_email_chunk,
+                        chunk,
+                        promo["subject"],
+                        promo["body"],
+                        promo["headers"],
+                    ),
+                )
             )
 
+            sms_customers = self._customers_accepting_promo_sms(chunk)
+            if sms_customers:
+                deliveries.append(
+                    self._deliver(
+                        "sms",
+                        partial(self._send_sms_chunk, sms_customers, promo["sms"]),
+                    )
+                )
+
+            app_customers = self._customers_with_mobile_app(chunk)
+            if app_customers:
+                deliveries.append(
+                    self._deliver(
+                        "push",
+                        partial(
+                            self._send_push_chunk,
+                            app_customers,
+                            offer_data["title"],
+                            promo["push_data"],
+                        ),
+                    )
+                )
+
+        return deliveries
+
     # LOW-LEVEL NOTIFICATION METHODS (implementation details mixed with business logic)
 
-    def _send_email(self, customer_id: str, subject: str, body: str) -> None:
+    def _send_email(self, customer_id: str, subject: str, body: str) -> Delivery:
         """Send email notification (internal method)."""
-        customer_email = self._get_customer_email(customer_id)
-
-        # Simulate email sending
-        notification = {
-            "id": f"email_{uuid.uuid4().hex[:8]}",
-            "type": "email",
-            "customer_id": customer_id,
-            "recipient": customer_email,
-            "subject": subject,
-            "body": body,
-            "sent_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": "sent",
-        }
-
-        self.sent_notifications.append(notification)
+        return self._send_email_with_headers(customer_id, subject, body, None)
 
     def _send_email_with_headers(
-        self, customer_id: str, subject: str, body: str, headers: dict[str, str]
-    ) -> None:
+        self,
+        customer_id: str,
+        subject: str,
+        body: str,
+        headers: dict[str, str] | None,
+    ) -> Delivery:
         """Send email notification with custom headers (internal method)."""
-        customer_email = self._get_customer_email(customer_id)
-
-        notification = {
-            "id": f"email_{uuid.uuid4().hex[:8]}",
-            "type": "email",
-            "customer_id": customer_id,
-            "recipient": customer_email,
-            "subject": subject,
-            "body": body,
-            "headers": headers,
-            "sent_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": "sent",
-        }
 
-        self.sent_notifications.append(notification)
+        def deliver() -> Notification | None:
+            return self._transmit(
+                Notification(
+                    id=f"email_{uuid.uuid4().hex[:8]}",
+                    type="email",
+                    customer_id=customer_id,
+                    recipient=self._get_customer_email(customer_id),
+                    subject=subject,
+                    body=body,
+                    headers=headers,
+                )
+            )
+
+        return self._deliver("email", deliver)
 
-    def _send_sms(self, customer_id: str, message: str) -> None:
+    def _send_sms(self, customer_id: str, message: str) -> Delivery:
         """Send SMS notification (internal method)."""
-        customer_phone = self._get_customer_phone(customer_id)
-
-        if not customer_phone:
-            return  # Skip if no phone number
-
-        notification = {
-            "id": f"sms_{uuid.uuid4().hex[:8]}",
-            "type": "sms",
-            "customer_id": customer_id,
-            "recipient": customer_phone,
-            "message": message,
-            "sent_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": "sent",
-        }
 
-        self.sent_notifications.append(notification)
+        def deliver() -> Notification | None:
+            customer_phone = self._get_customer_phone(customer_id)
+            if not customer_phone:
+                return None  # Skip if no phone number
+
+            return self._transmit(
+                Notification(
+                    id=f"sms_{uuid.uuid4().hex[:8]}",
+                    type="sms",
+                    customer_id=customer_id,
+                    recipient=customer_phone,
+                    message=message,
+                )
+            )
+
+        return self._deliver("sms", deliver)
 
     def _send_push_notification(
         self, customer_id: str, message: str, data: dict[str, Any] | None = None
-    ) -> None:
+    ) -> Delivery:
         """Send push notification (internal method)."""
-        device_token = self._get_customer_device_token(customer_id)
-
-        if not device_token:
-            return  # Skip if no device token
-
-        notification = {
-            "id": f"push_{uuid.uuid4().hex[:8]}",
-            "type": "push",
-            "customer_id": customer_id,
-            "device_token": device_token,
-            "message": message,
-            "data": data or {},
-            "sent_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "status": "sent",
-        }
 
-        self.sent_notifications.append(notification)
+        def deliver() -> Notification | None:
+            device_token = self._get_customer_device_token(customer_id)
+            if not device_token:
+                return None  # Skip if no device token
+
+            return self._transmit(
+                Notification(
+                    id=f"push_{uuid.uuid4().hex[:8]}",
+                    type="push",
+                    customer_id=customer_id,
+                    device_token=device_token,
+                    message=message,
+                    data=data or {},
+                )
+            )
+
+        return self._deliver("push", deliver)
+
+    def _send_email_chunk(
+        self,
+        customer_ids: list[str],
+        subject: str,
+        body: str,
+        headers: dict[str, str],
+    ) -> int:
+        """Send one email to each of a chunk of customers (internal method)."""
+        emails = self._get_customer_emails(customer_ids)
+        return self._transmit_batch(
+            [
+                Notification(
+                    id=f"email_{uuid.uuid4().hex[:8]}",
+                    type="email",
+                    customer_id=customer_id,
+                    recipient=emails[customer_id],
+                    subject=subject,
+                    body=body,
+                    headers=headers,
+                )
+                for customer_id in customer_ids
+            ]
+        )
+
+    def _send_sms_chunk(self, customer_ids: list[str], message: str) -> int:
+        """Send one SMS to each reachable customer of a chunk (internal method)."""
+        phones = self._get_customer_phones(customer_ids)
+        return self._transmit_batch(
+            [
+                Notification(
+                    id=f"sms_{uuid.uuid4().hex[:8]}",
+                    type="sms",
+                    customer_id=customer_id,
+                    recipient=phone,
+                    message=message,
+                )
+                for customer_id, phone in phones.items()
+            ]
+        )
+
+    def _send_push_chunk(
+        self, customer_ids: list[str], message: str, data: dict[str, Any]
+    ) -> int:
+        """Send one push notification to each reachable customer of a chunk."""
+        device_tokens = self._get_customer_device_tokens(customer_ids)
+        return self._transmit_batch(
+            [
+                Notification(
+                    id=f"push_{uuid.uuid4().hex[:8]}",
+                    type="push",
+                    customer_id=customer_id,
+                    device_token=device_token,
+                    message=message,
+                    data=data,
+                )
+                for customer_id, device_token in device_tokens.items()
+            ]
+        )
+
+    def _deliver(self, channel: str, deliver: Callable[[], T]) -> "Future[T]":
+        """
+        Run a delivery on the channel's worker pool, or right away without one.
+
+        Without an engine, errors raised by the delivery reach the caller and
+        the returned future is already resolved.
+        """
+        if self.delivery_engine is not None:
+            return self.delivery_engine.submit(channel, deliver)
+
+        future: Future[T] = Future()
+        future.set_result(deliver())
+        return future
+
+    def _transmit(self, notification: Notification) -> Notification:
+        """Hand a notification to its channel's provider and record it as sent."""
+        # Simulate the provider call
+        notification.sent_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        notification.status = "sent"
+
+        self.sent_notifications.add(notification)
+        return notification
+
+    def _transmit_batch(self, notifications: list[Notification]) -> int:
+        """Hand a batch of notifications to their provider and record them."""
+        # Simulate one batched provider call
+        sent_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for notification in notifications:
+            notification.sent_at = sent_at
+            notification.status = "sent"
+
+        self.sent_notifications.extend(notifications)
+        return len(notifications)
 
     # HELPER METHODS (scattered customer preference logic)
 
@@ -394,6 +948,28 @@ Welcome to our online store! We're excited to have you."""
             customer_id
         )
 
+    def _customers_accepting_promo_sms(self, customer_ids: list[str]) -> list[str]:
+        """Select the customers who accept promotional SMS in one lookup."""
+        return [c for c in customer_ids if self._customer_accepts_promo_sms(c)]
+
+    def _customers_with_mobile_app(self, customer_ids: list[str]) -> list[str]:
+        """Select the customers who have the mobile app in one lookup."""
+        return [c for c in customer_ids if self._customer_has_mobile_app(c)]
+
+    def _get_customer_emails(self, customer_ids: list[str]) -> dict[str, str]:
+        """Get the email addresses of many customers in one lookup."""
+        return {c: self._get_customer_email(c) for c in customer_ids}
+
+    def _get_customer_phones(self, customer_ids: list[str]) -> dict[str, str]:
+        """Get the phone numbers of the customers of a batch that have one."""
+        phones = {c: self._get_customer_phone(c) for c in customer_ids}
+        return {c: phone for c, phone in phones.items() if phone}
+
+    def _get_customer_device_tokens(self, customer_ids: list[str]) -> dict[str, str]:
+        """Get the device tokens of the customers of a batch that have one."""
+        tokens = {c: self._get_customer_device_token(c) for c in customer_ids}
+        return {c: token for c, token in tokens.items() if token}
+
     def _get_customer_email(self, customer_id: str) -> str:
         """Get customer email address."""
         # Simulate customer email lookup
@@ -433,6 +1009,26 @@ Order Details:
 
         return body
 
+    def _build_promo_messages(self, offer_data: dict[str, Any]) -> dict[str, Any]:
+        """Render the email, SMS and push content of a promotional offer."""
+        return {
+            # Promotional emails have different styling and tracking
+            "subject": f"🎉 Special Offer: {offer_data['title']}",
+            "body": self._build_promo_email_body(offer_data),
+            "headers": {
+                "X-Campaign-ID": offer_data["campaign_id"],
+                "X-Offer-Code": offer_data["code"],
+                "List-Unsubscribe": "<mailto:unsubscribe@example.com>",
+            },
+            # SMS promos are shorter and different
+            "sms": f"🎁 {offer_data['title']} - Use code {offer_data['code']}. Reply STOP to opt out.",
+            "push_data": {
+                "type": "promotion",
+                "offer_code": offer_data["code"],
+                "campaign_id": offer_data["campaign_id"],
+            },
+        }
+
     def _build_promo_email_body(self, offer_data: dict[str, Any]) -> str:
         """Build email body for promotional offers."""
         body = f"""🎉 Special Offer Just for You! 🎉
@@ -452,18 +1048,18 @@ To unsubscribe from promotional emails, click here."""
 
     # PUBLIC API METHODS
 
-    def get_sent_notifications(self) -> list[dict[str, Any]]:
-        """Get all sent notifications."""
-        return self.sent_notifications
+    def get_sent_notifications(self) -> list[Notification]:
+        """Get all retained sent notifications."""
+        return self.sent_notifications.all()
 
-    def get_notifications_by_type(self, notification_type: str) -> list[dict[str, Any]]:
+    def get_notifications_by_type(self, notification_type: str) -> list[Notification]:
         """Get notifications filtered by type."""
-        return [n for n in self.sent_notifications if n["type"] == notification_type]
+        return self.sent_notifications.by_type(notification_type)
 
-    def get_notifications_by_customer(self, customer_id: str) -> list[dict[str, Any]]:
+    def get_notifications_by_customer(self, customer_id: str) -> list[Notification]:
         """Get notifications filtered by customer."""
-        return [n for n in self.sent_notifications if n["customer_id"] == customer_id]
+        return self.sent_notifications.by_customer(customer_id)
 
     def clear_notifications(self) -> None:
         """Clear all sent notifications."""
-        self.sent_notifications = []
+        self.sent_notifications.clear()
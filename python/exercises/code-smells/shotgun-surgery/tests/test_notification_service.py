@@ -1,6 +1,9 @@
 """Tests for NotificationService class."""
 
+import queue
 import sys
+import threading
+from datetime import timedelta
 from pathlib import Path
 
 import pytest
@@ -8,7 +11,13 @@ import pytest
 # Add the src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from notification_service import NotificationService
+import notification_service
+from notification_service import (
+    DeliveryEngine,
+    Notification,
+    NotificationService,
+    NotificationStore,
+)
 
 
 class TestNotificationService:
@@ -323,6 +332,82 @@ class TestNotificationService:
         assert push_notifications[0]["data"]["type"] == "promotion"
         assert push_notifications[0]["data"]["offer_code"] == "SAVE50"
 
+    def test_send_promotional_offer_bulk_matches_single_sends(self):
+        """Test bulk promotional sends produce the same records as single sends."""
+        customer_ids = [
+            "customer_1",
+            "customer_no_promo",
+            "customer_no_app",
+            "customer_no_phone",
+            "customer_2",
+        ]
+        offer_data = {
+            "title": "50% Off Sale",
+            "description": "Get 50% off all items this weekend only!",
+            "code": "SAVE50",
+            "valid_until": "2024-01-31",
+            "campaign_id": "CAMP_001",
+        }
+        single_service = NotificationService()
+        for customer_id in customer_ids:
+            single_service.send_promotional_offer(customer_id, offer_data)
+
+        deliveries = self.notification_service.send_promotional_offer_bulk(
+            customer_ids, offer_data, chunk_size=2
+        )
+
+        def without_ids(notifications):
+            return sorted(
+                (
+                    {k: v for k, v in n.items() if k not in ("id", "sent_at")}
+                    for n in notifications
+                ),
+                key=repr,
+            )
+
+        assert sum(delivery.result() for delivery in deliveries) == len(
+            single_service.get_sent_notifications()
+        )
+        assert without_ids(
+            self.notification_service.get_sent_notifications()
+        ) == without_ids(single_service.get_sent_notifications())
+
+    def test_send_promotional_offer_bulk_renders_template_once(self, monkeypatch):
+        """Test the promotional email body is built once per bulk send."""
+        calls = []
+        build = self.notification_service._build_promo_email_body
+
+        def counting_build(offer_data):
+            calls.append(offer_data)
+            return build(offer_data)
+
+        monkeypatch.setattr(
+            self.notification_service, "_build_promo_email_body", counting_build
+        )
+        offer_data = {
+            "title": "Sale",
+            "description": "Everything must go",
+            "code": "SALE",
+            "valid_until": "2024-01-31",
+            "campaign_id": "CAMP_002",
+        }
+
+        deliveries = self.notification_service.send_promotional_offer_bulk(
+            (f"customer_{i}" for i in range(250)), offer_data, chunk_size=100
+        )
+
+        assert len(calls) == 1
+        # Three chunks, each delivered once per channel
+        assert len(deliveries) == 9
+        assert len(self.notification_service.get_notifications_by_type("email")) == 250
+
+    def test_send_promotional_offer_bulk_rejects_invalid_chunk_size(self):
+        """Test bulk promotional sends need a positive chunk size."""
+        with pytest.raises(ValueError, match="chunk_size must be at least 1"):
+            self.notification_service.send_promotional_offer_bulk(
+                ["customer_1"], {}, chunk_size=0
+            )
+
     def test_get_notifications_by_customer(self):
         """Test filtering notifications by customer."""
         customer_id1 = "customer_111"
@@ -482,3 +567,278 @@ class TestNotificationService:
         # Should send push notification
         push_notifications = self.notification_service.get_notifications_by_type("push")
         assert len(push_notifications) == 1
+
+    def test_senders_return_completed_deliveries_without_engine(self):
+        """Test deliveries finish before the send method returns by default."""
+        deliveries = self.notification_service.send_order_confirmation(
+            "customer_no_phone", {"order_id": "ORDER_1", "total": "1.00", "items": []}
+        )
+
+        assert all(delivery.done() for delivery in deliveries)
+        results = [delivery.result() for delivery in deliveries]
+        assert [r["type"] if r else None for r in results] == ["email", None, "push"]
+
+    def test_provider_errors_reach_the_caller_without_engine(self):
+        """Test a failing provider raises from the send method by default."""
+
+        class FailingNotificationService(NotificationService):
+            def _transmit(self, notification):
+                raise ConnectionError("provider unavailable")
+
+        service = FailingNotificationService()
+
+        with pytest.raises(ConnectionError, match="provider unavailable"):
+            service.send_order_confirmation(
+                "customer_123", {"order_id": "ORDER_1", "total": "9.99", "items": []}
+            )
+
+
+class SlowSmsNotificationService(NotificationService):
+    """NotificationService whose SMS provider stalls until released."""
+
+    def __init__(self, delivery_engine):
+        super().__init__(delivery_engine)
+        self.sms_released = threading.Event()
+
+    def _transmit(self, notification):
+        if notification["type"] == "sms":
+            self.sms_released.wait(timeout=5)
+        return super()._transmit(notification)
+
+
+class TestDeliveryEngine:
+    """Test suite for DeliveryEngine and its use by NotificationService."""
+
+    def setup_method(self):
+        """Setup method called before each test."""
+        self.engine = DeliveryEngine(queue_size=100)
+
+    def teardown_method(self):
+        """Teardown method called after each test."""
+        self.engine.shutdown()
+
+    def test_deliveries_resolve_to_sent_notifications(self):
+        """Test futures resolve to the records stored as sent."""
+        service = NotificationService(self.engine)
+
+        deliveries = service.send_order_confirmation(
+            "customer_123", {"order_id": "ORDER_1", "total": "9.99", "items": []}
+        )
+
+        results = [delivery.result(timeout=5) for delivery in deliveries]
+        assert sorted(result["type"] for result in results) == ["email", "push", "sms"]
+        assert len(service.get_sent_notifications()) == 3
+
+    def test_slow_sms_does_not_delay_email_and_push(self):
+        """Test a stalled SMS provider only holds up the SMS channel."""
+        service = SlowSmsNotificationService(self.engine)
+
+        email, sms, push = service.send_order_confirmation(
+            "customer_123", {"order_id": "ORDER_1", "total": "9.99", "items": []}
+        )
+
+        assert email.result(timeout=5)["type"] == "email"
+        assert push.result(timeout=5)["type"] == "push"
+        assert not sms.done()
+
+        service.sms_released.set()
+        assert sms.result(timeout=5)["type"] == "sms"
+
+    def test_unreachable_customer_resolves_to_none(self):
+        """Test a skipped delivery resolves to None."""
+        service = NotificationService(self.engine)
+
+        deliveries = service.send_payment_failed(
+            "customer_no_phone",
+            {"order_id": "ORDER_1", "failure_reason": "Declined"},
+        )
+
+        results = [delivery.result(timeout=5) for delivery in deliveries]
+        assert results[1] is None
+        assert len(service.get_notifications_by_type("sms")) == 0
+
+    def test_full_queue_fails_delivery_without_blocking(self):
+        """Test a delivery is rejected when its channel queue is full."""
+        engine = DeliveryEngine(channel_workers={"sms": 1}, queue_size=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def stall():
+            started.set()
+            release.wait(timeout=5)
+
+        running = engine.submit("sms", stall)
+        started.wait(timeout=5)
+        queued = engine.submit("sms", lambda: "queued")
+        rejected = engine.submit("sms", lambda: "rejected")
+
+        assert isinstance(rejected.exception(timeout=5), queue.Full)
+        assert engine.submit("email", lambda: "email").result(timeout=5) == "email"
+
+        release.set()
+        assert queued.result(timeout=5) == "queued"
+        assert running.result(timeout=5) is None
+        engine.shutdown()
+
+    def test_delivery_errors_are_reported_on_the_future(self):
+        """Test an exception raised by a delivery is set on its future."""
+
+        def fail():
+            raise ConnectionError("provider unavailable")
+
+        future = self.engine.submit("push", fail)
+
+        with pytest.raises(ConnectionError, match="provider unavailable"):
+            future.result(timeout=5)
+
+    def test_unknown_channel_is_rejected(self):
+        """Test submitting to a channel without workers raises."""
+        with pytest.raises(ValueError, match="Unknown channel: fax"):
+            self.engine.submit("fax", lambda: None)
+
+    def test_submit_after_shutdown_is_rejected(self):
+        """Test submitting to a shut down engine raises."""
+        self.engine.shutdown()
+
+        with pytest.raises(RuntimeError, match="shut down"):
+            self.engine.submit("email", lambda: None)
+
+    def test_submit_racing_shutdown_is_delivered(self):
+        """Test a delivery accepted while shutting down is still run."""
+        email_queue = self.engine._queues["email"]
+        enqueue = email_queue.put_nowait
+        entered = threading.Event()
+        release = threading.Event()
+
+        def slow_put_nowait(job):
+            entered.set()
+            release.wait(timeout=5)
+            enqueue(job)
+
+        email_queue.put_nowait = slow_put_nowait
+        futures = []
+        submitter = threading.Thread(
+            target=lambda: futures.append(self.engine.submit("email", lambda: "sent"))
+        )
+        submitter.start()
+        assert entered.wait(timeout=5)
+
+        stopper = threading.Thread(target=self.engine.shutdown)
+        stopper.start()
+        stopper.join(timeout=0.1)
+        release.set()
+        submitter.join(timeout=5)
+        stopper.join(timeout=5)
+
+        assert futures[0].result(timeout=5) == "sent"
+
+    def test_bulk_promotional_offer_is_delivered_per_channel(self):
+        """Test bulk chunks are delivered on the engine's channel pools."""
+        service = NotificationService(self.engine)
+        offer_data = {
+            "title": "Sale",
+            "description": "Everything must go",
+            "code": "SALE",
+            "valid_until": "2024-01-31",
+            "campaign_id": "CAMP_002",
+        }
+
+        deliveries = service.send_promotional_offer_bulk(
+            [f"customer_{i}" for i in range(10)], offer_data, chunk_size=4
+        )
+
+        assert sum(delivery.result(timeout=5) for delivery in deliveries) == 30
+        assert len(service.get_notifications_by_type("sms")) == 10
+
+
+class TestNotificationStore:
+    """Test suite for Notification records and NotificationStore."""
+
+    def make_notification(self, number, notification_type="sms", customer_id=None):
+        """Build a sent SMS-like record."""
+        return Notification(
+            id=f"{notification_type}_{number}",
+            type=notification_type,
+            customer_id=customer_id or f"customer_{number}",
+            message=f"Message {number}",
+            status="sent",
+        )
+
+    def test_notification_reads_like_a_dict(self):
+        """Test records expose only their set fields through the mapping API."""
+        notification = self.make_notification(1)
+
+        assert notification["message"] == "Message 1"
+        assert "headers" not in notification
+        assert notification.get("subject") is None
+        assert dict(notification) == {
+            "id": "sms_1",
+            "type": "sms",
+            "customer_id": "customer_1",
+            "message": "Message 1",
+            "status": "sent",
+        }
+        with pytest.raises(KeyError):
+            notification["body"]
+        with pytest.raises(AttributeError):
+            notification.extra = "value"
+
+    def test_lookups_use_type_and_customer_indexes(self):
+        """Test records are found by type and by customer in sending order."""
+        store = NotificationStore()
+        first = self.make_notification(1, "email", "customer_a")
+        second = self.make_notification(2, "sms", "customer_a")
+        third = self.make_notification(3, "email", "customer_b")
+        store.extend([first, second, third])
+
+        assert store.by_type("email") == [first, third]
+        assert store.by_customer("customer_a") == [first, second]
+        assert store.by_type("push") == []
+        assert store.all() == [first, second, third]
+
+    def test_size_cap_evicts_oldest_records_from_every_index(self):
+        """Test records over the cap are dropped oldest first everywhere."""
+        store = NotificationStore(max_records=2)
+        for number in range(1, 4):
+            store.add(self.make_notification(number))
+
+        assert len(store) == 2
+        assert [n["id"] for n in store.by_type("sms")] == ["sms_2", "sms_3"]
+        assert store.by_customer("customer_1") == []
+        assert "customer_1" not in store._by_customer
+
+    def test_ttl_expires_old_records(self, monkeypatch):
+        """Test records older than the TTL are no longer returned."""
+        now = [1000.0]
+        monkeypatch.setattr(notification_service.time, "monotonic", lambda: now[0])
+        store = NotificationStore(max_records=None, ttl=timedelta(minutes=5))
+        store.add(self.make_notification(1))
+        now[0] += 240
+        store.add(self.make_notification(2))
+
+        now[0] += 120
+
+        assert [n["id"] for n in store.all()] == ["sms_2"]
+        assert store.by_customer("customer_1") == []
+
+    def test_invalid_size_cap_is_rejected(self):
+        """Test the size cap must allow at least one record."""
+        with pytest.raises(ValueError, match="max_records must be at least 1"):
+            NotificationStore(max_records=0)
+
+    def test_service_keeps_only_retained_notifications(self):
+        """Test the service's lookups follow the store's retention policy."""
+        service = NotificationService(
+            notification_store=NotificationStore(max_records=3)
+        )
+
+        service.send_order_confirmation(
+            "customer_1", {"order_id": "ORDER_1", "total": "1.00", "items": []}
+        )
+        service.send_order_confirmation(
+            "customer_2", {"order_id": "ORDER_2", "total": "2.00", "items": []}
+        )
+
+        assert len(service.get_sent_notifications()) == 3
+        assert service.get_notifications_by_customer("customer_1") == []
+        assert len(service.get_notifications_by_customer("customer_2")) == 3